@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Parcours complet parallèle : temps d'un SELECT filtré et d'un agrégat sur une grosse table,
+pour chaque nombre de processus (1 = parcours dans le thread de la requête).
+
+    python benchmarks/parallel_scan.py --workers 1,2,4,8 --rows 1000000
+
+Le gain dépend du nombre de cœurs : les workers décodent et filtrent les pages en même temps.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from sql.executor import SQLExecutor
+
+QUERIES = [
+    'SELECT Id FROM T WHERE T.Ville = "v3" AND T.Note > 90',
+    "SELECT COUNT(*), SUM(Note), MAX(Id) FROM T",
+]
+
+
+def open_db(args):
+    if os.path.exists(args.dir):
+        shutil.rmtree(args.dir)
+    os.makedirs(args.dir)
+    config = DBConfig(args.dir, pagesize=4096, bm_buffercount=64, qe_parallel_min_pages=1)
+    disk = DiskManager(config)
+    buff = BufferManager(config, disk)
+    db = DBManager(config, disk, buff)
+    rel = db.CreateTable("T", [("Id", "INT"), ("Ville", "CHAR(16)"), ("Note", "FLOAT")])
+    rnd = random.Random(0)
+    rel.BulkInsert([i, f"v{rnd.randrange(10)}", rnd.random() * 100] for i in range(args.rows))
+    buff.FlushBuffers()
+    return db, rel
+
+
+def run(executor, query):
+    """Durée (secondes) et nombre de lignes d'un SELECT lu jusqu'au bout."""
+    start = time.perf_counter()
+    with executor.cursor(executor.parse(query)) as cursor:
+        nb_rows = len(cursor.fetchall())
+    return time.perf_counter() - start, nb_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parcours complet parallèle")
+    parser.add_argument("--dir", default="./bench_db")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+
+    db, rel = open_db(args)
+    executor = SQLExecutor(db)
+    try:
+        print(f"{len(rel.allocated_pages)} pages, {os.cpu_count()} cœurs")
+        for query in QUERIES:
+            print(query)
+            print(f"{'workers':>8} {'secondes':>10} {'accélération':>13}")
+            base = None
+            for workers in [int(n) for n in args.workers.split(",")]:
+                db.config.qe_parallel_workers = workers
+                run(executor, query)   # démarrage des processus hors mesure
+                elapsed, _ = run(executor, query)
+                base = base or elapsed
+                print(f"{workers:>8} {elapsed:>10.3f} {base / elapsed:>12.2f}x")
+    finally:
+        db.buffer_manager.FlushBuffers()
+        db.disk_manager.Finish()
+        shutil.rmtree(args.dir)
+
+
+if __name__ == "__main__":
+    main()
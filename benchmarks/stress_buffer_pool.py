@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Stress du buffer pool partagé : N sessions (threads) lisent des pages au hasard et insèrent
+dans la même table, avec un pool plus petit que la table (évictions et lectures disque concurrentes).
+Affiche le débit pour chaque nombre de threads.
+
+    python benchmarks/stress_buffer_pool.py --threads 1,2,4,8 --read-latency 1
+
+--read-latency simule un disque lent (ms par lecture de page) : c'est là que plusieurs sessions
+gagnent, en attendant leurs lectures en même temps (le GIL limite le gain sur le travail CPU).
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from managers.relation import Record
+
+
+def open_db(args):
+    if os.path.exists(args.dir):
+        shutil.rmtree(args.dir)
+    os.makedirs(args.dir)
+    config = DBConfig(args.dir, pagesize=4096, bm_buffercount=args.buffers, bm_policy=args.policy)
+    disk = DiskManager(config)
+    buff = BufferManager(config, disk)
+    db = DBManager(config, disk, buff)
+    db.CreateTable("T", [("Id", "INT"), ("Nom", "CHAR(16)"), ("Note", "FLOAT")])
+    rel = db.GetTable("T")
+    rel.BulkInsert([i, f"n{i}", i / 3] for i in range(args.rows))
+
+    if args.read_latency:
+        read_page = disk.ReadPage
+        delay = args.read_latency / 1000
+
+        def slow_read(page_id, buff):
+            time.sleep(delay)
+            read_page(page_id, buff)
+        disk.ReadPage = slow_read
+    return db, rel
+
+
+def run(rel, nb_threads, args):
+    """Lance nb_threads sessions pendant args.duration secondes ; retourne le nombre d'opérations."""
+    pages = list(rel.allocated_pages)
+    stop = threading.Event()
+    counts = [0] * nb_threads
+    errors = []
+
+    def worker(n):
+        rnd = random.Random(n)
+        try:
+            while not stop.is_set():
+                if rnd.random() < args.write_ratio:
+                    rel.InsertRecord(Record([-1, "w", 0.0]))
+                else:
+                    rel.read_page_records(rnd.choice(pages))
+                counts[n] += 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(nb_threads)]
+    for t in threads: t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads: t.join()
+    if errors:
+        raise errors[0]
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress du buffer pool partagé")
+    parser.add_argument("--dir", default="./bench_db")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--buffers", type=int, default=64)
+    parser.add_argument("--policy", default="LRU")
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--duration", type=float, default=2.0, help="secondes par mesure")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="part des opérations qui insèrent")
+    parser.add_argument("--read-latency", type=float, default=0.0, help="ms ajoutées à chaque lecture de page")
+    args = parser.parse_args()
+
+    db, rel = open_db(args)
+    try:
+        print(f"{len(rel.allocated_pages)} pages, {args.buffers} frames, écritures {args.write_ratio:.0%}")
+        print(f"{'threads':>8} {'ops/s':>10} {'accélération':>13}")
+        base = None
+        for nb_threads in [int(n) for n in args.threads.split(",")]:
+            throughput = run(rel, nb_threads, args) / args.duration
+            base = base or throughput
+            print(f"{nb_threads:>8} {throughput:>10.0f} {throughput / base:>12.2f}x")
+        # La table doit être restée cohérente
+        nb_records = sum(len(rel.read_page_records(page_id)) for page_id in rel.allocated_pages)
+        print(f"records : {nb_records} (dont {nb_records - args.rows} insérés pendant le test)")
+    finally:
+        db.buffer_manager.FlushBuffers()
+        db.disk_manager.Finish()
+        shutil.rmtree(args.dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,25 @@ import json
 import os
 
 class DBConfig:
-    def __init__(self, dbpath: str, pagesize=4096, dm_maxfilecount=4, bm_buffercount=2, bm_policy="LRU"):
+    def __init__(self, dbpath: str, pagesize=4096, dm_maxfilecount=4, bm_buffercount=2, bm_policy="LRU", dm_io_mode="file", bm_readahead=0, wal_enabled=False, wal_commit_delay=0, wal_segment_size=16 * 1024 * 1024, wal_checkpoint_size=64 * 1024 * 1024, bm_bgwriter_delay=0, bm_bgwriter_max_pages=100, server_host="127.0.0.1", server_port=5433, server_workers=8, qe_parallel_workers=0, qe_parallel_min_pages=64):
         self.dbpath = dbpath
         self.pagesize = pagesize            # Taille d'une page (défaut 4096)
         self.dm_maxfilecount = dm_maxfilecount  # Nombre max de fichiers DataX.bin
         self.bm_buffercount = bm_buffercount  # Nombre max de pages en mémoire 
-        self.bm_policy = bm_policy            # "LRU" ou "MRU" 
+        self.bm_policy = bm_policy            # "LRU", "MRU", "CLOCK", "LRU-K" ou "2Q"
+        self.dm_io_mode = dm_io_mode          # "file" (pread/pwrite) ou "mmap" (fichiers mappés en mémoire)
+        self.bm_readahead = bm_readahead      # Pages lues en avance par un scan séquentiel (0 = désactivé)
+        self.wal_enabled = wal_enabled        # Journal (wal_*.log) : reprise après un arrêt brutal
+        self.wal_commit_delay = wal_commit_delay  # Attente (ms) avant le fsync d'un commit, pour en grouper plusieurs
+        self.wal_segment_size = wal_segment_size  # Taille (octets) d'un segment du journal
+        self.wal_checkpoint_size = wal_checkpoint_size  # Journal écrit (octets) entre deux checkpoints du writer d'arrière-plan
+        self.bm_bgwriter_delay = bm_bgwriter_delay  # Période (ms) du writer d'arrière-plan (0 = désactivé)
+        self.bm_bgwriter_max_pages = bm_bgwriter_max_pages  # Pages dirty écrites au plus par passage
+        self.server_host = server_host        # Adresse d'écoute du serveur (python main.py --serve)
+        self.server_port = server_port
+        self.server_workers = server_workers  # Threads qui exécutent les requêtes du serveur
+        self.qe_parallel_workers = qe_parallel_workers  # Processus d'un parcours complet parallèle (0 ou 1 = désactivé)
+        self.qe_parallel_min_pages = qe_parallel_min_pages  # Taille (pages) à partir de laquelle un parcours est parallélisé
 
     @staticmethod
     def LoadDBConfig(fichier_config: str) -> "DBConfig":
@@ -24,6 +37,19 @@ class DBConfig:
             pagesize=data.get("pagesize", 4096),
             dm_maxfilecount=data.get("dm_maxfilecount", 4),
             bm_buffercount=data.get("bm_buffercount", 2),
-            bm_policy=data.get("bm_policy", "LRU")
+            bm_policy=data.get("bm_policy", "LRU"),
+            dm_io_mode=data.get("dm_io_mode", "file"),
+            bm_readahead=data.get("bm_readahead", 0),
+            wal_enabled=data.get("wal_enabled", False),
+            wal_commit_delay=data.get("wal_commit_delay", 0),
+            wal_segment_size=data.get("wal_segment_size", 16 * 1024 * 1024),
+            wal_checkpoint_size=data.get("wal_checkpoint_size", 64 * 1024 * 1024),
+            bm_bgwriter_delay=data.get("bm_bgwriter_delay", 0),
+            bm_bgwriter_max_pages=data.get("bm_bgwriter_max_pages", 100),
+            server_host=data.get("server_host", "127.0.0.1"),
+            server_port=data.get("server_port", 5433),
+            server_workers=data.get("server_workers", 8),
+            qe_parallel_workers=data.get("qe_parallel_workers", 0),
+            qe_parallel_min_pages=data.get("qe_parallel_min_pages", 64)
         )
    
@@ -1,12 +1,52 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
 from dbconfig import DBConfig
 from managers.disk_manager import DiskManager
 from managers.buffer_manager import BufferManager
 from managers.db_manager import DBManager
-from sql.parser import parse
+from managers.wal_manager import WALManager
+from managers.bgwriter import BackgroundWriter
 from sql.executor import SQLExecutor
+from sql.cursor import format_row
+from sql.server import SQLServer
+
+def print_select(executor, cmd):
+    """Affiche les lignes d'un SELECT au fur et à mesure qu'elles sont produites."""
+    try:
+        with executor.cursor(cmd) as cursor:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows: break
+                print("\n".join(format_row(values) for values in rows), flush=True)
+        print(f"Total selected records={cursor.rowcount}")
+    except Exception as e:
+        print(f"Erreur d'exécution (SELECT): {e}")
+
+def shutdown(db, bgwriter):
+    """Arrêt propre : tout est écrit et sauvegardé, le journal est vidé."""
+    bgwriter.Stop()
+    db.SaveState()
+
+    db.buffer_manager.FlushBuffers()
+
+    db.disk_manager.Finish()
+
+    wal = db.buffer_manager.wal
+    if wal is not None:
+        # Tout est sur disque : le journal peut être vidé
+        wal.Checkpoint()
+        wal.Close()
+
+    print("Sauvegarde effectuée !")
 
 def main():
+    parser = argparse.ArgumentParser(description="Mini-SGBD")
+    parser.add_argument("--serve", action="store_true", help="mode serveur TCP au lieu du REPL")
+    parser.add_argument("--host", help="adresse d'écoute (défaut : server_host de config.json)")
+    parser.add_argument("--port", type=int, help="port d'écoute (défaut : server_port de config.json)")
+    args = parser.parse_args()
+
     print("=== Mini-SGBD ===")
     
     # 1. Initialisation
@@ -14,12 +54,32 @@ def main():
     
     # On garde les noms courts pour simplifier
     disk = DiskManager(config)
-    buff = BufferManager(config, disk)
+    # Journal : les commandes sont durables dès leur COMMIT, sans écrire les pages
+    wal = WALManager(config, disk) if config.wal_enabled else None
+    buff = BufferManager(config, disk, wal)
+    # (la reprise après un arrêt brutal se fait ici, à partir du journal)
     db = DBManager(config, disk, buff)
     
     executor = SQLExecutor(db)
 
+    # Writer d'arrière-plan : écrit les pages dirty (et fait les checkpoints) hors du chemin des requêtes
+    bgwriter = BackgroundWriter(db)
+    if config.bm_bgwriter_delay > 0:
+        bgwriter.Start()
+
     print(f"Données dans : {config.dbpath}")
+
+    if args.serve:
+        # Un seul processus pour tous les clients (voir sql/client.py)
+        server = SQLServer(db, args.host or config.server_host, args.port or config.server_port, config.server_workers)
+        print(f"Serveur sur {server.host}:{server.port} (Ctrl+C pour arrêter).")
+        try:
+            asyncio.run(server.Serve())
+        except KeyboardInterrupt:
+            pass
+        shutdown(db, bgwriter)
+        return
+
     print("Tapez EXIT pour quitter.")
 
     # 2. Boucle REPL
@@ -29,17 +89,14 @@ def main():
             if not query.strip(): continue
             
             if query.strip().upper() == "EXIT":
-                db.SaveState()
-                
-                buff.FlushBuffers()
-                
-                disk.Finish()
-                
-                print("Sauvegarde effectuée !")
+                shutdown(db, bgwriter)
                 break
 
             # Traitement
-            cmd = parse(query)
+            cmd = executor.parse(query)
+            if cmd["action"] == "SELECT":
+                print_select(executor, cmd)
+                continue
             result = executor.execute_command(cmd)
             print(result)
 
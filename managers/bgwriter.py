@@ -0,0 +1,51 @@
+import threading
+
+
+class BackgroundWriter:
+    """
+    Writer d'arrière-plan : toutes les bm_bgwriter_delay ms, il écrit sur disque les pages dirty
+    les plus anciennes (au plus bm_bgwriter_max_pages, par écritures groupées), pour que les
+    évictions trouvent des pages propres et que les requêtes n'attendent pas d'écriture.
+    Avec le journal, il fait aussi un checkpoint tous les wal_checkpoint_size octets de journal.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.config = db_manager.config
+        self.buffer_manager = db_manager.buffer_manager
+        self.wal = db_manager.buffer_manager.wal
+        self.delay = self.config.bm_bgwriter_delay / 1000
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.error = None        # Dernière exception du thread (il continue quand même)
+        self.nb_rounds = 0
+
+    def Start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="bgwriter", daemon=True)
+        self.thread.start()
+
+    def Stop(self):
+        """Arrête le thread (attend la fin du passage en cours)."""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def RunOnce(self) -> int:
+        """Un passage : pages dirty modifiées depuis au moins une période, puis checkpoint si besoin. Retourne le nombre de pages écrites."""
+        written = self.buffer_manager.WriteDirtyPages(self.config.bm_bgwriter_max_pages, min_age=self.delay)
+        if self.wal is not None and self.wal.next_lsn - self.wal.redo_lsn >= self.config.wal_checkpoint_size:
+            self.wal.FuzzyCheckpoint(self.db_manager)
+        self.nb_rounds += 1
+        return written
+
+    def _run(self):
+        while not self.stop_event.wait(self.delay):
+            try:
+                self.RunOnce()
+            except Exception as e:
+                self.error = e
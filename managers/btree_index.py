@@ -0,0 +1,235 @@
+import bisect
+import math
+import struct
+import threading
+from managers.page_id import PageId
+from managers.record_id import RecordId
+from managers.buffer_manager import SHARED, EXCLUSIVE
+
+# En-tête d'un noeud : est_feuille (B), nb_clés (H), puis un PageId (fichier, page) :
+#  - feuille : la feuille suivante (chaînage pour les parcours d'intervalle), (-1, -1) si aucune
+#  - noeud interne : le fils le plus à gauche
+NODE_HEADER = struct.Struct("<BHii")
+NO_PAGE = (-1, -1)
+# RID minimal : (clé, MIN_RID) est plus petit que toutes les entrées de même clé
+MIN_RID = (-1, -1, -1)
+
+
+def key_codec(type_col: str):
+    """Format struct de la clé et fonction de normalisation d'une valeur Python en clé."""
+    type_col = type_col.upper()
+    if type_col == "INT":
+        return "i", int
+    if type_col == "FLOAT":
+        # La clé est stockée en float32, comme la colonne : on arrondit pareil pour comparer
+        return "f", lambda val: struct.unpack("<f", struct.pack("<f", float(val)))[0]
+    size = int(type_col.split("(")[1].split(")")[0])
+    # CHAR : on compare les octets UTF-8 (même ordre que les chaînes), tronqués comme dans la page
+    return f"{size}s", lambda val: str(val).encode('utf-8')[:size]
+
+
+class _Node:
+    def __init__(self, is_leaf: bool):
+        self.is_leaf = is_leaf
+        self.keys = []            # entrées (clé, rid) triées ; dans un noeud interne ce sont les séparateurs
+        self.children = []        # noeud interne : len(keys) + 1 fils (tuples (fichier, page))
+        self.next_leaf = NO_PAGE  # feuille : feuille suivante
+
+
+class BTreeIndex:
+    """
+    Index secondaire B+-tree stocké dans des pages du DiskManager (lues via le BufferManager).
+    Il associe la valeur d'une colonne aux RecordId des records. Les doublons sont gérés en
+    indexant le couple (clé, rid), unique. La racine ne change jamais de page : quand elle
+    éclate, son contenu part dans une nouvelle page.
+    Les suppressions ne rééquilibrent pas l'arbre (des feuilles peuvent rester vides).
+    """
+    KIND = "BTREE"
+    SUPPORTED_OPS = ("=", "<", ">", "<=", ">=")
+
+    def __init__(self, name: str, relation, column: str, root_page_id: PageId = None):
+        self.name = name
+        self.relation = relation
+        self.column = column
+        self.col_idx = [cname for cname, _ in relation.schema].index(column)
+        self.disk_manager = relation.disk_manager
+        self.buffer_manager = relation.buffer_manager
+
+        key_fmt, self.normalize = key_codec(relation.schema[self.col_idx][1])
+        # Entrée de feuille : clé + rid (fichier, page, slot) ; noeud interne : + fils (fichier, page)
+        self.leaf_entry = struct.Struct("<" + key_fmt + "iii")
+        self.inner_entry = struct.Struct("<" + key_fmt + "iiiii")
+        usable = self.disk_manager.config.pagesize - NODE_HEADER.size
+        self.leaf_capacity = usable // self.leaf_entry.size
+        self.inner_capacity = usable // self.inner_entry.size
+        # Les CHAR sont relus complétés par des \x00 : on les retire pour comparer
+        self.strip_keys = key_fmt.endswith("s")
+        if self.leaf_capacity < 2 or self.inner_capacity < 2:
+            raise ValueError(f"Index {name} : clé trop grande pour la taille de page")
+
+        # Les modifications de l'arbre se font une à la fois ; les Search n'attendent pas :
+        # un éclatement écrit la nouvelle feuille de droite avant de la chaîner, donc une
+        # recherche qui arrive sur l'ancienne feuille retrouve les clés déplacées en suivant next_leaf.
+        # Chaque modification est une transaction système, committée avant de rendre le verrou :
+        # une entrée ajoutée par une transaction annulée est retirée par Delete, pas en
+        # remettant les noeuds dans leur état d'avant (ils contiennent aussi les entrées des autres).
+        self.lock = threading.Lock()
+
+        self.root_page_id = root_page_id
+        if self.root_page_id is None:
+            with self.buffer_manager.SystemTransaction():
+                self.root_page_id = self._new_node(_Node(is_leaf=True))
+
+    def GetState(self) -> dict:
+        """Ce qu'il faut garder dans le catalogue pour rouvrir l'index."""
+        return {"kind": self.KIND, "column": self.column, "root_page_id": self.root_page_id}
+
+    def EstimatePageReads(self, nb_entries: int, nb_matching: float) -> float:
+        """Pages d'index lues par un Search qui rend nb_matching entrées (pour le planificateur)."""
+        leaves = max(1.0, nb_entries / self.leaf_capacity)
+        height = 1 + math.ceil(math.log(leaves, self.inner_capacity)) if leaves > 1 else 1
+        return height + nb_matching / self.leaf_capacity
+
+    # Opérations
+    def Insert(self, value, rid: RecordId):
+        entry = (self.normalize(value), self._rid_tuple(rid))
+        with self.lock, self.buffer_manager.SystemTransaction():
+            split = self._insert(self.root_page_id, entry)
+            if split is not None:
+                self._split_root(*split)
+
+    def Delete(self, value, rid: RecordId):
+        entry = (self.normalize(value), self._rid_tuple(rid))
+        with self.lock, self.buffer_manager.SystemTransaction():
+            page_id = self.root_page_id
+            node = self._read_node(page_id)
+            while not node.is_leaf:
+                page_id = PageId(*node.children[bisect.bisect_right(node.keys, entry)])
+                node = self._read_node(page_id)
+
+            pos = bisect.bisect_left(node.keys, entry)
+            if pos < len(node.keys) and node.keys[pos] == entry:
+                del node.keys[pos]
+                self._write_node(page_id, node)
+
+    def Search(self, low=None, high=None):
+        """Générateur des RecordId dont la clé est dans [low, high] (None = pas de borne)."""
+        low_key = None if low is None else self.normalize(low)
+        high_key = None if high is None else self.normalize(high)
+
+        # Descente jusqu'à la première feuille concernée
+        node = self._read_node(self.root_page_id)
+        start = None if low_key is None else (low_key, MIN_RID)
+        while not node.is_leaf:
+            child = 0 if start is None else bisect.bisect_right(node.keys, start)
+            node = self._read_node(PageId(*node.children[child]))
+
+        pos = 0 if start is None else bisect.bisect_left(node.keys, start)
+        while True:
+            # Le noeud est une copie décodée : aucune page n'est épinglée entre deux yield
+            for key, rid in node.keys[pos:]:
+                if high_key is not None and key > high_key:
+                    return
+                yield RecordId(PageId(rid[0], rid[1]), rid[2])
+            if node.next_leaf == NO_PAGE:
+                return
+            node = self._read_node(PageId(*node.next_leaf))
+            pos = 0
+
+    # Algorithme
+    def _insert(self, page_id: PageId, entry):
+        """Insère dans le sous-arbre ; retourne (séparateur, nouvelle page) si le noeud a éclaté."""
+        node = self._read_node(page_id)
+
+        if node.is_leaf:
+            bisect.insort(node.keys, entry)
+            if len(node.keys) <= self.leaf_capacity:
+                self._write_node(page_id, node)
+                return None
+            mid = len(node.keys) // 2
+            right = _Node(is_leaf=True)
+            right.keys = node.keys[mid:]
+            right.next_leaf = node.next_leaf
+            right_id = self._new_node(right)
+            node.keys = node.keys[:mid]
+            node.next_leaf = (right_id.FileIdx, right_id.PageIdx)
+            self._write_node(page_id, node)
+            return right.keys[0], right_id
+
+        child = bisect.bisect_right(node.keys, entry)
+        split = self._insert(PageId(*node.children[child]), entry)
+        if split is None:
+            return None
+
+        separator, new_page = split
+        node.keys.insert(child, separator)
+        node.children.insert(child + 1, (new_page.FileIdx, new_page.PageIdx))
+        if len(node.keys) <= self.inner_capacity:
+            self._write_node(page_id, node)
+            return None
+
+        # Éclatement d'un noeud interne : la clé du milieu remonte
+        mid = len(node.keys) // 2
+        up = node.keys[mid]
+        right = _Node(is_leaf=False)
+        right.keys = node.keys[mid + 1:]
+        right.children = node.children[mid + 1:]
+        node.keys = node.keys[:mid]
+        node.children = node.children[:mid + 1]
+        right_id = self._new_node(right)
+        self._write_node(page_id, node)
+        return up, right_id
+
+    def _split_root(self, separator, right_id: PageId):
+        """La racine reste sur sa page : son ancien contenu devient le fils gauche."""
+        old_root = self._read_node(self.root_page_id)
+        left_id = self._new_node(old_root)
+        root = _Node(is_leaf=False)
+        root.keys = [separator]
+        root.children = [(left_id.FileIdx, left_id.PageIdx), (right_id.FileIdx, right_id.PageIdx)]
+        self._write_node(self.root_page_id, root)
+
+    # Pages
+    def _new_node(self, node: _Node) -> PageId:
+        page_id = self.disk_manager.AllocPage()
+        self._write_node(page_id, node)
+        return page_id
+
+    def _read_node(self, page_id: PageId) -> _Node:
+        buff = self.buffer_manager.GetPage(page_id, SHARED)
+        try:
+            is_leaf, nb_keys, ptr_file, ptr_page = NODE_HEADER.unpack_from(buff, 0)
+            node = _Node(bool(is_leaf))
+            end = NODE_HEADER.size
+            if node.is_leaf:
+                node.next_leaf = (ptr_file, ptr_page)
+                end += nb_keys * self.leaf_entry.size
+                for key, f, p, s in self.leaf_entry.iter_unpack(buff[NODE_HEADER.size:end]):
+                    node.keys.append((key.rstrip(b'\x00') if self.strip_keys else key, (f, p, s)))
+            else:
+                node.children.append((ptr_file, ptr_page))
+                end += nb_keys * self.inner_entry.size
+                for key, f, p, s, cf, cp in self.inner_entry.iter_unpack(buff[NODE_HEADER.size:end]):
+                    node.keys.append((key.rstrip(b'\x00') if self.strip_keys else key, (f, p, s)))
+                    node.children.append((cf, cp))
+        finally:
+            self.buffer_manager.FreePage(page_id, False, SHARED)
+        return node
+
+    def _write_node(self, page_id: PageId, node: _Node):
+        ptr = node.next_leaf if node.is_leaf else node.children[0]
+        data = bytearray(NODE_HEADER.pack(int(node.is_leaf), len(node.keys), *ptr))
+        if node.is_leaf:
+            for key, rid in node.keys:
+                data += self.leaf_entry.pack(key, *rid)
+        else:
+            for (key, rid), child in zip(node.keys, node.children[1:]):
+                data += self.inner_entry.pack(key, *rid, *child)
+
+        self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+        self.buffer_manager.LogWrite(page_id, 0, data)
+        self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
+
+    @staticmethod
+    def _rid_tuple(rid: RecordId):
+        return (rid.page_id.FileIdx, rid.page_id.PageIdx, rid.slot_idx)
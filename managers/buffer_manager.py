@@ -1,113 +1,628 @@
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
 from managers.page_id import PageId
 from managers.disk_manager import DiskManager
+from managers.replacement_policy import make_replacement_policy
+
+# Modes de latch d'une page (GetPage / FreePage)
+SHARED = "S"       # lecture : plusieurs sessions à la fois
+EXCLUSIVE = "X"    # écriture : une seule session, sans lecteur
+
+# Partitions de la table des pages
+NB_PARTITIONS = 16
+
+
+class RWLatch:
+    """
+    Latch lecteurs / rédacteur d'une frame. Un rédacteur qui attend bloque les nouveaux
+    lecteurs (sinon un scan continu l'affamerait). Non réentrant.
+    """
+    def __init__(self):
+        self.cond = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def AcquireShared(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+
+    def ReleaseShared(self):
+        with self.cond:
+            self.readers -= 1
+            if self.readers == 0:
+                self.cond.notify_all()
+
+    def AcquireExclusive(self):
+        with self.cond:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+
+    def ReleaseExclusive(self):
+        with self.cond:
+            self.writer = False
+            self.cond.notify_all()
+
+    def Acquire(self, mode: str):
+        self.AcquireShared() if mode == SHARED else self.AcquireExclusive()
+
+    def Release(self, mode: str):
+        self.ReleaseShared() if mode == SHARED else self.ReleaseExclusive()
+
+
+class _Partition:
+    __slots__ = ("lock", "pages", "evicting")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+        # Frames dirty retirées de pages par une éviction, le temps de leur écriture sur disque
+        self.evicting = {}
+
+
+class PageTable:
+    """
+    Table des pages du pool {PageId: BufferFrame}, découpée en partitions qui ont chacune leur
+    verrou : deux sessions qui cherchent des pages différentes ne se gênent presque jamais.
+    Le verrou d'une partition protège aussi pin_count et dirty de ses frames.
+    S'utilise comme un dict (chaque opération prend le verrou de la partition concernée).
+    """
+    def __init__(self, nb_partitions: int = NB_PARTITIONS):
+        self.partitions = [_Partition() for _ in range(nb_partitions)]
+
+    def Partition(self, page_id: PageId) -> _Partition:
+        return self.partitions[hash(page_id) % len(self.partitions)]
+
+    def get(self, page_id, default=None):
+        part = self.Partition(page_id)
+        with part.lock:
+            return part.pages.get(page_id, default)
+
+    def __getitem__(self, page_id):
+        frame = self.get(page_id)
+        if frame is None:
+            raise KeyError(page_id)
+        return frame
+
+    def __setitem__(self, page_id, frame):
+        part = self.Partition(page_id)
+        with part.lock:
+            part.pages[page_id] = frame
+
+    def __delitem__(self, page_id):
+        part = self.Partition(page_id)
+        with part.lock:
+            del part.pages[page_id]
+
+    def __contains__(self, page_id):
+        return self.get(page_id) is not None
+
+    def __len__(self):
+        return sum(len(part.pages) for part in self.partitions)
+
+    def items(self) -> list:
+        """Copie des couples (PageId, frame) : on peut modifier la table en la parcourant."""
+        items = []
+        for part in self.partitions:
+            with part.lock:
+                items.extend(part.pages.items())
+        return items
+
+    def values(self) -> list:
+        return [frame for _, frame in self.items()]
+
+    def __iter__(self):
+        return iter([page_id for page_id, _ in self.items()])
+
+    def clear(self):
+        for part in self.partitions:
+            with part.lock:
+                part.pages.clear()
+
 
 class BufferFrame:
     """Une case mémoire (Frame) qui contient une page."""
-    def __init__(self, data: bytearray, page_id: PageId):
+    def __init__(self, data: memoryview, page_id: PageId, frame_idx: int = -1):
         self.data = data
         self.page_id = page_id
+        self.frame_idx = frame_idx  # Position de la frame dans l'arène du BufferManager
         self.pin_count = 0
         self.dirty = False
+        self.page_lsn = 0        # LSN de fin du dernier record du journal qui a modifié la page
+        self.rec_lsn = None      # LSN de la première modification pas encore écrite sur disque
+        self.dirty_since = 0.0   # Instant (time.monotonic) où la page est devenue dirty
+        self.io = None           # Future de la lecture en cours (None si la page est prête)
+        self.prefetched = False  # Chargée par Prefetch et pas encore demandée par GetPage
+        self.latch = RWLatch()   # Pris (GetPage avec latch) pendant qu'une session lit ou écrit la page
 
 class BufferManager:
-    def __init__(self, config, disk_manager: DiskManager):
+    """
+    Buffer pool partagé par plusieurs sessions (threads). Verrous, toujours pris dans cet ordre :
+      write_lock (écritures groupées) -> lock (frames libres, évictions, chargements)
+      -> verrou d'une partition de la table des pages -> replacer_lock (politique de remplacement).
+    Un hit ne prend que le verrou de sa partition et replacer_lock ; la lecture d'une page
+    manquante se fait hors verrou (les autres sessions qui la demandent attendent frame.io).
+    Le contenu d'une page est protégé par le latch de sa frame (GetPage(page_id, SHARED / EXCLUSIVE)).
+    """
+    def __init__(self, config, disk_manager: DiskManager, wal=None):
         self.config = config
         self.disk_manager = disk_manager  # Pointeur vers DiskManager
-        # buffer_pool : Dictionnaire {PageId: BufferFrame}
-        # L'ordre d'insertion et accès dans ce dictionnaire servira à gérer le temps pour LRU/MRU.
-        self.buffer_pool = {} 
+        # Journal (WALManager), None si la base n'est pas journalisée
+        self.wal = wal
+        # buffer_pool : table {PageId: BufferFrame} partitionnée
+        self.buffer_pool = PageTable()
+
+        # Arène préallouée : bm_buffercount frames de pagesize octets, contiguës.
+        # Chaque BufferFrame garde une memoryview fixe dessus : un miss ne fait aucune allocation.
+        # (en mode mmap les frames pointent directement sur le fichier mappé : pas d'arène)
+        pagesize = self.config.pagesize
+        count = self.config.bm_buffercount
+        self.arena = None if self.disk_manager.use_mmap else bytearray(count * pagesize)
+        self.frames = []
+        for i in range(count):
+            view = None if self.arena is None else memoryview(self.arena)[i * pagesize:(i + 1) * pagesize]
+            self.frames.append(BufferFrame(view, None, i))
+        # Frames libres (pile : la dernière libérée est réutilisée en premier)
+        self.free_frames = list(reversed(self.frames))
 
-    def GetPage(self, page_id: PageId) -> bytearray:
+        # Lecture anticipée : threads d'I/O créés au premier Prefetch
+        self.prefetch_pool = None
+        self.nb_prefetched = 0
+        # Politique de remplacement (LRU, MRU, CLOCK, LRU-K, 2Q) : elle suit l'ordre des accès
+        self.replacer = make_replacement_policy(self.config.bm_policy, self.config.bm_buffercount)
+
+        # lock protège free_frames et les changements de page d'une frame (chargement, éviction),
+        # replacer_lock la politique de remplacement et nb_prefetched,
+        # write_lock sérialise les écritures groupées (WriteDirtyPages, writer d'arrière-plan)
+        self.lock = threading.RLock()
+        self.replacer_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        # Écritures faites pendant une éviction (sur le chemin de la requête) / par écritures groupées
+        self.nb_sync_writes = 0
+        self.nb_pages_written = 0
+        self.nb_write_calls = 0
+
+    def GetPage(self, page_id: PageId, latch: str = None) -> memoryview:
         """
-        Retourne le buffer correspondant à la page demandée.
+        Retourne le buffer correspondant à la page demandée (épinglée).
         Charge la page depuis le disque si nécessaire.
+        latch : SHARED ou EXCLUSIVE pour prendre aussi le latch de la page (rendu par FreePage).
         """
-        # Si la page est déjà dans le pool
-        if page_id in self.buffer_pool:
-            frame = self.buffer_pool[page_id]
-            frame.pin_count += 1
-            
-            # Mise à jour de l'ordre d'accès (on le remet à la fin = "récent")
-            #pour savoir qui est le plus récent.
-            del self.buffer_pool[page_id]
-            self.buffer_pool[page_id] = frame
-            
-            return frame.data
-
-        # Si la page n'est pas dans le pool
-        # Vérifier s'il reste de la place, sinon évincer une page
-        if len(self.buffer_pool) >= self.config.bm_buffercount:
-            self._evict_page()
-
-        # Charger la page depuis le disque
-        # On crée un nouveau bytearray de la taille d'une page
-        buff = bytearray(self.config.pagesize)
-        self.disk_manager.ReadPage(page_id, buff) 
-        
-        # Créer la frame et l'ajouter au pool
-        frame = BufferFrame(buff, page_id)
-        frame.pin_count = 1
-        self.buffer_pool[page_id] = frame
-        
+        while True:
+            frame, io = self._pin(page_id)
+            if frame is None:
+                # Si la page n'est pas dans le pool
+                frame = self._load(page_id)
+                if frame is None:
+                    # Chargée entre-temps par une autre session
+                    continue
+            elif io is not None and not self._wait_io(frame, io):
+                # Lecture (anticipée) ratée : on recharge la page normalement
+                continue
+            break
+
+        if latch is not None:
+            frame.latch.Acquire(latch)
         return frame.data
 
-    def FreePage(self, page_id: PageId, valdirty: bool):
+    def FreePage(self, page_id: PageId, valdirty: bool, latch: str = None):
         """
         Libère la page (décrémente pin_count).
         Marque la page comme 'dirty' si valdirty est True.
+        latch : le mode passé à GetPage, pour rendre le latch de la page.
         """
-        if page_id in self.buffer_pool:
-            frame = self.buffer_pool[page_id]
+        part = self.buffer_pool.Partition(page_id)
+        with part.lock:
+            frame = part.pages.get(page_id)
+            if frame is None:
+                return
+            if latch is not None:
+                frame.latch.Release(latch)
+            if valdirty and not frame.dirty:
+                frame.dirty = True
+                frame.dirty_since = time.monotonic()
             if frame.pin_count > 0:
                 frame.pin_count -= 1
-            if valdirty:
-                frame.dirty = True
+                if frame.pin_count == 0:
+                    with self.replacer_lock:
+                        self.replacer.SetEvictable(page_id, True)
+
+    def LogWrite(self, page_id: PageId, offset: int, data):
+        """
+        Écrit data à partir de offset dans une page épinglée (latch EXCLUSIVE), en journalisant d'abord
+        l'ancien et le nouveau contenu (WAL). L'appelant marque toujours la page dirty via FreePage.
+        """
+        frame = self.buffer_pool[page_id]
+        end = offset + len(data)
+        if self.wal is not None:
+            if frame.rec_lsn is None:
+                frame.rec_lsn = self.wal.next_lsn
+            frame.page_lsn = self.wal.LogUpdate(page_id, offset, bytes(frame.data[offset:end]), bytes(data))
+        frame.data[offset:end] = data
+
+    def SystemTransaction(self):
+        """
+        Contexte d'une modification de structure (voir WALManager.SystemTransaction) : si le bloc
+        lève une exception, les octets écrits par LogWrite reprennent leur valeur d'avant.
+        Ne fait rien si la base n'est pas journalisée.
+        """
+        return nullcontext() if self.wal is None else self.wal.SystemTransaction(self._restore)
+
+    def WriteDirtyPages(self, max_pages: int = None, min_age: float = 0.0) -> int:
+        """
+        Écrit sur disque des pages dirty non épinglées, les plus anciennement modifiées d'abord,
+        sans les retirer du pool (elles redeviennent propres). Les pages voisines sur disque sont
+        écrites ensemble. min_age : âge minimal (secondes) d'une modification. Retourne le nombre de pages écrites.
+        """
+        with self.write_lock:
+            now = time.monotonic()
+            candidates = [(frame.dirty_since, page_id, frame) for page_id, frame in self.buffer_pool.items()
+                          if frame.dirty and frame.pin_count == 0 and frame.io is None
+                          and now - frame.dirty_since >= min_age]
+            candidates.sort(key=lambda candidate: candidate[0])
+
+            pages = []
+            pinned = []
+            for _, page_id, frame in candidates[:max_pages]:
+                part = self.buffer_pool.Partition(page_id)
+                with part.lock:
+                    # La frame a pu être épinglée, écrite ou évincée depuis
+                    if part.pages.get(page_id) is not frame or not frame.dirty or frame.pin_count:
+                        continue
+                    # Copie de la page (non épinglée : personne ne la modifie). Elle peut être remodifiée
+                    # (et redevenir dirty) pendant l'écriture ; la frame reste épinglée jusqu'à la fin
+                    # pour ne pas être évincée puis relue trop tôt
+                    data = frame.data if self.disk_manager.use_mmap else bytes(frame.data)
+                    pages.append((page_id, data, frame.page_lsn))
+                    frame.dirty = False
+                    frame.rec_lsn = None
+                    frame.pin_count += 1
+                    with self.replacer_lock:
+                        self.replacer.SetEvictable(page_id, False)
+                pinned.append(page_id)
+            try:
+                self._write_pages(pages)
+            finally:
+                for page_id in pinned:
+                    self.FreePage(page_id, False)
+        return len(pages)
+
+    def CopyUnsyncedPages(self, page_ids) -> dict:
+        """
+        Copie {page_id: bytes} de celles des pages page_ids dont le disque n'a peut-être pas la
+        dernière version : dirty, ou épinglées (en cours de modification, ou d'écriture par
+        WriteDirtyPages qui les marque propres avant d'écrire), ou en cours d'écriture par une
+        éviction. Chaque copie est prise sous latch SHARED : jamais une page à moitié modifiée.
+        Rien n'est écrit sur disque.
+        """
+        wanted = set(page_ids)
+        candidates = []
+        copies = {}
+        for part in self.buffer_pool.partitions:
+            with part.lock:
+                candidates.extend(page_id for page_id, frame in part.pages.items()
+                                  if page_id in wanted and (frame.dirty or frame.pin_count > 0))
+                # En cours d'écriture par une éviction : ni dans le pool, ni encore sur disque.
+                # Personne ne modifie ces frames, la copie se fait sous le verrou de la partition
+                copies.update((page_id, bytes(frame.data)) for page_id, frame in part.evicting.items()
+                              if page_id in wanted)
+        for page_id in candidates:
+            buff = self.GetPage(page_id, SHARED)
+            try:
+                copies[page_id] = bytes(buff)
+            finally:
+                self.FreePage(page_id, False, SHARED)
+        return copies
+
+    def DirtyPagesLSN(self) -> list:
+        """LSN de la première modification pas encore sur disque de chaque page du pool (pour un checkpoint)."""
+        return [frame.rec_lsn for frame in self.buffer_pool.values() if frame.rec_lsn is not None]
+
+    def Prefetch(self, page_ids):
+        """
+        Lecture anticipée pour un scan séquentiel : les pages sont lues en arrière-plan
+        dans des frames du pool, sans être épinglées. Le GetPage suivant les y trouvera.
+        """
+        if self.disk_manager.use_mmap:
+            # Le cache du noyau fait le travail : on le prévient seulement
+            for page_id in page_ids:
+                self.disk_manager.Advise(page_id)
+            return
+
+        with self.lock:
+            # On garde des frames pour les pages épinglées par la requête, mais au moins une page
+            # est lue en avance (même avec bm_buffercount = 2) : une page lue en avance n'est pas
+            # épinglée, une éviction peut toujours la reprendre
+            max_prefetched = max(1, self.config.bm_buffercount - 2)
+            for page_id in page_ids:
+                if self.nb_prefetched >= max_prefetched:
+                    break
+                if page_id in self.buffer_pool:
+                    continue
+                if not self.free_frames and not self._evict_page(must_succeed=False):
+                    break
+
+                if self.prefetch_pool is None:
+                    workers = max(1, min(4, self.config.bm_readahead))
+                    self.prefetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+
+                frame = self.free_frames.pop()
+                frame.page_id = page_id
+                frame.pin_count = 0
+                frame.dirty = False
+                frame.prefetched = True
+                frame.io = self.prefetch_pool.submit(self.disk_manager.ReadPage, page_id, frame.data)
+                part = self.buffer_pool.Partition(page_id)
+                with part.lock:
+                    part.pages[page_id] = frame
+                    with self.replacer_lock:
+                        self.nb_prefetched += 1
+                        self.replacer.RecordAccess(page_id)
+                        self.replacer.SetEvictable(page_id, True)
+
+    def DiscardPage(self, page_id: PageId):
+        """
+        Retire une page du pool SANS l'écrire (utilisé quand le disque est réécrit
+        directement, ex: chargement en masse). La page ne doit pas être épinglée.
+        """
+        with self.write_lock, self.lock:
+            frame = self.buffer_pool.get(page_id)
+            if frame is None:
+                return
+            io = frame.io
+            if io is not None and not self._wait_io(frame, io):
+                return
+            part = self.buffer_pool.Partition(page_id)
+            with part.lock:
+                if frame.pin_count > 0:
+                    raise Exception(f"BufferManager : impossible de retirer {page_id}, page épinglée !")
+                del part.pages[page_id]
+                with self.replacer_lock:
+                    self.replacer.Remove(page_id)
+            self._release_frame(frame)
 
     def FlushBuffers(self):
         """
         Écrit toutes les pages 'dirty' sur le disque et vide le pool.
-       Remise à zéro complète du BufferManager
+       Remise à zéro complète du BufferManager (aucune autre session ne doit utiliser le pool)
         """
-        for page_id, frame in self.buffer_pool.items():
-            if frame.dirty:
-                self.disk_manager.WritePage(page_id, frame.data)
-        
-        # On vide complètement le pool (remise à zéro)
-        self.buffer_pool.clear()
+        with self.write_lock, self.lock:
+            for frame in self.buffer_pool.values():
+                io = frame.io
+                if io is not None:
+                    self._wait_io(frame, io)
+
+            # Écritures groupées, avec un seul fsync du journal pour toutes les pages
+            self._write_pages([(page_id, frame.data, frame.page_lsn)
+                               for page_id, frame in self.buffer_pool.items() if frame.dirty])
+
+            # On vide complètement le pool (remise à zéro)
+            for frame in self.buffer_pool.values():
+                self._release_frame(frame)
+            self.buffer_pool.clear()
+            with self.replacer_lock:
+                self.replacer = make_replacement_policy(self.config.bm_policy, self.config.bm_buffercount)
+
+            if self.disk_manager.use_mmap:
+                # Les pages modifiées sont déjà dans le mapping : on force l'écriture (msync)
+                self.disk_manager.Sync()
 
     def SetCurrentReplacementPolicy(self, policy: str):
-        """Change la politique de remplacement (LRU ou MRU)."""
-        self.config.bm_policy = policy
-
-    def _evict_page(self):
-        """Algorithme de remplacement (interne)."""
-        victim_id = None
-        
-        # On récupère la liste des items (l'ordre est préservé : début=vieux, fin=récent)
-        frames_list = list(self.buffer_pool.items())
-
-        if self.config.bm_policy == "LRU":
-            # LRU : On cherche le PLUS ANCIEN (début de liste) avec pin_count == 0
-            for pid, frame in frames_list:
-                if frame.pin_count == 0:
-                    victim_id = pid
-                    break
-        
-        elif self.config.bm_policy == "MRU":
-            # MRU : On cherche le PLUS RÉCENT (fin de liste) avec pin_count == 0
-            # reversed() permet de parcourir de la fin vers le début
-            for pid, frame in reversed(frames_list):
-                if frame.pin_count == 0:
-                    victim_id = pid
-                    break
+        """Change la politique de remplacement (LRU, MRU, CLOCK, LRU-K ou 2Q)."""
+        with self.lock:
+            replacer = make_replacement_policy(policy, self.config.bm_buffercount)
+            # Les partitions sont figées le temps de confier les pages déjà chargées à la nouvelle politique
+            for part in self.buffer_pool.partitions:
+                part.lock.acquire()
+            try:
+                with self.replacer_lock:
+                    for part in self.buffer_pool.partitions:
+                        for page_id, frame in part.pages.items():
+                            replacer.RecordAccess(page_id)
+                            replacer.SetEvictable(page_id, frame.pin_count == 0)
+                    self.replacer = replacer
+            finally:
+                for part in self.buffer_pool.partitions:
+                    part.lock.release()
+            self.config.bm_policy = policy
+
+    def _pin(self, page_id: PageId):
+        """Épingle la page si elle est dans le pool. Retourne (frame, lecture en cours) ou (None, None)."""
+        part = self.buffer_pool.Partition(page_id)
+        with part.lock:
+            frame = part.pages.get(page_id)
+            if frame is None:
+                return None, None
+            frame.pin_count += 1
+            with self.replacer_lock:
+                if frame.pin_count == 1:
+                    self.replacer.SetEvictable(page_id, False)
+                if frame.prefetched:
+                    # L'accès a déjà été compté au lancement de la lecture anticipée
+                    self._clear_prefetched(frame)
+                else:
+                    self.replacer.RecordAccess(page_id)
+            return frame, frame.io
+
+    def _load(self, page_id: PageId):
+        """Charge une page absente du pool dans une frame épinglée (None si une autre session l'a chargée avant)."""
+        part = self.buffer_pool.Partition(page_id)
+        with self.lock:
+            if page_id in self.buffer_pool:
+                return None
+            # Vérifier s'il reste une frame libre, sinon évincer une page
+            if not self.free_frames:
+                self._evict_page()
+            frame = self.free_frames.pop()
+            io = frame.io = Future()
+            frame.page_id = page_id
+            frame.pin_count = 1
+            frame.dirty = False
+            with part.lock:
+                part.pages[page_id] = frame
+                with self.replacer_lock:
+                    self.replacer.RecordAccess(page_id)
+
+        # Lecture hors verrou : les autres sessions qui demandent la page attendent io
+        try:
+            if self.disk_manager.use_mmap:
+                # Mode mmap : pas de copie, on donne directement une vue sur le fichier mappé
+                frame.data = self.disk_manager.GetPageView(page_id)
+            else:
+                # Lecture directement dans la frame de l'arène
+                self.disk_manager.ReadPage(page_id, frame.data)
+        except BaseException as e:
+            io.set_exception(e)
+            self._forget(frame, io)
+            raise
+        frame.io = None
+        io.set_result(None)
+        return frame
+
+    def _evict_page(self, must_succeed=True) -> bool:
+        """Algorithme de remplacement (interne, lock tenu) : délégué à la politique, en O(1) pour LRU/MRU."""
+        while True:
+            with self.replacer_lock:
+                victim_id = self.replacer.Evict()
 
-        if victim_id is None:
-            raise Exception("BufferManager : Aucun buffer libérable (tous les pin_count > 0) !")
+            if victim_id is None:
+                if not must_succeed:
+                    return False
+                raise Exception("BufferManager : Aucun buffer libérable (tous les pin_count > 0) !")
+
+            part = self.buffer_pool.Partition(victim_id)
+            with part.lock:
+                victim_frame = part.pages.get(victim_id)
+                if victim_frame is None or victim_frame.pin_count > 0:
+                    # Épinglée entre-temps par une autre session : FreePage la rendra à la politique
+                    continue
+                # Suppression du pool : une session qui redemande la page attendra lock
+                del part.pages[victim_id]
+                if victim_frame.io is None and victim_frame.dirty:
+                    part.evicting[victim_id] = victim_frame
+                with self.replacer_lock:
+                    self.replacer.Remove(victim_id)
+            break
 
         # Gestion de la victime
-        victim_frame = self.buffer_pool[victim_id]
-        if victim_frame.dirty:
-            self.disk_manager.WritePage(victim_id, victim_frame.data)
-        
-        # Suppression du pool
-        del self.buffer_pool[victim_id]
\ No newline at end of file
+        if victim_frame.io is not None:
+            # Une lecture anticipée est encore en cours dans cette frame : on l'attend
+            try:
+                victim_frame.io.result()
+            except Exception:
+                pass
+        elif victim_frame.dirty:
+            # Écriture synchrone, sur le chemin de la requête : le writer d'arrière-plan est là pour l'éviter
+            self.nb_sync_writes += 1
+            try:
+                self._write_back(victim_id, victim_frame)
+            finally:
+                with part.lock:
+                    del part.evicting[victim_id]
+
+        self._release_frame(victim_frame)
+        return True
+
+    def _wait_io(self, frame: BufferFrame, io: Future) -> bool:
+        """
+        Attend la fin de la lecture d'une frame (sans verrou de partition).
+        Si elle a échoué, la frame est retirée du pool et on retourne False.
+        """
+        try:
+            io.result()
+        except Exception:
+            self._forget(frame, io)
+            return False
+        if frame.io is io:
+            frame.io = None
+        return True
+
+    def _forget(self, frame: BufferFrame, io: Future):
+        """Retire du pool une frame dont la lecture io a échoué (si ce n'est pas déjà fait)."""
+        with self.lock:
+            page_id = frame.page_id
+            if page_id is None or frame.io is not io:
+                return
+            part = self.buffer_pool.Partition(page_id)
+            with part.lock:
+                if part.pages.get(page_id) is frame:
+                    del part.pages[page_id]
+                with self.replacer_lock:
+                    self.replacer.Remove(page_id)
+            self._release_frame(frame)
+
+    def _clear_prefetched(self, frame: BufferFrame):
+        """(replacer_lock tenu)"""
+        frame.prefetched = False
+        self.nb_prefetched -= 1
+
+    def _restore(self, page_id: PageId, offset: int, before: bytes):
+        """Remet des octets d'une page à leur image d'avant (transaction système interrompue)."""
+        self.GetPage(page_id, EXCLUSIVE)
+        self.LogWrite(page_id, offset, before)
+        self.FreePage(page_id, True, EXCLUSIVE)
+
+    def _release_frame(self, frame: BufferFrame):
+        """Remet une frame dans la liste des frames libres (lock tenu)."""
+        if frame.prefetched:
+            with self.replacer_lock:
+                self._clear_prefetched(frame)
+        frame.page_id = None
+        frame.pin_count = 0
+        frame.dirty = False
+        frame.page_lsn = 0
+        frame.rec_lsn = None
+        frame.io = None
+        if self.arena is None:
+            # mmap : on lâche la vue pour ne pas bloquer la fermeture du mapping
+            frame.data = None
+        self.free_frames.append(frame)
+
+    def _write_back(self, page_id: PageId, frame: BufferFrame):
+        """Écrit une frame dirty sur le disque."""
+        if self.wal is not None:
+            # WAL : le journal d'abord, jusqu'à la dernière modification de la page
+            self.wal.Flush(frame.page_lsn)
+        if self.disk_manager.use_mmap:
+            # La frame EST la page mappée : il suffit de noter le segment à synchroniser
+            self.disk_manager.MarkDirty(page_id)
+        else:
+            self.disk_manager.WritePage(page_id, frame.data)
+
+    def _write_pages(self, pages: list):
+        """
+        Écrit des pages [(page_id, données, page_lsn)] : le journal d'abord (un seul Flush),
+        puis les pages triées, chaque suite de pages consécutives d'un fichier en une écriture vectorisée.
+        """
+        if not pages:
+            return
+        if self.wal is not None:
+            self.wal.Flush(max(page_lsn for _, _, page_lsn in pages))
+        if self.disk_manager.use_mmap:
+            for page_id, _, _ in pages:
+                self.disk_manager.MarkDirty(page_id)
+            self.disk_manager.Sync()
+            self.nb_pages_written += len(pages)
+            return
+
+        pages = sorted(pages, key=lambda page: (page[0].FileIdx, page[0].PageIdx))
+        run_start, run = pages[0][0], [pages[0][1]]
+        for page_id, data, _ in pages[1:]:
+            if page_id.FileIdx == run_start.FileIdx and page_id.PageIdx == run_start.PageIdx + len(run):
+                run.append(data)
+                continue
+            self._write_run(run_start, run)
+            run_start, run = page_id, [data]
+        self._write_run(run_start, run)
+
+    def _write_run(self, page_id: PageId, buffers: list):
+        self.disk_manager.WritePages(page_id, buffers)
+        self.nb_write_calls += 1
+        self.nb_pages_written += len(buffers)
@@ -1,6 +1,16 @@
 import os
 import pickle
+from contextlib import nullcontext
 from managers.relation import Relation
+from managers.btree_index import BTreeIndex
+from managers.hash_index import HashIndex
+from managers.statistics import collect_statistics
+
+# Types d'index connus (clé "kind" de l'état sauvegardé dans le catalogue)
+INDEX_TYPES = {
+    BTreeIndex.KIND: BTreeIndex,
+    HashIndex.KIND: HashIndex,
+}
 
 class DBManager:
     def __init__(self, config, disk_manager, buffer_manager):
@@ -8,8 +18,23 @@ class DBManager:
         self.disk_manager = disk_manager
         self.buffer_manager = buffer_manager
         self.tables = {}  # Stocke les objets Relation 
+        # Incrémenté à chaque changement du catalogue : les caches de plans s'invalident dessus
+        self.catalog_version = 0
+        # LSN du journal à la dernière sauvegarde du catalogue (tables.sv)
+        self.checkpoint_lsn = 0
         # Charge les tables existantes au démarrage
         self.LoadState()
+        # Base journalisée : on rejoue ce qui s'est passé depuis la dernière sauvegarde
+        if self.buffer_manager.wal is not None:
+            self.buffer_manager.wal.Recover(self)
+
+    def Transaction(self):
+        """
+        Contexte d'une transaction (une commande SQL) : si elle lève une exception, ses changements
+        de records sont défaits (UndoRecord). Ne fait rien si la base n'est pas journalisée.
+        """
+        wal = self.buffer_manager.wal
+        return nullcontext() if wal is None else wal.Transaction(self)
 
     def CreateTable(self, table_name: str, schema: list):
         """Crée une nouvelle table et l'ajoute au catalogue."""
@@ -21,19 +46,91 @@ class DBManager:
         
         
         self.tables[table_name] = rel
+        self.catalog_version += 1
+        self._log_catalog("CREATE_TABLE", table_name, schema)
         return rel
 
     def GetTable(self, table_name: str) -> Relation:
         """Récupère une table par son nom."""
         return self.tables.get(table_name)
 
+    def CreateIndex(self, index_name: str, table_name: str, column: str, kind: str = "BTREE"):
+        """Crée un index sur une colonne et le remplit avec les records existants."""
+        rel = self.GetTable(table_name)
+        if rel is None:
+            raise ValueError(f"Table {table_name} introuvable.")
+        if any(index_name in t.indexes for t in self.tables.values()):
+            raise ValueError(f"L'index {index_name} existe déjà.")
+        if column not in [cname for cname, _ in rel.schema]:
+            raise ValueError(f"Colonne {column} introuvable dans {table_name}.")
+        index_class = INDEX_TYPES.get(kind.upper())
+        if index_class is None:
+            raise ValueError(f"Type d'index inconnu : {kind}")
+
+        index = index_class(index_name, rel, column)
+        for page_id in rel.GetDataPages():
+            for rec in rel.read_page_records(page_id):
+                index.Insert(rec.values[index.col_idx], rec.rid)
+
+        rel.indexes[index_name] = index
+        self.catalog_version += 1
+        self._log_catalog("CREATE_INDEX", table_name, index_name, index.GetState())
+        return index
+
+    def AnalyzeTable(self, table_name: str) -> dict:
+        """Calcule les statistiques d'une table pour le planificateur et les garde dans le catalogue."""
+        rel = self.GetTable(table_name)
+        if rel is None:
+            raise ValueError(f"Table {table_name} introuvable.")
+        rel.stats = collect_statistics(rel)
+        self.catalog_version += 1
+        self._log_catalog("STATS", table_name, rel.stats)
+        return rel.stats
+
     def RemoveTable(self, table_name: str):
         """Supprime une table."""
         if table_name in self.tables:
             del self.tables[table_name]
+            self.catalog_version += 1
+            self._log_catalog("DROP_TABLE", table_name)
         else:
             raise ValueError(f"Table {table_name} introuvable.")
 
+    def RedoCatalog(self, op: str, table_name: str, *args):
+        """(reprise) Rejoue un changement du catalogue lu dans le journal."""
+        if op == "CREATE_TABLE":
+            self.tables[table_name] = Relation(table_name, args[0], self.disk_manager, self.buffer_manager)
+            return
+        rel = self.tables.get(table_name)
+        if rel is None:
+            return
+        if op == "DROP_TABLE":
+            del self.tables[table_name]
+        elif op == "TABLE_PAGE":
+            rel.allocated_pages.append(args[0])
+        elif op == "CREATE_INDEX":
+            index_name, state = args
+            state = dict(state)
+            rel.indexes[index_name] = INDEX_TYPES[state.pop("kind")](index_name, rel, **state)
+        elif op == "STATS":
+            rel.stats = args[0]
+        elif op == "SPLIT_BUCKET":
+            index_name, head_id, new_id, local_depth = args
+            # Éclatements faits pendant la construction de l'index : déjà dans l'état de CREATE_INDEX
+            if index_name in rel.indexes:
+                rel.indexes[index_name].SplitDirectory(head_id, new_id, local_depth)
+        self.catalog_version += 1
+
+    def UndoRecord(self, op: str, table_name: str, *args):
+        """(rollback, reprise) Défait un changement de record lu dans le journal (voir Relation.UndoRecord)."""
+        rel = self.tables.get(table_name)
+        if rel is not None:
+            rel.UndoRecord(op, *args)
+
+    def _log_catalog(self, op: str, *args):
+        if self.buffer_manager.wal is not None:
+            self.buffer_manager.wal.LogCatalog(op, *args)
+
     def SaveState(self):
         """Sauvegarde le catalogue (tables, schémas ET pages allouées)."""
         catalog_data = {}
@@ -41,12 +138,25 @@ class DBManager:
             catalog_data[name] = {
                 "schema": rel.schema,
                 "header_page_id": rel.header_page_id,
-                "allocated_pages": rel.allocated_pages 
+                "allocated_pages": rel.allocated_pages,
+                "free_space": rel.free_space,
+                "indexes": {index_name: index.GetState() for index_name, index in rel.indexes.items()},
+                "stats": rel.stats
             }
         
+        wal = self.buffer_manager.wal
+        if wal is not None:
+            # Le catalogue ne doit pas être en avance sur le journal
+            wal.Flush()
+            self.checkpoint_lsn = wal.next_lsn
+
         save_path = os.path.join(self.config.dbpath, "tables.sv")
-        with open(save_path, "wb") as f:
-            pickle.dump(catalog_data, f)
+        # Fichier temporaire puis renommage : un arrêt brutal laisse l'ancien catalogue intact
+        with open(save_path + ".tmp", "wb") as f:
+            pickle.dump({"tables": catalog_data, "checkpoint_lsn": self.checkpoint_lsn}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(save_path + ".tmp", save_path)
 
     def LoadState(self):
         """Recharge les tables et leurs pages."""
@@ -56,11 +166,26 @@ class DBManager:
 
         with open(save_path, "rb") as f:
             catalog_data = pickle.load(f)
+        # Ancien format : directement {nom_table: infos}
+        if "checkpoint_lsn" in catalog_data and "tables" in catalog_data:
+            self.checkpoint_lsn = catalog_data["checkpoint_lsn"]
+            catalog_data = catalog_data["tables"]
 
         for name, info in catalog_data.items():
             rel = Relation(name, info["schema"], self.disk_manager, self.buffer_manager)
             rel.header_page_id = info["header_page_id"]
             
             rel.allocated_pages = info.get("allocated_pages", [])
-            
+            if "free_space" in info:
+                rel.free_space = info["free_space"]
+            else:
+                # Ancien catalogue sans free-space map : on la recalcule depuis les bitmaps
+                rel.rebuild_free_space()
+
+            rel.stats = info.get("stats")
+            for index_name, state in info.get("indexes", {}).items():
+                state = dict(state)
+                index_class = INDEX_TYPES[state.pop("kind")]
+                rel.indexes[index_name] = index_class(index_name, rel, **state)
+
             self.tables[name] = rel
\ No newline at end of file
@@ -1,7 +1,58 @@
+import math
+import mmap
 import os
 import pickle
+import threading
 from managers.page_id import PageId
 
+
+def _pread_into(fd, buff, offset):
+    """Lit directement dans buff à la position offset. Retourne le nombre d'octets lus."""
+    if hasattr(os, "preadv"):
+        # Pas de copie intermédiaire : le noyau écrit dans le buffer de l'appelant
+        return os.preadv(fd, [buff], offset)
+    if hasattr(os, "pread"):
+        data = os.pread(fd, len(buff), offset)
+    else:
+        # Windows : pas de lecture positionnelle
+        os.lseek(fd, offset, os.SEEK_SET)
+        data = os.read(fd, len(buff))
+    buff[:len(data)] = data
+    return len(data)
+
+
+def _pwrite_all(fd, buff, offset):
+    """Écrit tout le buffer à la position offset."""
+    view = memoryview(buff)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def _pwritev_all(fd, buffers, offset):
+    """Écrit plusieurs buffers contigus à partir de offset en un seul appel système (si possible)."""
+    if not hasattr(os, "pwritev"):
+        for buff in buffers:
+            _pwrite_all(fd, buff, offset)
+            offset += len(buff)
+        return
+    views = [memoryview(buff) for buff in buffers]
+    while views:
+        written = os.pwritev(fd, views, offset)
+        offset += written
+        # Écriture partielle : on repart du premier octet non écrit
+        while views and written >= len(views[0]):
+            written -= len(views[0])
+            views.pop(0)
+        if views and written:
+            views[0] = views[0][written:]
+
+
 class DiskManager:
     def __init__(self, db_config):
         self.config = db_config
@@ -11,82 +62,271 @@ class DiskManager:
 
         # Liste des pages désallouées (libres) pour réutilisation
         self.free_pages = [] 
+
+        # Un descripteur ouvert par fichier DataX.bin, gardé pendant toute la vie du DiskManager
+        self.fds = {}          # {file_idx: fd}
+        # Nombre de pages de chaque fichier, tenu en mémoire (plus de getsize à chaque AllocPage)
+        self.page_counts = {}  # {file_idx: nb_pages}
+        self.saved_page_counts = {}
+        # Les lectures anticipées du BufferManager peuvent ouvrir un fichier depuis un autre thread
+        self.fd_lock = threading.Lock()
+        # Plusieurs sessions peuvent allouer en même temps : une page ne doit être donnée qu'une fois
+        self.alloc_lock = threading.Lock()
+
+        # Mode "mmap" : chaque fichier est mappé par segments de taille fixe.
+        # Un segment doit commencer sur un multiple de ALLOCATIONGRANULARITY (offset de mmap)
+        self.use_mmap = self.config.dm_io_mode == "mmap"
+        segment_size = math.lcm(self.config.pagesize, mmap.ALLOCATIONGRANULARITY)
+        self.segment_size = segment_size * max(1, (1 << 20) // segment_size)  # ~1 Mo par segment
+        self.pages_per_segment = self.segment_size // self.config.pagesize
+        self.segments = {}         # {(file_idx, seg_idx): (mmap, memoryview)}
+        self.segment_lock = threading.Lock()
+        self.dirty_segments = set()
+
+        # Journal (WALManager) : les allocations y sont notées, None si la base n'est pas journalisée
+        self.wal = None
+        # LSN du journal à la dernière sauvegarde de l'état (dm_save.bin)
+        self.checkpoint_lsn = 0
         
         # Initialisation (chargement de l'état si existant)
         self.Init()
 
     def AllocPage(self) -> PageId:
         """Alloue une page : réutilise une page libre ou en crée une nouvelle"""
+        with self.alloc_lock:
+            return self._alloc_page()
+
+    def _alloc_page(self) -> PageId:
         # 1. Priorité : Réutiliser une page désallouée
         if self.free_pages:
-            return self.free_pages.pop(0)
+            page_id = self.free_pages.pop(0)
+            if self.wal is not None:
+                self.wal.LogAlloc(page_id)
+            return page_id
 
         # 2. Sinon : Créer une nouvelle page à la fin du dernier fichier
         # On cherche le fichier courant pour écrire
         for file_id in range(self.config.dm_maxfilecount):
-            file_path = self.get_file_path(file_id)
-            
-            # Si le fichier n'existe pas, on le crée
-            if not os.path.exists(file_path):
-                with open(file_path, "wb") as f:
-                    pass # Crée un fichier vide
-            
-            # Vérifier la taille du fichier
-            file_size = os.path.getsize(file_path)
-            # Calculer le nombre de pages actuelles
-            num_pages = file_size // self.config.pagesize
-            
-            
-            
-            with open(file_path, "ab") as f:
-                f.write(bytearray(self.config.pagesize))
-                
-            return PageId(file_id, num_pages)
+            # Ouvre (et crée si besoin) le fichier une seule fois
+            fd = self._get_fd(file_id)
+            num_pages = self.page_counts[file_id]
+
+            if self.use_mmap:
+                # Le fichier grandit d'un segment entier à la fois (mappé d'un coup)
+                self._get_segment(file_id, num_pages // self.pages_per_segment)
+            else:
+                # On agrandit le fichier d'une page (remplie de zéros) sans rien écrire
+                os.ftruncate(fd, (num_pages + 1) * self.config.pagesize)
+            self.page_counts[file_id] = num_pages + 1
+
+            page_id = PageId(file_id, num_pages)
+            if self.wal is not None:
+                self.wal.LogAlloc(page_id)
+            return page_id
 
         raise Exception("DiskManager : Espace disque saturé (MaxFileCount atteint)")
 
     def ReadPage(self, page_id: PageId, buff: bytearray):
         """Lit une page du disque vers le buffer fourni"""
-        file_path = self.get_file_path(page_id.FileIdx)
-        offset = page_id.PageIdx * self.config.pagesize
+        if self.use_mmap:
+            self._get_fd(page_id.FileIdx, create=False)
+            buff[:] = self.GetPageView(page_id)
+            return
 
-        if not os.path.exists(file_path):
-            raise Exception(f"Fichier introuvable : {file_path}")
+        fd = self._get_fd(page_id.FileIdx, create=False)
+        offset = page_id.PageIdx * self.config.pagesize
 
-        with open(file_path, "rb") as f:
-            f.seek(offset)
-            data = f.read(self.config.pagesize)
-            # Copie les données dans le bytearray fourni (mutable)
-            buff[:] = data
+        nb_read = _pread_into(fd, buff, offset)
+        if nb_read < self.config.pagesize:
+            # Page au-delà de la fin du fichier : on complète avec des zéros
+            buff[nb_read:self.config.pagesize] = bytes(self.config.pagesize - nb_read)
 
     def WritePage(self, page_id: PageId, buff: bytearray):
         """Écrit le contenu du buffer sur le disque"""
-        file_path = self.get_file_path(page_id.FileIdx)
+        if self.use_mmap:
+            self.GetPageView(page_id)[:] = buff
+            self.MarkDirty(page_id)
+            return
+
+        fd = self._get_fd(page_id.FileIdx)
         offset = page_id.PageIdx * self.config.pagesize
-        
-        # "r+b" permet de lire et écrire sans écraser tout le fichier
-        with open(file_path, "r+b") as f:
-            f.seek(offset)
-            f.write(buff)
+        _pwrite_all(fd, buff, offset)
+
+    def WritePages(self, page_id: PageId, buffers: list):
+        """Écrit des pages consécutives d'un même fichier (page_id, page_id + 1, ...) en une écriture vectorisée."""
+        if self.use_mmap:
+            for i, buff in enumerate(buffers):
+                self.WritePage(PageId(page_id.FileIdx, page_id.PageIdx + i), buff)
+            return
+
+        fd = self._get_fd(page_id.FileIdx)
+        _pwritev_all(fd, buffers, page_id.PageIdx * self.config.pagesize)
 
     def DeallocPage(self, page_id: PageId):
         """Marque une page comme libre pour réutilisation"""
         # On ajoute simplement l'ID à la liste des pages libres
-        self.free_pages.append(page_id)
+        with self.alloc_lock:
+            self.free_pages.append(page_id)
+            if self.wal is not None:
+                self.wal.LogFree(page_id)
+
+    def RedoAlloc(self, page_id: PageId):
+        """(reprise) Rejoue une allocation du journal : la page n'est plus libre."""
+        if page_id in self.free_pages:
+            self.free_pages.remove(page_id)
+        self._note_page(page_id)
+
+    def RedoFree(self, page_id: PageId):
+        """(reprise) Rejoue une libération du journal."""
+        if page_id not in self.free_pages:
+            self.free_pages.append(page_id)
+        self._note_page(page_id)
+
+    def _note_page(self, page_id: PageId):
+        """Le fichier contient au moins cette page (le nombre de pages en mmap vient de la sauvegarde)."""
+        count = page_id.PageIdx + 1
+        self.saved_page_counts[page_id.FileIdx] = max(self.saved_page_counts.get(page_id.FileIdx, 0), count)
+        if page_id.FileIdx in self.page_counts:
+            self.page_counts[page_id.FileIdx] = max(self.page_counts[page_id.FileIdx], count)
+
+    def GetPageView(self, page_id: PageId) -> memoryview:
+        """(mode mmap) Retourne la page sous forme de memoryview sur le fichier mappé, sans copie."""
+        seg_idx, page_in_seg = divmod(page_id.PageIdx, self.pages_per_segment)
+        _, view = self._get_segment(page_id.FileIdx, seg_idx)
+        start = page_in_seg * self.config.pagesize
+        return view[start:start + self.config.pagesize]
+
+    def Advise(self, page_id: PageId):
+        """(mode mmap) Demande au noyau de charger la page à l'avance (madvise WILLNEED)."""
+        if not hasattr(mmap, "MADV_WILLNEED"):
+            return
+        seg_idx, page_in_seg = divmod(page_id.PageIdx, self.pages_per_segment)
+        mm, _ = self._get_segment(page_id.FileIdx, seg_idx)
+        start = page_in_seg * self.config.pagesize
+        # madvise exige une adresse alignée sur la page système
+        aligned = start - start % mmap.PAGESIZE
+        mm.madvise(mmap.MADV_WILLNEED, aligned, start + self.config.pagesize - aligned)
+
+    def MarkDirty(self, page_id: PageId):
+        """(mode mmap) Note que le segment de la page a été modifié (à synchroniser par Sync)."""
+        seg_idx = page_id.PageIdx // self.pages_per_segment
+        self.dirty_segments.add((page_id.FileIdx, seg_idx))
+
+    def Sync(self):
+        """(mode mmap) msync des segments modifiés."""
+        # Échange plutôt que clear() : un MarkDirty concurrent n'est pas perdu
+        dirty_segments, self.dirty_segments = self.dirty_segments, set()
+        for key in sorted(dirty_segments):
+            mapping = self.segments.get(key)
+            if mapping is not None:
+                mapping[0].flush()
+
+    def Fsync(self):
+        """Force l'écriture sur le support des pages déjà écrites (fsync / msync)."""
+        self.Sync()
+        for fd in self.fds.values():
+            os.fsync(fd)
+
+    def _get_segment(self, file_idx, seg_idx):
+        """Retourne (mmap, memoryview) du segment, en agrandissant le fichier si besoin."""
+        key = (file_idx, seg_idx)
+        mapping = self.segments.get(key)
+        if mapping is not None:
+            return mapping
+
+        fd = self._get_fd(file_idx)
+        # Deux sessions peuvent demander le même segment : il n'est mappé qu'une fois
+        with self.segment_lock:
+            mapping = self.segments.get(key)
+            if mapping is not None:
+                return mapping
+            end = (seg_idx + 1) * self.segment_size
+            if os.fstat(fd).st_size < end:
+                os.ftruncate(fd, end)
+            mm = mmap.mmap(fd, self.segment_size, access=mmap.ACCESS_WRITE, offset=seg_idx * self.segment_size)
+            mapping = (mm, memoryview(mm))
+            self.segments[key] = mapping
+        return mapping
 
     def get_file_path(self, file_idx):
         """Retourne le chemin complet de DataX.bin"""
         return os.path.join(self.bindata_path, f"Data{file_idx}.bin")
 
+    def _get_fd(self, file_idx, create=True):
+        """Retourne le descripteur de DataX.bin (ouvert au premier accès seulement)."""
+        fd = self.fds.get(file_idx)
+        if fd is not None:
+            return fd
+
+        with self.fd_lock:
+            if file_idx in self.fds:
+                return self.fds[file_idx]
+            return self._open_file(file_idx, create)
+
+    def _open_file(self, file_idx, create):
+        file_path = self.get_file_path(file_idx)
+        if not create and not os.path.exists(file_path):
+            raise Exception(f"Fichier introuvable : {file_path}")
+
+        # O_BINARY n'existe que sous Windows
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        fd = os.open(file_path, flags, 0o644)
+        nb_pages = os.fstat(fd).st_size // self.config.pagesize
+        if self.use_mmap and file_idx in self.saved_page_counts:
+            # En mmap, le fichier est agrandi par segments : sa taille ne donne pas le nombre de pages
+            nb_pages = self.saved_page_counts[file_idx]
+        self.page_counts[file_idx] = nb_pages
+        self.fds[file_idx] = fd
+        return fd
+
     def Init(self):
-        """Charge l'état du DiskManager (pages libres)"""
+        """Charge l'état du DiskManager (pages libres, nombre de pages par fichier)"""
         save_path = os.path.join(self.bindata_path, "dm_save.bin")
         if os.path.exists(save_path):
             with open(save_path, "rb") as f:
-                self.free_pages = pickle.load(f)
+                state = pickle.load(f)
+            if isinstance(state, list):
+                # Ancien format : uniquement la liste des pages libres
+                self.free_pages = state
+            else:
+                self.free_pages = state["free_pages"]
+                self.saved_page_counts = state.get("page_counts", {})
+                self.checkpoint_lsn = state.get("checkpoint_lsn", 0)
 
-    def Finish(self):
-        """Sauvegarde l'état du DiskManager (pages libres)"""
+    def SaveState(self):
+        """Sauvegarde l'état du DiskManager (pages libres, nombre de pages par fichier)"""
+        self.saved_page_counts.update(self.page_counts)
+        if self.wal is not None:
+            # L'état ne doit pas être en avance sur le journal
+            self.wal.Flush()
+            self.checkpoint_lsn = self.wal.next_lsn
         save_path = os.path.join(self.bindata_path, "dm_save.bin")
-        with open(save_path, "wb") as f:
-            pickle.dump(self.free_pages, f)
\ No newline at end of file
+        # Fichier temporaire puis renommage : un arrêt brutal laisse l'ancienne sauvegarde intacte
+        with open(save_path + ".tmp", "wb") as f:
+            pickle.dump({"free_pages": self.free_pages, "page_counts": self.saved_page_counts,
+                         "checkpoint_lsn": self.checkpoint_lsn}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(save_path + ".tmp", save_path)
+
+    def Finish(self):
+        """Sauvegarde l'état du DiskManager (pages libres) et ferme les fichiers"""
+        self.SaveState()
+
+        if self.wal is not None:
+            # Le journal ne peut être vidé (WALManager.Checkpoint) qu'une fois les pages sur le support
+            self.Fsync()
+        self.Sync()
+        for mm, view in self.segments.values():
+            try:
+                view.release()
+                mm.close()
+            except BufferError:
+                # Une page est encore référencée ailleurs : le mapping sera libéré par le GC
+                pass
+        self.segments.clear()
+
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds.clear()
+        self.page_counts.clear()
\ No newline at end of file
@@ -0,0 +1,210 @@
+import struct
+import threading
+import zlib
+from managers.page_id import PageId
+from managers.record_id import RecordId
+from managers.buffer_manager import SHARED, EXCLUSIVE
+from managers.btree_index import key_codec, NO_PAGE
+
+# En-tête d'un bucket : profondeur locale (B), nb d'entrées (H), page de débordement (fichier, page)
+BUCKET_HEADER = struct.Struct("<BHii")
+# Au-delà, un bucket plein déborde dans une chaîne de pages au lieu d'éclater
+MAX_DEPTH = 24
+
+
+class HashIndex:
+    """
+    Index de hachage extensible (extendible hashing) pour les égalités Colonne = Constante.
+    Les buckets sont des pages du DiskManager ; le répertoire (profondeur globale + PageId
+    des buckets) est petit et vit dans le catalogue, sauvegardé par DBManager.SaveState.
+    Les doublons d'une même clé qui remplissent un bucket partent en pages de débordement.
+    """
+    KIND = "HASH"
+    SUPPORTED_OPS = ("=",)
+
+    def __init__(self, name: str, relation, column: str, global_depth: int = 0, directory: list = None):
+        self.name = name
+        self.relation = relation
+        self.column = column
+        self.col_idx = [cname for cname, _ in relation.schema].index(column)
+        self.disk_manager = relation.disk_manager
+        self.buffer_manager = relation.buffer_manager
+
+        key_fmt, self.normalize = key_codec(relation.schema[self.col_idx][1])
+        self.key_struct = struct.Struct("<" + key_fmt)
+        self.entry = struct.Struct("<" + key_fmt + "iii")
+        self.capacity = (self.disk_manager.config.pagesize - BUCKET_HEADER.size) // self.entry.size
+        self.strip_keys = key_fmt.endswith("s")
+        if self.capacity < 1:
+            raise ValueError(f"Index {name} : clé trop grande pour la taille de page")
+
+        # Un éclatement change le répertoire et déplace des entrées : Insert, Delete et Search
+        # (qui lit toute la chaîne d'un coup) se font un à la fois
+        self.lock = threading.Lock()
+
+        self.global_depth = global_depth
+        self.directory = directory
+        if self.directory is None:
+            with self.buffer_manager.SystemTransaction():
+                self.directory = [self._new_page(0, [])]
+
+    def GetState(self) -> dict:
+        """Ce qu'il faut garder dans le catalogue pour rouvrir l'index."""
+        return {"kind": self.KIND, "column": self.column,
+                "global_depth": self.global_depth, "directory": list(self.directory)}
+
+    def EstimatePageReads(self, nb_entries: int, nb_matching: float) -> float:
+        """Pages d'index lues par un Search qui rend nb_matching entrées (pour le planificateur)."""
+        return 1 + nb_matching / self.capacity
+
+    # Opérations
+    def Insert(self, value, rid: RecordId):
+        key = self.normalize(value)
+        entry = (key, (rid.page_id.FileIdx, rid.page_id.PageIdx, rid.slot_idx))
+        h = self._hash(key)
+        # Transaction système, comme pour BTreeIndex : un éclatement n'est jamais défait
+        with self.lock, self.buffer_manager.SystemTransaction():
+            self._insert(h, entry)
+
+    def Delete(self, value, rid: RecordId):
+        key = self.normalize(value)
+        entry = (key, (rid.page_id.FileIdx, rid.page_id.PageIdx, rid.slot_idx))
+        with self.lock, self.buffer_manager.SystemTransaction():
+            page_id = self.directory[self._hash(key) & ((1 << self.global_depth) - 1)]
+            while page_id is not None:
+                local_depth, entries, overflow = self._read_page(page_id)
+                if entry in entries:
+                    entries.remove(entry)
+                    self._write_page(page_id, local_depth, entries, overflow)
+                    return
+                page_id = overflow
+
+    def Search(self, low=None, high=None):
+        """Générateur des RecordId de clé égale à low (un hachage ne sait pas faire d'intervalle)."""
+        if low is None or high is None or low != high:
+            raise Exception(f"Index {self.name} : un index HASH ne gère que l'égalité")
+        key = self.normalize(low)
+        with self.lock:
+            head_id = self.directory[self._hash(key) & ((1 << self.global_depth) - 1)]
+            chain = self._read_chain(head_id)
+        for entry_key, rid in chain:
+            if entry_key == key:
+                yield RecordId(PageId(rid[0], rid[1]), rid[2])
+
+    # Algorithme
+    def _insert(self, h: int, entry):
+        while True:
+            head_id = self.directory[h & ((1 << self.global_depth) - 1)]
+            local_depth, entries, overflow = self._read_page(head_id)
+            if len(entries) < self.capacity:
+                entries.append(entry)
+                self._write_page(head_id, local_depth, entries, overflow)
+                return
+
+            chain = self._read_chain(head_id)
+            if local_depth >= MAX_DEPTH or all(self._hash(k) == h for k, _ in chain):
+                # Éclater ne séparerait rien (même hachage partout) : on déborde
+                self._append_overflow(head_id, entry)
+                return
+            self._split(head_id, local_depth, chain)
+
+    def _hash(self, key) -> int:
+        # crc32 : stable d'un lancement à l'autre (contrairement à hash() sur les str)
+        raw = key if self.strip_keys else self.key_struct.pack(key)
+        return zlib.crc32(raw)
+
+    def _split(self, head_id: PageId, local_depth: int, chain: list):
+        """Éclate un bucket en deux selon le bit local_depth du hachage."""
+        old_overflows = []
+        overflow = self._read_page(head_id)[2]
+        while overflow is not None:
+            old_overflows.append(overflow)
+            overflow = self._read_page(overflow)[2]
+
+        bit = 1 << local_depth
+        stay = [e for e in chain if not self._hash(e[0]) & bit]
+        move = [e for e in chain if self._hash(e[0]) & bit]
+        self._write_chain(head_id, local_depth + 1, stay)
+        # (les deux moitiés d'une chaîne débordée peuvent encore dépasser une page)
+        new_id = self.disk_manager.AllocPage()
+        self._write_chain(new_id, local_depth + 1, move)
+        wal = self.buffer_manager.wal
+        if wal is not None:
+            # Le répertoire vit dans le catalogue : seul l'éclatement est journalisé
+            wal.LogCatalog("SPLIT_BUCKET", self.relation.name, self.name, head_id, new_id, local_depth)
+        # Les pages de débordement de l'ancien bucket ne sont rendues qu'une fois l'éclatement
+        # écrit : si une étape lève une exception, les octets remis en place pointent encore dessus
+        for page_id in old_overflows:
+            self.disk_manager.DeallocPage(page_id)
+        self.SplitDirectory(head_id, new_id, local_depth)
+
+    def SplitDirectory(self, head_id: PageId, new_id: PageId, local_depth: int):
+        """Met à jour le répertoire après l'éclatement de head_id (aussi rejoué par la reprise)."""
+        if local_depth == self.global_depth:
+            # Le répertoire double : chaque bucket est pointé deux fois
+            self.directory = self.directory + self.directory
+            self.global_depth += 1
+        bit = 1 << local_depth
+        for i, page_id in enumerate(self.directory):
+            if page_id == head_id and i & bit:
+                self.directory[i] = new_id
+
+    def _append_overflow(self, head_id: PageId, entry):
+        page_id = head_id
+        while True:
+            local_depth, entries, overflow = self._read_page(page_id)
+            if len(entries) < self.capacity:
+                entries.append(entry)
+                self._write_page(page_id, local_depth, entries, overflow)
+                return
+            if overflow is None:
+                new_id = self._new_page(local_depth, [entry])
+                self._write_page(page_id, local_depth, entries, new_id)
+                return
+            page_id = overflow
+
+    def _write_chain(self, head_id: PageId, local_depth: int, entries: list):
+        """Écrit des entrées à partir de head_id, en ajoutant des pages de débordement si besoin."""
+        chunks = [entries[i:i + self.capacity] for i in range(0, len(entries), self.capacity)] or [[]]
+        next_id = None
+        for chunk in reversed(chunks[1:]):
+            next_id = self._new_page(local_depth, chunk, next_id)
+        self._write_page(head_id, local_depth, chunks[0], next_id)
+
+    # Pages
+    def _read_chain(self, head_id: PageId) -> list:
+        entries = []
+        page_id = head_id
+        while page_id is not None:
+            _, page_entries, page_id = self._read_page(page_id)
+            entries.extend(page_entries)
+        return entries
+
+    def _new_page(self, local_depth: int, entries: list, overflow: PageId = None) -> PageId:
+        page_id = self.disk_manager.AllocPage()
+        self._write_page(page_id, local_depth, entries, overflow)
+        return page_id
+
+    def _read_page(self, page_id: PageId):
+        """Retourne (profondeur locale, entrées, page de débordement ou None)."""
+        buff = self.buffer_manager.GetPage(page_id, SHARED)
+        try:
+            local_depth, count, of_file, of_page = BUCKET_HEADER.unpack_from(buff, 0)
+            end = BUCKET_HEADER.size + count * self.entry.size
+            entries = []
+            for key, f, p, s in self.entry.iter_unpack(buff[BUCKET_HEADER.size:end]):
+                entries.append((key.rstrip(b'\x00') if self.strip_keys else key, (f, p, s)))
+        finally:
+            self.buffer_manager.FreePage(page_id, False, SHARED)
+        overflow = None if (of_file, of_page) == NO_PAGE else PageId(of_file, of_page)
+        return local_depth, entries, overflow
+
+    def _write_page(self, page_id: PageId, local_depth: int, entries: list, overflow: PageId = None):
+        ptr = NO_PAGE if overflow is None else (overflow.FileIdx, overflow.PageIdx)
+        data = bytearray(BUCKET_HEADER.pack(local_depth, len(entries), *ptr))
+        for key, rid in entries:
+            data += self.entry.pack(key, *rid)
+
+        self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+        self.buffer_manager.LogWrite(page_id, 0, data)
+        self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
@@ -1,6 +1,10 @@
 import struct
+import threading
+import zlib
+from itertools import islice
 from managers.page_id import PageId
 from managers.record_id import RecordId
+from managers.buffer_manager import SHARED, EXCLUSIVE
 
 class Record:
     def __init__(self, values=None):
@@ -22,10 +26,33 @@ class Relation:
         # Liste pour suivre les pages de données allouées
         self.allocated_pages = []
 
+        # Free-space map : {PageId: nombre de slots libres}
+        # On n'y garde que les pages qui ont encore de la place (les pages pleines en sortent)
+        self.free_space = {}
+        # Plusieurs sessions insèrent en même temps : lock protège allocated_pages et free_space
+        # (le contenu des pages est protégé par leur latch dans le buffer pool)
+        self.lock = threading.Lock()
+        # Slots (page_id, slot_idx) libérés par des transactions en cours : ils leur restent réservés
+        # jusqu'à leur fin, pour qu'un rollback remette le record à sa place (protégé par lock)
+        self.pending_free = set()
+
+        # Index secondaires : {nom_index: index} (voir managers/btree_index.py)
+        self.indexes = {}
+
+        # Statistiques de la commande ANALYZE (voir managers/statistics.py), None si jamais analysée
+        self.stats = None
+
         self.record_size = self._compute_record_size()
         # Formule  : N = PageSize / (1 + record_size)
         self.slot_count = self.disk_manager.config.pagesize // (1 + self.record_size)
 
+        # Codec précompilé du schéma : un seul struct.Struct pour tout le record (ex: "<if10s")
+        self.record_struct = struct.Struct(self._compute_struct_format())
+        # Conversion Python -> struct pour chaque colonne (CHAR -> bytes)
+        self._col_encoders = [self._get_column_encoder(type_col) for _, type_col in self.schema]
+        # Après unpack, seules les colonnes CHAR sont à retoucher (\x00 de fin + décodage UTF-8)
+        self._char_cols = [i for i, (_, type_col) in enumerate(self.schema) if "CHAR" in type_col.upper()]
+
     
     def GetDataPages(self):
         """Retourne la liste des pages de données de cette relation."""
@@ -33,63 +60,142 @@ class Relation:
 
     # Gestion des Pages (TP5 + TP7)
     def add_data_page(self) -> PageId:
-        """Alloue une nouvelle page, l'initialise et la stocke dans la liste."""
-        page_id = self.disk_manager.AllocPage()
-        
-        buff = self.buffer_manager.GetPage(page_id)
-        # Initialisation à 0 (Bitmap vide)
-        for i in range(len(buff)):
-            buff[i] = 0
-            
-        self.buffer_manager.FreePage(page_id, True)
-        
-        #On mémorise que cette page appartient à la relation
-        self.allocated_pages.append(page_id)
+        """
+        Alloue une nouvelle page, l'initialise et la stocke dans la liste.
+        Transaction système : la page reste à la table même si la transaction qui l'a demandée
+        est annulée (d'autres sessions ont pu y insérer).
+        """
+        with self.buffer_manager.SystemTransaction():
+            page_id = self.disk_manager.AllocPage()
+
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            # Initialisation à 0 (Bitmap vide)
+            self.buffer_manager.LogWrite(page_id, 0, bytes(len(buff)))
+
+            self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
+            self._log_catalog("TABLE_PAGE", page_id)
+
+        #On mémorise que cette page appartient à la relation (une fois journalisée)
+        with self.lock:
+            self.allocated_pages.append(page_id)
+            self.free_space[page_id] = self.slot_count
         return page_id
 
     def get_free_data_page_id(self) -> PageId:
-        """Cherche une page avec de la place"""
-        
+        """Cherche une page avec de la place (free-space map), sinon en alloue une nouvelle."""
+        with self.lock:
+            page_id = next(iter(self.free_space), None)
+        if page_id is not None:
+            return page_id
         return self.add_data_page()
 
+    def rebuild_free_space(self):
+        """Reconstruit la free-space map en relisant la bitmap de chaque page (anciens catalogues)."""
+        free_space = {}
+        for page_id in list(self.allocated_pages):
+            buff = self.buffer_manager.GetPage(page_id, SHARED)
+            nb_free = bytes(buff[:self.slot_count]).count(0)
+            self.buffer_manager.FreePage(page_id, False, SHARED)
+            if nb_free > 0:
+                free_space[page_id] = nb_free
+        with self.lock:
+            self.free_space = free_space
+
+    def _consume_slot(self, page_id: PageId):
+        """Met à jour la free-space map après l'occupation d'un slot."""
+        with self.lock:
+            if page_id in self.free_space:
+                remaining = self.free_space[page_id] - 1
+                if remaining > 0:
+                    self.free_space[page_id] = remaining
+                else:
+                    del self.free_space[page_id]
+
+    def _free_slots(self, page_id: PageId, count: int = 1):
+        """Met à jour la free-space map après la libération de slots."""
+        with self.lock:
+            self.free_space[page_id] = self.free_space.get(page_id, 0) + count
+
+    def _release_slot(self, page_id: PageId, slot_idx: int):
+        """Fin de la transaction qui a supprimé le record : le slot redevient disponible (sauf rollback)."""
+        with self.lock:
+            if (page_id, slot_idx) not in self.pending_free:
+                return
+            self.pending_free.remove((page_id, slot_idx))
+        self._free_slots(page_id)
+
   
     def write_record_to_data_page(self, record: Record, page_id: PageId) -> RecordId:
-        buff = self.buffer_manager.GetPage(page_id)
-        
-        # Trouver un slot libre dans la Bitmap
-        free_slot_idx = -1
-        for i in range(self.slot_count):
-            if buff[i] == 0:
-                free_slot_idx = i
-                break
-        
-        if free_slot_idx == -1:
-            self.buffer_manager.FreePage(page_id, False)
+        rid = self._write_record(record, page_id)
+        if rid is None:
             raise Exception("Page pleine !")
+        return rid
 
-        # Marquer occupé
-        buff[free_slot_idx] = 1
-        
-        # Écrire les données
-        offset_start = self.slot_count 
-        position = offset_start + (free_slot_idx * self.record_size)
-        self._write_record_to_buffer(record, buff, position)
-        
-        self.buffer_manager.FreePage(page_id, True)
-        return RecordId(page_id, free_slot_idx)
+    def _write_record(self, record: Record, page_id: PageId) -> RecordId:
+        """Écrit le record dans un slot libre de la page ; None si la page est pleine."""
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+
+            # Trouver un slot libre dans la Bitmap (sauf ceux réservés à un rollback)
+            bitmap = bytes(buff[:self.slot_count])
+            free_slot_idx = bitmap.find(0)
+            while free_slot_idx != -1 and self.pending_free and (page_id, free_slot_idx) in self.pending_free:
+                free_slot_idx = bitmap.find(0, free_slot_idx + 1)
+
+            if free_slot_idx == -1:
+                self.buffer_manager.FreePage(page_id, False, EXCLUSIVE)
+                # La page est pleine : elle n'a plus rien à faire dans la free-space map
+                with self.lock:
+                    self.free_space.pop(page_id, None)
+                return None
+
+            rid = RecordId(page_id, free_slot_idx)
+            data = self._encode_record(record)
+            self._log_undo("INSERT", rid, data)
+
+            # Marquer occupé
+            self.buffer_manager.LogWrite(page_id, free_slot_idx, b'\x01')
+
+            # Écrire les données
+            offset_start = self.slot_count
+            position = offset_start + (free_slot_idx * self.record_size)
+            self.buffer_manager.LogWrite(page_id, position, data)
+
+            self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
+        self._consume_slot(page_id)
+        return rid
 
     def read_record_from_page(self, page_id: PageId, slot_idx: int) -> Record:
         """Lit un record spécifique"""
-        buff = self.buffer_manager.GetPage(page_id)
+        buff = self.buffer_manager.GetPage(page_id, SHARED)
         offset_start = self.slot_count
         position = offset_start + (slot_idx * self.record_size)
         
         rec = Record()
-        self._read_from_buffer(rec, buff, position)
-        
-        self.buffer_manager.FreePage(page_id, False)
+        try:
+            self._read_from_buffer(rec, buff, position)
+        finally:
+            self.buffer_manager.FreePage(page_id, False, SHARED)
         return rec
 
+    def read_page_records(self, page_id: PageId) -> list:
+        """Décode tous les records occupés d'une page en ne l'épinglant qu'une seule fois."""
+        buff = self.buffer_manager.GetPage(page_id, SHARED)
+        records = []
+        try:
+            bitmap = bytes(buff[:self.slot_count])
+            # Tous les slots de la page sont décodés d'un coup par le codec compilé
+            slots_end = self.slot_count + self.slot_count * self.record_size
+            rows = self.record_struct.iter_unpack(buff[self.slot_count:slots_end])
+            for slot_idx, (used, row) in enumerate(zip(bitmap, rows)):
+                if used:
+                    rec = Record(self._decode_row(row))
+                    rec.rid = RecordId(page_id, slot_idx)
+                    records.append(rec)
+        finally:
+            self.buffer_manager.FreePage(page_id, False, SHARED)
+        return records
+
     
     def DeleteRecord(self, record: Record):
         if record.rid is None:
@@ -98,10 +204,29 @@ class Relation:
         page_id = record.rid.page_id
         slot_idx = record.rid.slot_idx
         
-        buff = self.buffer_manager.GetPage(page_id)
-        # On remet le bit à 0 dans la bitmap
-        buff[slot_idx] = 0
-        self.buffer_manager.FreePage(page_id, True)
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            if buff[slot_idx] == 0:
+                # Slot déjà libre (ex: supprimé par une autre session) : rien à faire
+                self.buffer_manager.FreePage(page_id, False, EXCLUSIVE)
+                return
+            # Valeurs réellement stockées, pour retirer les bonnes entrées des index
+            old_data = self._read_slot(buff, slot_idx)
+            self._log_undo("DELETE", record.rid, old_data)
+            # On remet le bit à 0 dans la bitmap
+            self.buffer_manager.LogWrite(page_id, slot_idx, b'\x00')
+            # Le slot n'est pas repris avant la fin de la transaction
+            with self.lock:
+                self.pending_free.add((page_id, slot_idx))
+            self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
+
+        if self.indexes:
+            old_values = self._decode_row(self.record_struct.unpack(old_data))
+            for index in self.indexes.values():
+                index.Delete(old_values[index.col_idx], record.rid)
+
+        # Le slot libéré redevient disponible pour les prochains InsertRecord, à la fin de la transaction
+        self._at_end(self._release_slot, page_id, slot_idx)
 
     def UpdateRecord(self, record: Record, new_values: list):
         if record.rid is None:
@@ -110,20 +235,218 @@ class Relation:
         page_id = record.rid.page_id
         slot_idx = record.rid.slot_idx
         
-        buff = self.buffer_manager.GetPage(page_id)
-        offset_start = self.slot_count
-        position = offset_start + (slot_idx * self.record_size)
-        
-        # Écrasement des données
-        temp_rec = Record(new_values)
-        self._write_record_to_buffer(temp_rec, buff, position)
-        
-        self.buffer_manager.FreePage(page_id, True)
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            offset_start = self.slot_count
+            position = offset_start + (slot_idx * self.record_size)
+            old_data = self._read_slot(buff, slot_idx)
+            old_values = self._read_slot_values(buff, slot_idx) if self.indexes else None
+
+            # Écrasement des données
+            new_data = self._encode_record(Record(new_values))
+            self._log_undo("UPDATE", record.rid, old_data, new_data)
+            self.buffer_manager.LogWrite(page_id, position, new_data)
+            new_values = self._read_slot_values(buff, slot_idx) if self.indexes else None
+
+            self.buffer_manager.FreePage(page_id, True, EXCLUSIVE)
+
+        # Seuls les index dont la clé a changé sont touchés
+        for index in self.indexes.values():
+            old_key = old_values[index.col_idx]
+            new_key = new_values[index.col_idx]
+            if old_key != new_key:
+                index.Delete(old_key, record.rid)
+                index.Insert(new_key, record.rid)
 
     
     def InsertRecord(self, record: Record) -> RecordId:
-        page_id = self.get_free_data_page_id()
-        return self.write_record_to_data_page(record, page_id)
+        # Une autre session peut avoir rempli la page entre-temps : on en prend une autre
+        rid = None
+        while rid is None:
+            page_id = self.get_free_data_page_id()
+            rid = self._write_record(record, page_id)
+        for index in self.indexes.values():
+            index.Insert(record.values[index.col_idx], rid)
+        return rid
+
+    def BulkInsert(self, rows) -> int:
+        """
+        Chargement en masse : remplit des pages entières (bitmap + slots) en une passe
+        et les écrit directement via le DiskManager, sans passer par le buffer pool.
+        rows : itérable de listes de valeurs déjà converties. Retourne le nombre de records insérés.
+        Les pages ne sont rattachées à la table qu'à la fin (même en cas d'erreur) : aucune autre
+        session n'y écrit avant qu'elles soient journalisées.
+        """
+        pagesize = self.disk_manager.config.pagesize
+        pack_into = self.record_struct.pack_into
+        encoders = self._col_encoders
+        wal = self.buffer_manager.wal
+        rows = iter(rows)
+        count = 0
+        new_pages = []   # [(page_id, nombre de records)]
+
+        try:
+            while True:
+                batch = list(islice(rows, self.slot_count))
+                if not batch:
+                    break
+
+                page = bytearray(pagesize)
+                nb = len(batch)
+                # Bitmap : les nb premiers slots sont occupés
+                page[:nb] = b'\x01' * nb
+                position = self.slot_count
+                for values in batch:
+                    pack_into(page, position, *[enc(v) for enc, v in zip(encoders, values)])
+                    position += self.record_size
+
+                with self.buffer_manager.SystemTransaction():
+                    page_id = self.disk_manager.AllocPage()
+                # Une page réutilisée pourrait encore avoir une vieille copie en RAM
+                self.buffer_manager.DiscardPage(page_id)
+                self.disk_manager.WritePage(page_id, page)
+                new_pages.append((page_id, nb))
+                if wal is not None:
+                    # Sans journaliser les records : une somme de contrôle par slot suffit pour les défaire
+                    ends = range(self.slot_count + self.record_size, position + 1, self.record_size)
+                    self._log_undo("BULK", page_id, [zlib.crc32(page[end - self.record_size:end]) for end in ends])
+
+                for index in self.indexes.values():
+                    for slot_idx, values in enumerate(batch):
+                        index.Insert(values[index.col_idx], RecordId(page_id, slot_idx))
+                count += nb
+        finally:
+            if wal is not None and new_pages:
+                # Les pages n'ont pas été journalisées : elles sont mises sur le support avant
+                # d'être rattachées à la table dans le journal
+                self.disk_manager.Fsync()
+                with self.buffer_manager.SystemTransaction():
+                    for page_id, _ in new_pages:
+                        wal.LogNewPage(page_id)
+                        self._log_catalog("TABLE_PAGE", page_id)
+            with self.lock:
+                for page_id, nb in new_pages:
+                    self.allocated_pages.append(page_id)
+                    if nb < self.slot_count:
+                        self.free_space[page_id] = self.slot_count - nb
+        return count
+
+    # Annulation (rollback d'une commande, reprise après panne)
+    def UndoRecord(self, op: str, *args):
+        """
+        Défait un changement de record journalisé par _log_undo, sans toucher aux autres records de
+        la page. Le contenu du slot est vérifié d'abord : un changement jamais arrivé sur la page,
+        déjà défait, ou recouvert depuis par une autre session n'est pas refait, et les entrées
+        d'index sont remises sans doublon. Défaire deux fois revient donc à défaire une fois.
+        """
+        if op == "INSERT":
+            self._undo_insert(*args)
+        elif op == "DELETE":
+            self._undo_delete(*args)
+        elif op == "UPDATE":
+            self._undo_update(*args)
+        elif op == "BULK":
+            self._undo_bulk(*args)
+
+    def _undo_insert(self, rid: RecordId, data: bytes):
+        page_id, slot_idx = rid.page_id, rid.slot_idx
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            removed = buff[slot_idx] != 0 and self._read_slot(buff, slot_idx) == data
+            if removed:
+                self.buffer_manager.LogWrite(page_id, slot_idx, b'\x00')
+            self.buffer_manager.FreePage(page_id, removed, EXCLUSIVE)
+
+        values = self._decode_row(self.record_struct.unpack(data))
+        for index in self.indexes.values():
+            index.Delete(values[index.col_idx], rid)
+        if removed:
+            self._free_slots(page_id)
+
+    def _undo_delete(self, rid: RecordId, data: bytes):
+        page_id, slot_idx = rid.page_id, rid.slot_idx
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            # Le slot est resté réservé (pending_free) : il est libre, ou le record y est déjà revenu
+            free = buff[slot_idx] == 0
+            if free:
+                self.buffer_manager.LogWrite(page_id, self.slot_count + slot_idx * self.record_size, data)
+                self.buffer_manager.LogWrite(page_id, slot_idx, b'\x01')
+            restored = free or self._read_slot(buff, slot_idx) == data
+            self.buffer_manager.FreePage(page_id, free, EXCLUSIVE)
+        with self.lock:
+            self.pending_free.discard((page_id, slot_idx))
+
+        if restored:
+            values = self._decode_row(self.record_struct.unpack(data))
+            for index in self.indexes.values():
+                index.Delete(values[index.col_idx], rid)
+                index.Insert(values[index.col_idx], rid)
+
+    def _undo_update(self, rid: RecordId, old_data: bytes, new_data: bytes):
+        page_id, slot_idx = rid.page_id, rid.slot_idx
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            used = buff[slot_idx] != 0
+            current = self._read_slot(buff, slot_idx)
+            undone = used and current == new_data
+            if undone:
+                self.buffer_manager.LogWrite(page_id, self.slot_count + slot_idx * self.record_size, old_data)
+            self.buffer_manager.FreePage(page_id, undone, EXCLUSIVE)
+
+        if used and current in (old_data, new_data):
+            old_values = self._decode_row(self.record_struct.unpack(old_data))
+            new_values = self._decode_row(self.record_struct.unpack(new_data))
+            for index in self.indexes.values():
+                old_key = old_values[index.col_idx]
+                new_key = new_values[index.col_idx]
+                if old_key != new_key:
+                    index.Delete(new_key, rid)
+                    index.Delete(old_key, rid)
+                    index.Insert(old_key, rid)
+
+    def _undo_bulk(self, page_id: PageId, checksums: list):
+        with self.buffer_manager.SystemTransaction():
+            buff = self.buffer_manager.GetPage(page_id, EXCLUSIVE)
+            # Slots qui contiennent encore le record chargé (bit déjà remis à 0 ou non)
+            ours = [slot_idx for slot_idx, crc in enumerate(checksums)
+                    if zlib.crc32(self._read_slot(buff, slot_idx)) == crc]
+            removed = [slot_idx for slot_idx in ours if buff[slot_idx] != 0]
+            for slot_idx in removed:
+                self.buffer_manager.LogWrite(page_id, slot_idx, b'\x00')
+            rows = [self._read_slot_values(buff, slot_idx) for slot_idx in ours] if self.indexes else []
+            self.buffer_manager.FreePage(page_id, bool(removed), EXCLUSIVE)
+
+        for index in self.indexes.values():
+            for slot_idx, values in zip(ours, rows):
+                index.Delete(values[index.col_idx], RecordId(page_id, slot_idx))
+        with self.lock:
+            attached = page_id in self.allocated_pages
+        if attached:
+            if removed:
+                self._free_slots(page_id, len(removed))
+        else:
+            # Page jamais rattachée (panne avant la fin du chargement) : elle retourne aux pages libres
+            with self.buffer_manager.SystemTransaction():
+                if page_id not in self.disk_manager.free_pages:
+                    self.disk_manager.DeallocPage(page_id)
+
+    def _log_undo(self, op: str, *args):
+        """Journalise un changement de record de la transaction en cours (si la base est journalisée)."""
+        if self.buffer_manager.wal is not None:
+            self.buffer_manager.wal.LogUndo(op, self.name, *args)
+
+    def _at_end(self, func, *args):
+        """Appelle func(*args) à la fin de la transaction en cours (tout de suite sans journal)."""
+        if self.buffer_manager.wal is not None:
+            self.buffer_manager.wal.AtEnd(func, *args)
+        else:
+            func(*args)
+
+    def _log_catalog(self, op: str, *args):
+        """Journalise un changement du catalogue concernant cette table (si la base est journalisée)."""
+        if self.buffer_manager.wal is not None:
+            self.buffer_manager.wal.LogCatalog(op, self.name, *args)
 
     
     def _compute_record_size(self):
@@ -139,44 +462,40 @@ class Relation:
             return int(type_col.split("(")[1].split(")")[0])
         raise ValueError(f"Type inconnu: {type_col}")
 
-    def _write_record_to_buffer(self, record, buff, pos):
-        cursor = pos
-        for i, (col_name, col_type) in enumerate(self.schema):
-            val = record.values[i]
-            col_type = col_type.upper()
-            
-            if col_type == "INT":
-                struct.pack_into('<i', buff, cursor, int(val))
-                cursor += 4
-            elif col_type == "FLOAT":
-                struct.pack_into('<f', buff, cursor, float(val))
-                cursor += 4
-            elif "CHAR" in col_type:
-                max_len = self._get_column_size(col_type)
-                s_bytes = str(val).encode('utf-8')[:max_len]
-                buff[cursor:cursor+len(s_bytes)] = s_bytes
-                padding = max_len - len(s_bytes)
-                if padding > 0:
-                    buff[cursor+len(s_bytes):cursor+max_len] = b'\x00'*padding
-                cursor += max_len
+    def _compute_struct_format(self):
+        fmt = "<"
+        for _, type_col in self.schema:
+            type_col = type_col.upper()
+            if type_col == "INT": fmt += "i"
+            elif type_col == "FLOAT": fmt += "f"
+            else: fmt += f"{self._get_column_size(type_col)}s"
+        return fmt
+
+    def _get_column_encoder(self, type_col: str):
+        type_col = type_col.upper()
+        if type_col == "INT": return int
+        if type_col == "FLOAT": return float
+        # struct tronque / complète avec des \x00 tout seul pour le format "Ns"
+        return lambda val: str(val).encode('utf-8')
+
+    def _encode_record(self, record) -> bytes:
+        # Un seul pack pour tout le record
+        return self.record_struct.pack(*[enc(val) for enc, val in zip(self._col_encoders, record.values)])
+
+    def _read_slot(self, buff, slot_idx) -> bytes:
+        """Octets bruts du slot."""
+        position = self.slot_count + slot_idx * self.record_size
+        return bytes(buff[position:position + self.record_size])
+
+    def _read_slot_values(self, buff, slot_idx) -> list:
+        return self._decode_row(self.record_struct.unpack_from(buff, self.slot_count + slot_idx * self.record_size))
 
     def _read_from_buffer(self, record, buff, pos):
-        cursor = pos
-        values = []
-        for col_name, col_type in self.schema:
-            col_type = col_type.upper()
-            if col_type == "INT":
-                val = struct.unpack_from('<i', buff, cursor)[0]
-                values.append(val)
-                cursor += 4
-            elif col_type == "FLOAT":
-                val = struct.unpack_from('<f', buff, cursor)[0]
-                values.append(val)
-                cursor += 4
-            elif "CHAR" in col_type:
-                max_len = self._get_column_size(col_type)
-                raw = buff[cursor:cursor+max_len]
-                val = raw.rstrip(b'\x00').decode('utf-8')
-                values.append(val)
-                cursor += max_len
-        record.values = values
\ No newline at end of file
+        record.values = self._decode_row(self.record_struct.unpack_from(buff, pos))
+
+    def _decode_row(self, row: tuple) -> list:
+        """Tuple brut du codec -> valeurs Python (CHAR : retrait du padding et décodage)."""
+        values = list(row)
+        for i in self._char_cols:
+            values[i] = values[i].rstrip(b'\x00').decode('utf-8')
+        return values
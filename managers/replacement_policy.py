@@ -0,0 +1,260 @@
+import heapq
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class ReplacementPolicy(ABC):
+    """
+    Politique de remplacement du BufferManager.
+    Le BufferManager la prévient de chaque accès et du passage évinçable / épinglé
+    d'une page ; Evict choisit la victime parmi les pages évinçables (pin_count == 0).
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+
+    @abstractmethod
+    def RecordAccess(self, page_id):
+        """Appelé à chaque GetPage (hit ou miss)."""
+        pass
+
+    @abstractmethod
+    def SetEvictable(self, page_id, evictable: bool):
+        """Appelé quand pin_count passe à 0 (True) ou en repart (False)."""
+        pass
+
+    @abstractmethod
+    def Evict(self):
+        """Choisit une victime, l'oublie et la retourne (None si aucune page libérable)."""
+        pass
+
+    @abstractmethod
+    def Remove(self, page_id):
+        """La page quitte le pool sans passer par Evict."""
+        pass
+
+
+class LRUPolicy(ReplacementPolicy):
+    """LRU en O(1) : les pages évinçables sont rangées de la plus ancienne à la plus récente."""
+    evict_last = False
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.evictable = OrderedDict()
+
+    def RecordAccess(self, page_id):
+        if page_id in self.evictable:
+            self.evictable.move_to_end(page_id)
+
+    def SetEvictable(self, page_id, evictable: bool):
+        if evictable:
+            self.evictable[page_id] = None
+            self.evictable.move_to_end(page_id)
+        else:
+            self.evictable.pop(page_id, None)
+
+    def Evict(self):
+        if not self.evictable:
+            return None
+        return self.evictable.popitem(last=self.evict_last)[0]
+
+    def Remove(self, page_id):
+        self.evictable.pop(page_id, None)
+
+
+class MRUPolicy(LRUPolicy):
+    """MRU : on évince la page libérée le plus récemment."""
+    evict_last = True
+
+
+class ClockPolicy(ReplacementPolicy):
+    """
+    CLOCK (seconde chance) : une case par frame et un bit de référence.
+    L'aiguille saute les pages référencées (en remettant leur bit à 0) et les pages épinglées.
+    """
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.ring = [None] * capacity   # case -> PageId
+        self.slots = {}                 # PageId -> case
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.ref = {}                   # PageId -> bit de référence
+        self.evictable = set()
+        self.hand = 0
+
+    def RecordAccess(self, page_id):
+        if page_id not in self.slots:
+            if not self.free_slots:
+                # Plus de pages que de cases (capacité modifiée) : on agrandit l'anneau
+                self.ring.append(None)
+                self.free_slots.append(len(self.ring) - 1)
+            slot = self.free_slots.pop()
+            self.ring[slot] = page_id
+            self.slots[page_id] = slot
+        self.ref[page_id] = True
+
+    def SetEvictable(self, page_id, evictable: bool):
+        if evictable and page_id in self.slots:
+            self.evictable.add(page_id)
+        else:
+            self.evictable.discard(page_id)
+
+    def Evict(self):
+        if not self.evictable:
+            return None
+        # Au pire deux tours : le premier remet les bits à 0
+        while True:
+            page_id = self.ring[self.hand]
+            self.hand = (self.hand + 1) % len(self.ring)
+            if page_id is None or page_id not in self.evictable:
+                continue
+            if self.ref[page_id]:
+                self.ref[page_id] = False
+                continue
+            self.Remove(page_id)
+            return page_id
+
+    def Remove(self, page_id):
+        slot = self.slots.pop(page_id, None)
+        if slot is None:
+            return
+        self.ring[slot] = None
+        self.free_slots.append(slot)
+        del self.ref[page_id]
+        self.evictable.discard(page_id)
+
+
+class LRUKPolicy(ReplacementPolicy):
+    """
+    LRU-K : on évince la page dont le K-ième accès le plus récent est le plus ancien.
+    Les pages vues moins de K fois (typiquement une lecture séquentielle) partent en premier,
+    ce qui protège les pages vraiment chaudes d'un grand scan.
+    """
+    def __init__(self, capacity: int, k: int = 2):
+        super().__init__(capacity)
+        self.k = k
+        self.clock = 0
+        self.history = {}            # PageId -> liste des K derniers instants d'accès
+        self.young = OrderedDict()   # pages évinçables avec moins de K accès (ordre LRU)
+        self.heap = []               # (K-ième accès, seq, PageId) des pages évinçables "vieilles"
+        self.heap_seq = {}           # PageId -> seq de l'entrée valide dans le tas
+        self.seq = 0
+
+    def RecordAccess(self, page_id):
+        self.clock += 1
+        hist = self.history.setdefault(page_id, [])
+        hist.append(self.clock)
+        if len(hist) > self.k:
+            del hist[0]
+
+    def SetEvictable(self, page_id, evictable: bool):
+        if not evictable:
+            self.young.pop(page_id, None)
+            self.heap_seq.pop(page_id, None)   # l'entrée du tas devient périmée
+            return
+        hist = self.history.setdefault(page_id, [])
+        if len(hist) < self.k:
+            self.young[page_id] = None
+            self.young.move_to_end(page_id)
+        else:
+            self.seq += 1
+            self.heap_seq[page_id] = self.seq
+            heapq.heappush(self.heap, (hist[0], self.seq, page_id))
+            if len(self.heap) > 4 * (len(self.heap_seq) + self.capacity):
+                self._compact_heap()
+
+    def Evict(self):
+        if self.young:
+            page_id = self.young.popitem(last=False)[0]
+            del self.history[page_id]
+            return page_id
+        while self.heap:
+            _, seq, page_id = heapq.heappop(self.heap)
+            if self.heap_seq.get(page_id) == seq:
+                del self.heap_seq[page_id]
+                del self.history[page_id]
+                return page_id
+        return None
+
+    def Remove(self, page_id):
+        self.young.pop(page_id, None)
+        self.heap_seq.pop(page_id, None)
+        self.history.pop(page_id, None)
+
+    def _compact_heap(self):
+        """Supprime les entrées périmées (lazy deletion) pour borner la taille du tas."""
+        self.heap = [e for e in self.heap if self.heap_seq.get(e[2]) == e[1]]
+        heapq.heapify(self.heap)
+
+
+class TwoQPolicy(ReplacementPolicy):
+    """
+    2Q : les nouvelles pages entrent dans une FIFO (A1in) ; seules celles redemandées
+    après avoir été évincées (encore présentes dans la liste fantôme A1out) passent dans
+    la LRU principale (Am). Un scan ne fait donc que traverser A1in.
+    """
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.kin = max(1, capacity // 4)
+        self.kout = max(1, capacity // 2)
+        self.a1in = OrderedDict()    # FIFO des pages vues une fois (résidentes)
+        self.am = OrderedDict()      # LRU des pages chaudes (résidentes)
+        self.a1out = OrderedDict()   # PageId récemment évincés de A1in (sans données)
+        self.evictable = set()
+
+    def RecordAccess(self, page_id):
+        if page_id in self.am:
+            self.am.move_to_end(page_id)
+        elif page_id in self.a1in:
+            # Accès corrélé : on ne promeut pas
+            pass
+        elif page_id in self.a1out:
+            del self.a1out[page_id]
+            self.am[page_id] = None
+        else:
+            self.a1in[page_id] = None
+
+    def SetEvictable(self, page_id, evictable: bool):
+        if evictable:
+            self.evictable.add(page_id)
+        else:
+            self.evictable.discard(page_id)
+
+    def Evict(self):
+        if len(self.a1in) > self.kin:
+            queues = (self.a1in, self.am)
+        else:
+            queues = (self.am, self.a1in)
+        for queue in queues:
+            # On ne saute que les pages épinglées en tête de file
+            victim = next((pid for pid in queue if pid in self.evictable), None)
+            if victim is None:
+                continue
+            del queue[victim]
+            self.evictable.discard(victim)
+            if queue is self.a1in:
+                self.a1out[victim] = None
+                if len(self.a1out) > self.kout:
+                    self.a1out.popitem(last=False)
+            return victim
+        return None
+
+    def Remove(self, page_id):
+        self.a1in.pop(page_id, None)
+        self.am.pop(page_id, None)
+        self.evictable.discard(page_id)
+
+
+POLICIES = {
+    "LRU": LRUPolicy,
+    "MRU": MRUPolicy,
+    "CLOCK": ClockPolicy,
+    "LRU-K": LRUKPolicy,
+    "2Q": TwoQPolicy,
+}
+
+
+def make_replacement_policy(name: str, capacity: int) -> ReplacementPolicy:
+    """Construit la politique demandée par bm_policy."""
+    policy_class = POLICIES.get(name.upper())
+    if policy_class is None:
+        raise ValueError(f"Politique de remplacement inconnue : {name} (attendu : {', '.join(POLICIES)})")
+    return policy_class(capacity)
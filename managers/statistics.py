@@ -0,0 +1,176 @@
+import bisect
+import heapq
+import random
+
+# Nombre de buckets des histogrammes (equi-depth : chaque bucket contient ~ autant de valeurs)
+HISTOGRAM_BUCKETS = 16
+# Les histogrammes sont construits sur un échantillon (reservoir sampling) de cette taille
+SAMPLE_SIZE = 10000
+# Taille du sketch qui estime le nombre de valeurs distinctes d'une colonne (exact jusque-là)
+DISTINCT_SKETCH_SIZE = 4096
+HASH_SPACE = 1 << 64
+# Une lecture de page "au hasard" (fetch d'un record via un index) coûte plus qu'une lecture séquentielle
+RANDOM_PAGE_COST = 4.0
+# Sélectivités par défaut quand on ne sait rien (pas d'ANALYZE, ou Colonne op Colonne)
+DEFAULT_SELECTIVITY = {"=": 0.1, "<>": 0.9, "<": 1 / 3, "<=": 1 / 3, ">": 1 / 3, ">=": 1 / 3}
+
+
+class DistinctCounter:
+    """
+    Estimation du nombre de valeurs distinctes en mémoire bornée (sketch KMV, k minimum values) :
+    on garde les k plus petits hachés (sur 64 bits) des valeurs vues. Tant qu'il y a au plus k
+    valeurs distinctes le compte est exact ; au-delà, si le k-ième plus petit haché vaut h,
+    il y a environ (k - 1) * 2^64 / h valeurs distinctes (erreur relative ~ 1 / sqrt(k)).
+    """
+    def __init__(self, k: int = DISTINCT_SKETCH_SIZE):
+        self.k = k
+        self.heap = []        # -haché : tas max des k plus petits hachés
+        self.hashes = set()   # les mêmes hachés, pour ignorer les valeurs déjà vues
+
+    def Add(self, val):
+        h = _mix64(hash(val))
+        if h in self.hashes:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, -h)
+            self.hashes.add(h)
+        elif h < -self.heap[0]:
+            self.hashes.discard(-heapq.heapreplace(self.heap, -h))
+            self.hashes.add(h)
+
+    def Estimate(self) -> int:
+        if len(self.heap) < self.k:
+            return len(self.heap)
+        return round((self.k - 1) * HASH_SPACE / -self.heap[0])
+
+
+def _mix64(x: int) -> int:
+    """Mélange (finaliseur de splitmix64) : hash() d'un entier est l'entier lui-même, mal réparti."""
+    x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9 & 0xffffffffffffffff
+    x = (x ^ (x >> 27)) * 0x94d049bb133111eb & 0xffffffffffffffff
+    return (x ^ (x >> 31)) or 1
+
+
+def collect_statistics(relation) -> dict:
+    """
+    Statistiques d'une table (commande ANALYZE), rangées dans le catalogue :
+      {"row_count", "page_count", "columns": [{"distinct", "min", "max", "histogram"}, ...]}
+    histogram = HISTOGRAM_BUCKETS + 1 bornes d'un histogramme equi-depth.
+    Mémoire bornée quelle que soit la taille de la table : distinct est estimé (DistinctCounter),
+    les histogrammes viennent d'un échantillon.
+    """
+    nb_cols = len(relation.schema)
+    distinct = [DistinctCounter() for _ in range(nb_cols)]
+    minimums = [None] * nb_cols
+    maximums = [None] * nb_cols
+    samples = [[] for _ in range(nb_cols)]
+    rng = random.Random(0)   # échantillon reproductible
+    row_count = 0
+
+    for page_id in relation.GetDataPages():
+        for rec in relation.read_page_records(page_id):
+            row_count += 1
+            slot = row_count - 1 if row_count <= SAMPLE_SIZE else rng.randrange(row_count)
+            for i, val in enumerate(rec.values):
+                distinct[i].Add(val)
+                if minimums[i] is None or val < minimums[i]:
+                    minimums[i] = val
+                if maximums[i] is None or val > maximums[i]:
+                    maximums[i] = val
+                if row_count <= SAMPLE_SIZE:
+                    samples[i].append(val)
+                elif slot < SAMPLE_SIZE:
+                    samples[i][slot] = val
+
+    columns = []
+    for i in range(nb_cols):
+        values = sorted(samples[i])
+        histogram = []
+        if values:
+            histogram = [values[round(b * (len(values) - 1) / HISTOGRAM_BUCKETS)] for b in range(HISTOGRAM_BUCKETS + 1)]
+        columns.append({
+            "distinct": distinct[i].Estimate(),
+            "min": minimums[i],
+            "max": maximums[i],
+            "histogram": histogram,
+        })
+    return {"row_count": row_count, "page_count": len(relation.GetDataPages()), "columns": columns}
+
+
+def _fraction_below(col: dict, val, inclusive: bool) -> float:
+    """Part estimée des valeurs < val (<= val si inclusive), d'après l'histogramme."""
+    bounds = col["histogram"]
+    if not bounds:
+        return 0.0
+    if val < bounds[0] or (val == bounds[0] and not inclusive):
+        return 0.0
+    if val > bounds[-1] or (val == bounds[-1] and inclusive):
+        return 1.0
+
+    nb_buckets = len(bounds) - 1
+    pos = bisect.bisect_right(bounds, val) if inclusive else bisect.bisect_left(bounds, val)
+    bucket = max(1, min(pos, nb_buckets))
+    low, high = bounds[bucket - 1], bounds[bucket]
+    # Interpolation linéaire dans le bucket pour les nombres, milieu du bucket pour le texte
+    within = 0.5
+    if isinstance(val, (int, float)) and high > low:
+        within = min(1.0, max(0.0, (val - low) / (high - low)))
+    return (bucket - 1 + within) / nb_buckets
+
+
+def equality_selectivity(col: dict, val) -> float:
+    if col["distinct"] == 0 or col["min"] is None or val < col["min"] or val > col["max"]:
+        return 0.0
+    return 1.0 / col["distinct"]
+
+
+def range_selectivity(col: dict, low=None, high=None) -> float:
+    """Part estimée des valeurs dans [low, high] (bornes incluses, None = pas de borne)."""
+    if low is not None and low == high:
+        return equality_selectivity(col, low)
+    below_high = 1.0 if high is None else _fraction_below(col, high, inclusive=True)
+    below_low = 0.0 if low is None else _fraction_below(col, low, inclusive=False)
+    return max(0.0, below_high - below_low)
+
+
+def condition_selectivity(stats: dict, col_idx: int, op: str, val, rhs_is_col: bool = False) -> float:
+    """Part estimée des records qui vérifient Colonne op Valeur."""
+    if not stats or rhs_is_col:
+        return DEFAULT_SELECTIVITY.get(op, 1.0)
+    col = stats["columns"][col_idx]
+    try:
+        if op == "=":
+            return equality_selectivity(col, val)
+        if op == "<>":
+            return 1.0 - equality_selectivity(col, val)
+        if op == "<":
+            return _fraction_below(col, val, inclusive=False)
+        if op == "<=":
+            return _fraction_below(col, val, inclusive=True)
+        if op == ">":
+            return 1.0 - _fraction_below(col, val, inclusive=True)
+        if op == ">=":
+            return 1.0 - _fraction_below(col, val, inclusive=False)
+    except TypeError:
+        # Valeur d'un autre type que la colonne : on ne sait pas estimer
+        pass
+    return DEFAULT_SELECTIVITY.get(op, 1.0)
+
+
+def full_scan_cost(stats: dict) -> float:
+    """Pages lues par un parcours complet (séquentiel)."""
+    return stats["page_count"]
+
+
+def index_scan_cost(stats: dict, index, low=None, high=None) -> float:
+    """
+    Pages lues par un IndexScan sur [low, high] : pages de l'index, plus une lecture
+    "au hasard" par record trouvé (au plus une par page de la table).
+    """
+    col = stats["columns"][index.col_idx]
+    try:
+        matching = stats["row_count"] * range_selectivity(col, low, high)
+    except TypeError:
+        matching = stats["row_count"] * DEFAULT_SELECTIVITY["="]
+    fetched_pages = min(matching, stats["page_count"])
+    return index.EstimatePageReads(stats["row_count"], matching) + RANDOM_PAGE_COST * fetched_pages
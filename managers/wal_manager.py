@@ -0,0 +1,549 @@
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from managers.page_id import PageId
+
+# En-tête d'un segment : magic, LSN du premier record, prochain numéro de transaction
+FILE_HEADER = struct.Struct("<4sQQ")
+MAGIC = b"WAL1"
+# Segments du journal : wal_<LSN du premier record en hexadécimal>.log
+SEGMENT_RE = re.compile(r"^wal_([0-9a-f]{16})\.log$")
+# En-tête d'un record : longueur du contenu, crc32 du contenu, LSN, transaction, type
+RECORD_HEADER = struct.Struct("<IIQQB")
+# Contenu d'un record UPDATE : page (fichier, page), offset, longueur, puis image avant et image après
+UPDATE_HEADER = struct.Struct("<iiII")
+PAGE_REF = struct.Struct("<ii")
+LSN_REF = struct.Struct("<Q")
+
+# Types de records
+UPDATE = 1      # octets d'une page modifiés (images avant / après)
+COMMIT = 2      # fin de transaction
+ALLOC = 3       # page allouée par le DiskManager
+FREE = 4        # page rendue au DiskManager
+NEWPAGE = 5     # page réécrite directement sur disque (chargement en masse) : l'historique d'avant ne compte plus
+CATALOG = 6     # changement du catalogue (op, args), rejoué par DBManager.RedoCatalog
+CHECKPOINT = 7  # checkpoint : LSN à partir duquel la reprise rejoue les pages
+UNDO = 8        # changement d'un record (op, args), défait par DBManager.UndoRecord si pas de COMMIT
+
+# Au-delà, le tampon du journal est écrit (sans fsync) même sans commit
+WAL_BUFFER_SIZE = 1 << 20
+
+
+class WALManager:
+    """
+    Journal (write-ahead log) des modifications de pages, des allocations et du catalogue.
+    Chaque modification est journalisée AVANT d'être faite dans le buffer pool, et une page
+    dirty n'est écrite sur disque qu'une fois le journal synchronisé jusqu'à son dernier
+    record (page_lsn de sa frame) : le BufferManager peut donc écrire les pages quand il veut.
+    Un COMMIT n'attend que le fsync du journal ; les transactions qui committent en même
+    temps partagent le même fsync (group commit).
+    Les modifications de pages se font dans des transactions système (SystemTransaction),
+    jamais défaites une fois committées ; une transaction de l'utilisateur journalise en plus
+    ses changements de records (LogUndo), qui sont défaits un par un si elle n'aboutit pas.
+    Le journal est découpé en segments ; un checkpoint (FuzzyCheckpoint) supprime ceux qui
+    ne servent plus. Au démarrage, Recover rejoue le journal depuis le dernier checkpoint
+    puis annule les transactions sans COMMIT.
+    Un LSN est la position d'un octet dans le journal depuis la création de la base.
+    """
+    def __init__(self, config, disk_manager):
+        self.config = config
+        self.disk_manager = disk_manager
+        self.segment_size = self.config.wal_segment_size
+        # Attente du leader avant le fsync, pour grouper plus de commits (millisecondes)
+        self.commit_delay = self.config.wal_commit_delay / 1000
+
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.local = threading.local()   # transaction en cours de chaque thread
+        self.buffer = bytearray()        # records pas encore écrits dans le segment courant
+        self.flushing = False            # un thread est en train de faire le fsync
+        self.active = 0                  # transactions en cours
+        self.checkpointing = False       # un checkpoint attend / sauvegarde le catalogue
+        self.recovered = False
+
+        self.nb_commits = 0
+        self.nb_syncs = 0
+        self.nb_checkpoints = 0
+
+        self.fd = None
+        self.segments = self._list_segments()   # [(LSN de début, chemin)]
+        if not self.segments:
+            self.next_txn = 1
+            self._new_segment(0)
+            self.next_lsn = self.redo_lsn = 0
+        else:
+            self.next_txn = 1
+            end_lsn = self.redo_lsn = self.segments[0][0]
+            for lsn, end_lsn, txn_id, kind, payload in self._read_records():
+                self.next_txn = max(self.next_txn, txn_id + 1)
+                if kind == CHECKPOINT:
+                    self.redo_lsn = LSN_REF.unpack(payload)[0]
+            # Ce qui suit le dernier record valide (arrêt brutal pendant l'écriture) est oublié
+            while len(self.segments) > 1 and self.segments[-1][0] > end_lsn:
+                os.remove(self.segments.pop()[1])
+            base, path = self.segments[-1]
+            self.fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+            os.ftruncate(self.fd, FILE_HEADER.size + end_lsn - base)
+            os.lseek(self.fd, 0, os.SEEK_END)
+            self.segment_base = base
+            self.next_lsn = end_lsn
+        self.written_lsn = self.next_lsn   # tout ce qui est avant est dans un segment
+        self.flushed_lsn = self.next_lsn   # tout ce qui est avant est synchronisé (fsync)
+
+        # Le DiskManager journalise ses allocations
+        disk_manager.wal = self
+
+    # Transactions
+    def Begin(self):
+        """Début de transaction (du thread courant). Les Begin imbriqués comptent pour un."""
+        local = self.local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            with self.cond:
+                # Un checkpoint sauvegarde le catalogue entre deux transactions
+                while self.checkpointing:
+                    self.cond.wait()
+                self.active += 1
+                local.txn_id = self.next_txn
+                self.next_txn += 1
+            local.wrote = False
+            local.failed = False
+            local.undo = []         # (op, args) des LogUndo, pour Rollback
+            local.at_end = []       # (func, args) des AtEnd
+            local.savepoints = []   # position dans undo de chaque Begin imbriqué
+        local.savepoints.append(len(local.undo))
+        local.depth = depth + 1
+
+    def Commit(self):
+        """Fin de transaction : rend la main quand son COMMIT est sur disque."""
+        local = self.local
+        local.depth -= 1
+        local.savepoints.pop()
+        if local.depth:
+            return
+        txn_id, local.txn_id = local.txn_id, 0
+        committed = False
+        try:
+            # Rien n'a été journalisé (ex: SELECT) : pas de fsync.
+            # Rollback interrompu : pas de COMMIT, la reprise finira de défaire la transaction
+            if local.wrote and not local.failed:
+                self.Flush(self._append(COMMIT, b"", txn_id))
+                committed = True
+        finally:
+            local.undo = []
+            at_end, local.at_end = local.at_end, []
+            with self.cond:
+                self.active -= 1
+                if committed:
+                    self.nb_commits += 1
+                if not self.active:
+                    self.cond.notify_all()
+            for func, args in at_end:
+                func(*args)
+
+    def Rollback(self, db_manager):
+        """
+        Défait, de la fin vers le début, les changements de records journalisés (LogUndo) depuis
+        le Begin courant, avec db_manager.UndoRecord. Les pages allouées et les noeuds d'index
+        réécrits restent (transactions système) : seuls les records reviennent à leur état d'avant.
+        """
+        local = self.local
+        start = local.savepoints[-1]
+        try:
+            for op, args in reversed(local.undo[start:]):
+                db_manager.UndoRecord(op, *args)
+        except BaseException:
+            local.failed = True
+            raise
+        del local.undo[start:]
+
+    @contextmanager
+    def Transaction(self, db_manager=None):
+        """
+        with wal.Transaction(db_manager): ...  Si le bloc lève une exception, ses changements de
+        records sont défaits (Rollback) avant la fin de la transaction : une commande en erreur
+        laisse la base dans l'état où une panne avant son COMMIT l'aurait laissée.
+        Sans db_manager, ce qui a été fait reste fait.
+        """
+        self.Begin()
+        try:
+            yield
+        except BaseException:
+            if db_manager is not None:
+                self.Rollback(db_manager)
+            raise
+        finally:
+            self.Commit()
+
+    def AtEnd(self, func, *args):
+        """Appelle func(*args) à la fin de la transaction en cours (COMMIT ou rollback), tout de suite hors transaction."""
+        local = self.local
+        if getattr(local, "txn_id", 0):
+            local.at_end.append((func, args))
+        else:
+            func(*args)
+
+    @contextmanager
+    def SystemTransaction(self, restore):
+        """
+        with wal.SystemTransaction(restore): ...  Modification de structure (page allouée et
+        rattachée à une table, écriture d'un record dans sa page, noeuds d'un index) dans sa propre
+        transaction, committée à la fin du bloc sans attendre de fsync. Elle n'est jamais défaite
+        avec la transaction de l'utilisateur : d'autres sessions ont pu s'en servir depuis.
+        Si elle n'est pas allée au bout, elle est défaite octet par octet : par la reprise, ou ici
+        avec restore(page_id, offset, image avant) si le bloc lève une exception. L'appelant garde
+        ses pages (latch, verrou de l'index) jusqu'à la fin du bloc. Les blocs imbriqués comptent pour un.
+        """
+        local = self.local
+        depth = getattr(local, "system_depth", 0)
+        if depth == 0:
+            with self.lock:
+                local.system_txn = self.next_txn
+                self.next_txn += 1
+            local.system_wrote = False
+            local.system_images = []   # (page_id, offset, image avant) des LogUpdate
+        local.system_depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            if depth == 0:
+                images, local.system_images = local.system_images, []
+                for page_id, offset, before in reversed(images):
+                    restore(page_id, offset, before)
+            raise
+        finally:
+            local.system_depth = depth
+            if depth == 0:
+                txn_id, local.system_txn = local.system_txn, 0
+                local.system_images = []
+                if local.system_wrote:
+                    # Durable avec le prochain Flush (au plus tard le COMMIT de la transaction en cours)
+                    self._append(COMMIT, b"", txn_id)
+
+    # Records
+    def LogUpdate(self, page_id: PageId, offset: int, before: bytes, after: bytes) -> int:
+        """Journalise la modification des octets [offset, offset + len) d'une page. Retourne le LSN de fin."""
+        payload = UPDATE_HEADER.pack(page_id.FileIdx, page_id.PageIdx, offset, len(after)) + before + after
+        local = self.local
+        if getattr(local, "system_depth", 0):
+            local.system_images.append((page_id, offset, before))
+        return self._append(UPDATE, payload)
+
+    def LogAlloc(self, page_id: PageId) -> int:
+        return self._append(ALLOC, PAGE_REF.pack(page_id.FileIdx, page_id.PageIdx))
+
+    def LogFree(self, page_id: PageId) -> int:
+        return self._append(FREE, PAGE_REF.pack(page_id.FileIdx, page_id.PageIdx))
+
+    def LogNewPage(self, page_id: PageId) -> int:
+        """La page vient d'être écrite (et synchronisée) directement sur disque, sans passer par le journal."""
+        return self._append(NEWPAGE, PAGE_REF.pack(page_id.FileIdx, page_id.PageIdx))
+
+    def LogCatalog(self, op: str, *args) -> int:
+        """Changement du catalogue, rejoué par DBManager.RedoCatalog(op, *args) si la transaction a committé."""
+        return self._append(CATALOG, pickle.dumps((op, args)))
+
+    def LogUndo(self, op: str, *args):
+        """
+        Changement d'un record par la transaction en cours, défait par DBManager.UndoRecord(op, *args)
+        si elle n'aboutit pas (Rollback, ou reprise sans son COMMIT). Rien n'est journalisé hors transaction.
+        """
+        local = self.local
+        txn_id = getattr(local, "txn_id", 0)
+        if not txn_id:
+            return None
+        local.undo.append((op, args))
+        local.wrote = True
+        return self._append(UNDO, pickle.dumps((op, args)), txn_id)
+
+    def Flush(self, lsn: int = None):
+        """
+        Garantit que le journal est synchronisé jusqu'à lsn (tout le journal par défaut).
+        Un seul thread (le leader) fait le fsync ; ceux qui arrivent pendant ce temps
+        attendent et sont le plus souvent couverts par ce fsync ou le suivant.
+        """
+        self.cond.acquire()
+        try:
+            target = self.next_lsn if lsn is None else lsn
+            while self.flushed_lsn < target:
+                if self.flushing:
+                    self.cond.wait()
+                    continue
+                self.flushing = True
+                if self.commit_delay:
+                    # On laisse aux autres transactions le temps d'ajouter leur COMMIT
+                    self.cond.wait(self.commit_delay)
+                self._write_buffer()
+                end, fd = self.written_lsn, self.fd
+                self.cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self.cond.acquire()
+                    self.flushing = False
+                self.flushed_lsn = max(self.flushed_lsn, end)
+                self.nb_syncs += 1
+                self.cond.notify_all()
+        finally:
+            self.cond.release()
+
+    # Checkpoints
+    def FuzzyCheckpoint(self, db_manager) -> int:
+        """
+        Checkpoint sans arrêter les requêtes, pour borner le travail de la reprise :
+          1. les pages dirty sont écrites (sauf celles épinglées) et synchronisées ;
+          2. le catalogue et l'état du DiskManager sont sauvegardés entre deux transactions ;
+          3. un record CHECKPOINT note le LSN de reprise des pages : le plus ancien changement
+             pas encore sur disque. Les segments entièrement avant lui sont supprimés.
+        Retourne le LSN de reprise.
+        """
+        buffer_manager = db_manager.buffer_manager
+        start_lsn = self.next_lsn
+        buffer_manager.WriteDirtyPages()
+        redo_lsn = min([start_lsn] + buffer_manager.DirtyPagesLSN())
+        db_manager.disk_manager.Fsync()
+
+        with self.cond:
+            self.checkpointing = True
+            while self.active:
+                self.cond.wait()
+        try:
+            db_manager.SaveState()
+            db_manager.disk_manager.SaveState()
+        finally:
+            with self.cond:
+                self.checkpointing = False
+                self.cond.notify_all()
+
+        self.Flush(self._append(CHECKPOINT, LSN_REF.pack(redo_lsn), 0))
+        with self.lock:
+            self.redo_lsn = redo_lsn
+            # Un segment ne sert plus si le suivant commence avant le LSN de reprise
+            while len(self.segments) > 1 and self.segments[1][0] <= redo_lsn:
+                os.remove(self.segments.pop(0)[1])
+            self.nb_checkpoints += 1
+        return redo_lsn
+
+    def Checkpoint(self):
+        """
+        Vide le journal. À n'appeler que quand tout ce qu'il décrit est sur disque : pages écrites
+        et synchronisées, catalogue et état du DiskManager sauvegardés (voir main.py).
+        """
+        self.Flush()
+        with self.lock:
+            self._reset(self.next_lsn)
+
+    def Close(self):
+        self.Flush()
+        os.close(self.fd)
+        self.fd = None
+
+    # Reprise après panne
+    def Recover(self, db_manager) -> int:
+        """
+        Remet la base dans l'état du dernier COMMIT, au démarrage (appelé par DBManager) :
+          1. redo : les modifications de pages sont rejouées dans l'ordre du journal,
+             depuis le LSN de reprise du dernier checkpoint ;
+          2. undo physique : celles des transactions système inachevées sont annulées, de la fin
+             vers le début ;
+          3. allocations et catalogue : rejoués à partir du LSN de leur dernière sauvegarde ;
+          4. undo logique : les changements de records des transactions sans COMMIT sont défaits
+             (DBManager.UndoRecord), de la fin vers le début. Les records des autres sessions
+             qui partagent leurs pages et leurs noeuds d'index restent.
+        Puis tout est écrit et sauvegardé, et le journal est vidé. Retourne le nombre de records rejoués.
+        """
+        if self.recovered:
+            return 0
+        self.recovered = True
+        disk_manager = db_manager.disk_manager
+        buffer_manager = db_manager.buffer_manager
+
+        records = [(lsn, txn_id, kind, payload) for lsn, _, txn_id, kind, payload in self._read_records()
+                   if lsn >= self.redo_lsn]
+        if not any(kind != CHECKPOINT for _, _, kind, _ in records):
+            saved_lsn = max(db_manager.checkpoint_lsn, disk_manager.checkpoint_lsn)
+            if saved_lsn > self.next_lsn:
+                # Journal perdu ou recréé : les LSN repartent après ceux des sauvegardes
+                with self.lock:
+                    self._reset(saved_lsn)
+            return 0
+
+        # Transactions terminées (0 = modifications faites hors transaction)
+        committed = {txn_id for _, txn_id, kind, _ in records if kind == COMMIT}
+        committed.add(0)
+        # Dernière réécriture directe de chaque page : ce qui la précède est écrasé
+        rewritten = {}
+        for lsn, _, kind, payload in records:
+            if kind == NEWPAGE:
+                rewritten[PageId(*PAGE_REF.unpack(payload))] = lsn
+
+        pages = {}
+
+        def page(page_id):
+            buff = pages.get(page_id)
+            if buff is None:
+                buff = bytearray(self.config.pagesize)
+                disk_manager.ReadPage(page_id, buff)
+                pages[page_id] = buff
+            return buff
+
+        def updates(selected):
+            for lsn, txn_id, kind, payload in selected:
+                if kind != UPDATE:
+                    continue
+                file_idx, page_idx, offset, length = UPDATE_HEADER.unpack_from(payload)
+                page_id = PageId(file_idx, page_idx)
+                if lsn < rewritten.get(page_id, -1):
+                    continue
+                start = UPDATE_HEADER.size
+                yield txn_id, page(page_id), offset, length, payload[start:start + length], payload[start + length:]
+
+        # 1. Redo
+        for _, buff, offset, length, _, after in updates(records):
+            buff[offset:offset + length] = after
+        # 2. Undo des perdants (seules les transactions système écrivent des pages)
+        for txn_id, buff, offset, length, before, _ in updates(reversed(records)):
+            if txn_id not in committed:
+                buff[offset:offset + length] = before
+
+        # 3. Allocations et catalogue : ce qui a été committé est rejoué dans l'ordre,
+        #    les allocations des perdants sont défaites à l'envers
+        for lsn, txn_id, kind, payload in records:
+            if kind in (ALLOC, FREE) and txn_id in committed and lsn >= disk_manager.checkpoint_lsn:
+                page_id = PageId(*PAGE_REF.unpack(payload))
+                disk_manager.RedoAlloc(page_id) if kind == ALLOC else disk_manager.RedoFree(page_id)
+            elif kind == CATALOG and txn_id in committed and lsn >= db_manager.checkpoint_lsn:
+                op, args = pickle.loads(payload)
+                db_manager.RedoCatalog(op, *args)
+        for lsn, txn_id, kind, payload in reversed(records):
+            if kind in (ALLOC, FREE) and txn_id not in committed and lsn >= disk_manager.checkpoint_lsn:
+                page_id = PageId(*PAGE_REF.unpack(payload))
+                disk_manager.RedoFree(page_id) if kind == ALLOC else disk_manager.RedoAlloc(page_id)
+
+        for page_id, buff in pages.items():
+            buffer_manager.DiscardPage(page_id)
+            disk_manager.WritePage(page_id, buff)
+
+        # 4. Undo logique, avec les opérations normales (journalisées) : si la reprise est
+        #    interrompue, la suivante les rejoue puis recommence (chaque undo peut être refait)
+        undone = set()
+        for lsn, txn_id, kind, payload in reversed(records):
+            if kind == UNDO and txn_id not in committed:
+                op, args = pickle.loads(payload)
+                db_manager.UndoRecord(op, *args)
+                undone.add(args[0])
+        buffer_manager.FlushBuffers()
+        disk_manager.Fsync()
+        # La free-space map n'est pas journalisée : on la relit dans les bitmaps des pages touchées
+        touched = set(pages) | set(rewritten)
+        for name, rel in db_manager.tables.items():
+            if name in undone or any(page_id in touched for page_id in rel.allocated_pages):
+                rel.rebuild_free_space()
+        db_manager.SaveState()
+        disk_manager.SaveState()
+        self.Checkpoint()
+        return len(records)
+
+    # Interne
+    def _append(self, kind: int, payload: bytes, txn_id: int = None) -> int:
+        local = self.local
+        if txn_id is None:
+            if getattr(local, "system_depth", 0):
+                txn_id = local.system_txn
+                local.system_wrote = True
+            else:
+                txn_id = getattr(local, "txn_id", 0)
+                if txn_id:
+                    local.wrote = True
+        size = RECORD_HEADER.size + len(payload)
+        with self.lock:
+            while self.next_lsn > self.segment_base and self.next_lsn + size - self.segment_base > self.segment_size:
+                if self.flushing:
+                    # Le leader du fsync travaille sur le segment courant : on attend qu'il ait fini
+                    self.cond.wait()
+                    continue
+                self._switch_segment()
+            lsn = self.next_lsn
+            self.buffer += RECORD_HEADER.pack(len(payload), zlib.crc32(payload), lsn, txn_id, kind)
+            self.buffer += payload
+            self.next_lsn = lsn + size
+            # En mmap, le noyau peut écrire une page mappée à tout moment : le record doit être
+            # dans le fichier (au moins dans le cache du noyau) avant que la page soit modifiée
+            if len(self.buffer) >= WAL_BUFFER_SIZE or self.disk_manager.use_mmap:
+                self._write_buffer()
+            return self.next_lsn
+
+    def _write_buffer(self):
+        """Écrit le tampon dans le segment courant (verrou tenu), sans fsync."""
+        view = memoryview(self.buffer)
+        while view:
+            view = view[os.write(self.fd, view):]
+        view.release()
+        self.buffer.clear()
+        self.written_lsn = self.next_lsn
+
+    def _switch_segment(self):
+        """Le segment courant est plein : il est terminé (fsync) et un nouveau commence (verrou tenu)."""
+        self._write_buffer()
+        os.fsync(self.fd)
+        self.flushed_lsn = self.written_lsn
+        self.cond.notify_all()
+        os.close(self.fd)
+        self._new_segment(self.next_lsn)
+
+    def _new_segment(self, base_lsn: int):
+        path = os.path.join(self.config.dbpath, f"wal_{base_lsn:016x}.log")
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(path, flags, 0o644)
+        os.write(self.fd, FILE_HEADER.pack(MAGIC, base_lsn, self.next_txn))
+        os.fsync(self.fd)
+        self.segment_base = base_lsn
+        self.segments.append((base_lsn, path))
+
+    def _reset(self, base_lsn: int):
+        """Remplace tout le journal par un segment vide qui commence au LSN base_lsn (verrou tenu)."""
+        if self.fd is not None:
+            os.close(self.fd)
+        for _, path in self.segments:
+            os.remove(path)
+        self.segments = []
+        self.buffer.clear()
+        self._new_segment(base_lsn)
+        self.next_lsn = self.written_lsn = self.flushed_lsn = self.redo_lsn = base_lsn
+
+    def _list_segments(self) -> list:
+        segments = []
+        for name in os.listdir(self.config.dbpath):
+            match = SEGMENT_RE.match(name)
+            if match:
+                segments.append((int(match.group(1), 16), os.path.join(self.config.dbpath, name)))
+        return sorted(segments)
+
+    def _read_records(self):
+        """
+        Générateur des records valides des segments, dans l'ordre :
+        (lsn, LSN de fin, transaction, type, contenu). S'arrête au premier record invalide.
+        """
+        expected = self.segments[0][0] if self.segments else 0
+        for base, path in self.segments:
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < FILE_HEADER.size or base != expected:
+                return
+            magic, header_base, _ = FILE_HEADER.unpack_from(data)
+            if magic != MAGIC or header_base != base:
+                raise Exception(f"WALManager : {path} n'est pas un segment du journal")
+            pos = FILE_HEADER.size
+            while pos + RECORD_HEADER.size <= len(data):
+                length, crc, lsn, txn_id, kind = RECORD_HEADER.unpack_from(data, pos)
+                end = pos + RECORD_HEADER.size + length
+                payload = data[pos + RECORD_HEADER.size:end]
+                if end > len(data) or lsn != base + pos - FILE_HEADER.size or zlib.crc32(payload) != crc:
+                    return
+                yield lsn, base + end - FILE_HEADER.size, txn_id, kind, payload
+                pos = end
+            expected = base + pos - FILE_HEADER.size
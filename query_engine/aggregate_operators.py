@@ -0,0 +1,217 @@
+from abc import abstractmethod
+from itertools import islice
+from query_engine.iterators import IRecordIterator
+from query_engine.spill import SpillFile
+from managers.relation import Record
+
+# Profondeur maximale de re-partitionnement : au-delà on agrège en mémoire quoi qu'il arrive
+MAX_SPILL_DEPTH = 4
+
+
+class AggregateFunction:
+    """
+    Une fonction d'agrégat (COUNT, SUM, AVG, MIN, MAX) sur la colonne col_idx
+    (None pour COUNT(*)). L'état d'un groupe est une valeur : start le crée sur
+    la première ligne, step le met à jour, result donne la valeur finale.
+    """
+    FUNCTIONS = ("COUNT", "SUM", "AVG", "MIN", "MAX")
+
+    def __init__(self, func: str, col_idx: int = None):
+        self.func = func.upper()
+        self.col_idx = col_idx
+        if self.func not in self.FUNCTIONS:
+            raise ValueError(f"Fonction d'agrégat inconnue : {func}")
+        if self.col_idx is None and self.func != "COUNT":
+            raise ValueError(f"{self.func}(*) n'existe pas (seulement COUNT(*))")
+
+    def start(self, values):
+        if self.func == "COUNT":
+            return 1
+        val = values[self.col_idx]
+        return (val, 1) if self.func == "AVG" else val
+
+    def step(self, state, values):
+        if self.func == "COUNT":
+            return state + 1
+        val = values[self.col_idx]
+        if self.func == "SUM":
+            return state + val
+        if self.func == "AVG":
+            return (state[0] + val, state[1] + 1)
+        if self.func == "MIN":
+            return val if val < state else state
+        return val if val > state else state
+
+    def merge(self, state, other):
+        """Combine deux états du même groupe calculés séparément (agrégation en parallèle)."""
+        if self.func in ("COUNT", "SUM"):
+            return state + other
+        if self.func == "AVG":
+            return (state[0] + other[0], state[1] + other[1])
+        if self.func == "MIN":
+            return other if other < state else state
+        return other if other > state else state
+
+    def result(self, state):
+        if self.func == "AVG":
+            return state[0] / state[1]
+        return state
+
+    def empty_result(self):
+        """Valeur sur une entrée vide (sans GROUP BY) : 0 pour COUNT, rien sinon."""
+        return 0 if self.func == "COUNT" else None
+
+
+class _AggregateOperator(IRecordIterator):
+    """
+    Base des agrégations : le record produit est (colonnes du GROUP BY..., agrégats...).
+    Sans GROUP BY (group_cols vide), une entrée vide donne quand même une ligne.
+    """
+    def __init__(self, child: IRecordIterator, group_cols: list, aggregates: list):
+        self.child = child
+        self.group_cols = group_cols
+        self.aggregates = aggregates
+        self.results = None
+
+    def GetNextRecord(self):
+        if self.results is None:
+            self.results = self._run()
+        values = next(self.results, None)
+        return None if values is None else Record(values)
+
+    def GetNextBatch(self):
+        if self.results is None:
+            self.results = self._run()
+        batch = [Record(values) for values in islice(self.results, self.BATCH_SIZE)]
+        return batch or None
+
+    def _input(self):
+        while True:
+            batch = self.child.GetNextBatch()
+            if batch is None:
+                return
+            for rec in batch:
+                yield rec.values
+
+    def _run(self):
+        produced = False
+        for values in self._aggregate(self._input()):
+            produced = True
+            yield values
+        if not produced and not self.group_cols:
+            yield [agg.empty_result() for agg in self.aggregates]
+
+    @abstractmethod
+    def _aggregate(self, rows):
+        """Générateur des lignes (colonnes du GROUP BY..., agrégats...) à partir des valeurs d'entrée."""
+
+    def _stop(self):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+
+    def Close(self):
+        self._stop()
+        self.child.Close()
+
+    def Reset(self):
+        self._stop()
+        self.child.Reset()
+
+
+class StreamAggregateOperator(_AggregateOperator):
+    """
+    Agrégation en flux sur une entrée triée par les colonnes du GROUP BY (ou sans GROUP BY) :
+    un seul groupe en mémoire, émis dès que la clé change.
+    """
+    def _aggregate(self, rows):
+        group_cols = self.group_cols
+        aggregates = self.aggregates
+        current = None
+        states = None
+        for values in rows:
+            key = [values[i] for i in group_cols]
+            if states is not None and key == current:
+                states = [agg.step(state, values) for agg, state in zip(aggregates, states)]
+                continue
+            if states is not None:
+                yield current + [agg.result(state) for agg, state in zip(aggregates, states)]
+            current = key
+            states = [agg.start(values) for agg in aggregates]
+        if states is not None:
+            yield current + [agg.result(state) for agg, state in zip(aggregates, states)]
+
+
+class HashAggregateOperator(_AggregateOperator):
+    """
+    Agrégation par hachage, sans hypothèse d'ordre sur l'entrée.
+    On garde au plus max_groups groupes en mémoire ; les lignes des groupes suivants sont
+    réparties (par hachage de la clé) dans fanout partitions écrites sur des pages
+    temporaires (SpillFile). Une fois l'entrée lue, on émet les groupes en mémoire puis on
+    agrège chaque partition de la même façon (elle peut à son tour déborder).
+    """
+    def __init__(self, child, group_cols: list, aggregates: list, disk_manager, buffer_manager,
+                 max_groups: int, fanout: int):
+        super().__init__(child, group_cols, aggregates)
+        self.disk_manager = disk_manager
+        self.buffer_manager = buffer_manager
+        self.max_groups = max(1, max_groups)
+        self.fanout = max(2, fanout)
+        self.spills = []
+
+    def _aggregate(self, rows, depth=0):
+        group_cols = self.group_cols
+        aggregates = self.aggregates
+        table = {}
+        partitions = None
+        for values in rows:
+            key = tuple(values[i] for i in group_cols)
+            states = table.get(key)
+            if states is not None:
+                for i, agg in enumerate(aggregates):
+                    states[i] = agg.step(states[i], values)
+            elif len(table) < self.max_groups or depth >= MAX_SPILL_DEPTH:
+                table[key] = [agg.start(values) for agg in aggregates]
+            else:
+                if partitions is None:
+                    partitions = [SpillFile(self.disk_manager, self.buffer_manager) for _ in range(self.fanout)]
+                    self.spills.extend(partitions)
+                # La profondeur entre dans le hachage : une partition se re-répartit autrement
+                partitions[hash((depth, key)) % self.fanout].Append(values)
+
+        for key, states in table.items():
+            yield list(key) + [agg.result(state) for agg, state in zip(aggregates, states)]
+        table.clear()
+
+        for partition in partitions or ():
+            partition.Finish()
+            yield from self._aggregate(partition.Read(), depth + 1)
+            partition.Free()
+
+    def _stop(self):
+        super()._stop()
+        for partition in self.spills:
+            partition.Free()
+        self.spills = []
+
+
+class ParallelAggregateOperator(_AggregateOperator):
+    """
+    Agrégation en deux temps au-dessus d'un ParallelScanOperator : chaque worker agrège sa
+    plage de pages, on ne fait ici que combiner les états partiels (merge). Les lignes ne
+    remontent pas jusqu'ici. Tous les groupes restent en mémoire : à réserver aux agrégats
+    sans GROUP BY ou à peu de groupes.
+    """
+    def _aggregate(self, rows):
+        aggregates = self.aggregates
+        table = {}
+        for partial in self.child.PartialAggregates(self.group_cols, aggregates):
+            for key, states in partial:
+                current = table.get(key)
+                if current is None:
+                    table[key] = states
+                else:
+                    table[key] = [agg.merge(a, b) for agg, a, b in zip(aggregates, current, states)]
+
+        for key, states in table.items():
+            yield list(key) + [agg.result(state) for agg, state in zip(aggregates, states)]
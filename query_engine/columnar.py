@@ -0,0 +1,90 @@
+from managers.relation import Record
+from managers.record_id import RecordId
+from managers.buffer_manager import SHARED
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy est optionnel : sans lui on reste sur le décodage record par record
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def schema_dtype(schema: list):
+    """dtype structuré NumPy équivalent au codec d'un slot (INT -> <i4, FLOAT -> <f4, CHAR(n) -> Sn)."""
+    formats = []
+    for _, type_col in schema:
+        type_col = type_col.upper()
+        if type_col == "INT":
+            formats.append("<i4")
+        elif type_col == "FLOAT":
+            formats.append("<f4")
+        else:
+            formats.append(f"S{type_col.split('(')[1].split(')')[0]}")
+    # Noms positionnels : c0, c1, ... (pas de collision possible avec les noms du schéma)
+    return np.dtype({"names": [f"c{i}" for i in range(len(formats))], "formats": formats})
+
+
+class ColumnBatch:
+    """
+    Une page décodée en colonnes : columns[i] est le tableau NumPy de la colonne i,
+    restreint aux slots occupés (slots[j] = numéro de slot de la ligne j).
+    """
+    def __init__(self, relation, page_id, slots, columns):
+        self.relation = relation
+        self.page_id = page_id
+        self.slots = slots
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.slots)
+
+    def to_records(self, mask=None) -> list:
+        """Reconstruit les Records (avec leur RecordId), éventuellement filtrés par un masque booléen."""
+        slots = self.slots if mask is None else self.slots[mask]
+        cols = [(col if mask is None else col[mask]).tolist() for col in self.columns]
+        for i in self.relation._char_cols:
+            # NumPy retire déjà les \x00 de fin des chaînes "S"
+            cols[i] = [raw.decode('utf-8') for raw in cols[i]]
+
+        records = []
+        page_id = self.page_id
+        for slot_idx, values in zip(slots.tolist(), zip(*cols)):
+            rec = Record(list(values))
+            rec.rid = RecordId(page_id, slot_idx)
+            records.append(rec)
+        return records
+
+
+_dtypes = {}
+
+def _relation_dtype(relation):
+    key = tuple(relation.schema)
+    dtype = _dtypes.get(key)
+    if dtype is None:
+        dtype = _dtypes[key] = schema_dtype(relation.schema)
+    return dtype
+
+
+def decode_page(relation, page_id) -> ColumnBatch:
+    """
+    Décode une page entière en colonnes : la zone des slots est vue comme un tableau
+    structuré NumPy, filtré par la bitmap. Les colonnes sont copiées : la page est
+    libérée avant de rendre la main.
+    """
+    if np is None:
+        raise Exception("Décodage en colonnes indisponible : NumPy n'est pas installé.")
+
+    buff = relation.buffer_manager.GetPage(page_id, SHARED)
+    try:
+        slot_count = relation.slot_count
+        bitmap = np.frombuffer(buff, dtype=np.uint8, count=slot_count)
+        rows = np.frombuffer(buff, dtype=_relation_dtype(relation), count=slot_count, offset=slot_count)
+        slots = np.flatnonzero(bitmap)
+        selected = rows[slots]  # indexation avancée = copie
+    finally:
+        relation.buffer_manager.FreePage(page_id, False, SHARED)
+
+    columns = [selected[name] for name in selected.dtype.names]
+    return ColumnBatch(relation, page_id, slots, columns)
@@ -0,0 +1,29 @@
+from query_engine.iterators import IRecordIterator
+
+class IndexScan(IRecordIterator):
+    """
+    Parcours par index : on ne lit que les records dont la clé est dans [low, high]
+    (bornes incluses, None = pas de borne). Les conditions exactes sont revérifiées
+    au-dessus par un SelectOperator.
+    """
+    def __init__(self, relation, index, low=None, high=None):
+        self.relation = relation
+        self.index = index
+        self.low = low
+        self.high = high
+        self.rids = self.index.Search(self.low, self.high)
+
+    def GetNextRecord(self):
+        rid = next(self.rids, None)
+        if rid is None:
+            return None
+        record = self.relation.read_record_from_page(rid.page_id, rid.slot_idx)
+        record.rid = rid
+        return record
+
+    def Close(self):
+        self.rids.close()
+
+    def Reset(self):
+        self.rids.close()
+        self.rids = self.index.Search(self.low, self.high)
@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
 
 class IRecordIterator(ABC):
+    # Taille des paquets construits par la version par défaut de GetNextBatch
+    BATCH_SIZE = 256
+
     @abstractmethod
     def GetNextRecord(self):
         """Retourne le prochain Record ou None si fini."""
         pass
 
+    def GetNextBatch(self):
+        """
+        Retourne une liste non vide de Records ou None si fini.
+        Par défaut on regroupe des GetNextRecord ; les itérateurs qui lisent page par page la redéfinissent.
+        """
+        batch = []
+        while len(batch) < self.BATCH_SIZE:
+            rec = self.GetNextRecord()
+            if rec is None:
+                break
+            batch.append(rec)
+        return batch or None
+
     @abstractmethod
     def Close(self):
         """Libère les ressources (buffers, fichiers)."""
@@ -14,4 +30,4 @@ class IRecordIterator(ABC):
     @abstractmethod
     def Reset(self):
         """Repart du début."""
-        pass
\ No newline at end of file
+        pass
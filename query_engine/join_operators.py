@@ -0,0 +1,224 @@
+from abc import abstractmethod
+from itertools import islice
+from query_engine.iterators import IRecordIterator
+from query_engine.operators import ExternalSortOperator
+from query_engine.aggregate_operators import MAX_SPILL_DEPTH
+from query_engine.spill import SpillFile
+from managers.relation import Record
+
+
+class _JoinOperator(IRecordIterator):
+    """
+    Base des jointures internes : le record produit est gauche.values + droite.values.
+    Chaque sous-classe écrit sa jointure comme un générateur (_join) ; on le consomme
+    record par record ou par paquets.
+    """
+    def __init__(self, left: IRecordIterator, right: IRecordIterator):
+        self.left = left
+        self.right = right
+        self.results = None
+
+    def GetNextRecord(self):
+        if self.results is None:
+            self.results = self._join()
+        return next(self.results, None)
+
+    def GetNextBatch(self):
+        if self.results is None:
+            self.results = self._join()
+        batch = list(islice(self.results, self.BATCH_SIZE))
+        return batch or None
+
+    @abstractmethod
+    def _join(self):
+        """Générateur des records joints."""
+
+    def Close(self):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        self.left.Close()
+        self.right.Close()
+
+    def Reset(self):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        self.left.Reset()
+        self.right.Reset()
+
+
+def _records(iterator: IRecordIterator):
+    """Tous les records d'un itérateur, lus par paquets."""
+    while True:
+        batch = iterator.GetNextBatch()
+        if batch is None:
+            return
+        yield from batch
+
+
+class HashJoinOperator(_JoinOperator):
+    """
+    Équi-jointure par hachage : la table de hachage est construite sur l'entrée la plus
+    petite (build_left dit laquelle), puis l'autre entrée est lue une seule fois (probe).
+    Si l'entrée de construction dépasse max_rows records, jointure de Grace : les deux entrées
+    sont réparties (par hachage de la clé) dans fanout partitions écrites sur des pages
+    temporaires (SpillFile), puis chaque couple de partitions est joint de la même façon
+    (une partition encore trop grosse est re-répartie).
+    """
+    def __init__(self, left, right, left_keys: list, right_keys: list, disk_manager, buffer_manager,
+                 max_rows: int, fanout: int, build_left: bool = False):
+        super().__init__(left, right)
+        self.left_keys = left_keys
+        self.right_keys = right_keys
+        self.disk_manager = disk_manager
+        self.buffer_manager = buffer_manager
+        self.max_rows = max(1, max_rows)
+        self.fanout = max(2, fanout)
+        self.build_left = build_left
+        self.spills = []
+
+    def _join(self):
+        build, probe = (self.left, self.right) if self.build_left else (self.right, self.left)
+        yield from self._hash_join((rec.values for rec in _records(build)),
+                                   (rec.values for rec in _records(probe)), 0)
+
+    def _hash_join(self, build_rows, probe_rows, depth):
+        if self.build_left:
+            build_keys, probe_keys = self.left_keys, self.right_keys
+        else:
+            build_keys, probe_keys = self.right_keys, self.left_keys
+
+        table = {}
+        count = 0
+        partitions = None
+        for values in build_rows:
+            key = tuple(values[i] for i in build_keys)
+            if partitions is not None:
+                partitions[hash((depth, key)) % self.fanout].Append(values)
+                continue
+            table.setdefault(key, []).append(values)
+            count += 1
+            if count > self.max_rows and depth < MAX_SPILL_DEPTH:
+                # Trop gros pour la mémoire : tout ce qui a été lu part dans les partitions
+                partitions = self._new_partitions()
+                for key, rows in table.items():
+                    for row in rows:
+                        partitions[hash((depth, key)) % self.fanout].Append(row)
+                table = {}
+
+        if partitions is None:
+            for values in probe_rows:
+                matches = table.get(tuple(values[i] for i in probe_keys))
+                if matches:
+                    yield from self._output(matches, values)
+            return
+
+        # La profondeur entre dans le hachage : une partition se re-répartit autrement
+        probe_partitions = self._new_partitions()
+        for values in probe_rows:
+            probe_partitions[hash((depth, tuple(values[i] for i in probe_keys))) % self.fanout].Append(values)
+        for build_part, probe_part in zip(partitions, probe_partitions):
+            build_part.Finish()
+            probe_part.Finish()
+            if build_part.count and probe_part.count:
+                yield from self._hash_join(build_part.Read(), probe_part.Read(), depth + 1)
+            build_part.Free()
+            probe_part.Free()
+
+    def _output(self, matches, values):
+        if self.build_left:
+            for build_values in matches:
+                yield Record(build_values + values)
+        else:
+            for build_values in matches:
+                yield Record(values + build_values)
+
+    def _new_partitions(self) -> list:
+        partitions = [SpillFile(self.disk_manager, self.buffer_manager) for _ in range(self.fanout)]
+        self.spills.extend(partitions)
+        return partitions
+
+    def _free_spills(self):
+        for partition in self.spills:
+            partition.Free()
+        self.spills = []
+
+    def Close(self):
+        super().Close()
+        self._free_spills()
+
+    def Reset(self):
+        super().Reset()
+        self._free_spills()
+
+
+class SortMergeJoinOperator(_JoinOperator):
+    """
+    Équi-jointure par tri-fusion : les deux entrées sont triées sur la clé par un tri externe
+    (ExternalSortOperator : runs de run_size records, fusionnés fan_in à la fois) puis
+    parcourues en parallèle. Seul le groupe de clés égales en cours côté droit est gardé
+    en mémoire ; chaque record gauche de la même clé est joint à tout ce groupe.
+    """
+    def __init__(self, left, right, left_keys: list, right_keys: list, disk_manager, buffer_manager,
+                 run_size: int, fan_in: int):
+        left = ExternalSortOperator(left, [(i, False) for i in left_keys], disk_manager, buffer_manager, run_size, fan_in)
+        right = ExternalSortOperator(right, [(i, False) for i in right_keys], disk_manager, buffer_manager, run_size, fan_in)
+        super().__init__(left, right)
+        self.left_keys = left_keys
+        self.right_keys = right_keys
+
+    @staticmethod
+    def _keyed(iterator, keys):
+        for rec in _records(iterator):
+            yield tuple(rec.values[i] for i in keys), rec.values
+
+    def _join(self):
+        left = self._keyed(self.left, self.left_keys)
+        right = self._keyed(self.right, self.right_keys)
+        left_row, right_row = next(left, None), next(right, None)
+        while left_row is not None and right_row is not None:
+            key = left_row[0]
+            if key < right_row[0]:
+                left_row = next(left, None)
+            elif key > right_row[0]:
+                right_row = next(right, None)
+            else:
+                group = []
+                while right_row is not None and right_row[0] == key:
+                    group.append(right_row[1])
+                    right_row = next(right, None)
+                while left_row is not None and left_row[0] == key:
+                    left_values = left_row[1]
+                    for right_values in group:
+                        yield Record(left_values + right_values)
+                    left_row = next(left, None)
+
+
+class BlockNestedLoopJoinOperator(_JoinOperator):
+    """
+    Jointure par boucles imbriquées par blocs : on charge block_size records de gauche,
+    puis on relit toute l'entrée de droite (Reset) pour chaque bloc.
+    Marche pour n'importe quelles conditions (évaluées sur le record joint).
+    """
+    def __init__(self, left, right, conditions: list, block_size: int):
+        super().__init__(left, right)
+        self.conditions = conditions
+        self.block_size = max(1, block_size)
+
+    def _join(self):
+        outer = _records(self.left)
+        first_block = True
+        while True:
+            block = [rec.values for rec in islice(outer, self.block_size)]
+            if not block:
+                return
+            if not first_block:
+                self.right.Reset()
+            first_block = False
+
+            for rec in _records(self.right):
+                for left_values in block:
+                    joined = Record(left_values + rec.values)
+                    if all(cond.evaluate(joined) for cond in self.conditions):
+                        yield joined
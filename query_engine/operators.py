@@ -1,6 +1,22 @@
+import heapq
+import operator
+from functools import cmp_to_key
+from itertools import islice
 from query_engine.iterators import IRecordIterator
+from query_engine.spill import SpillFile
+from query_engine.columnar import np, HAS_NUMPY
 from managers.relation import Record
 
+# Opérateurs de comparaison résolus une fois pour toutes (au lieu d'une chaîne de if par record)
+OPERATORS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
 class Condition:
     def __init__(self, col_idx, op, val, type_col, rhs_is_col=False):
         self.col_idx = col_idx
@@ -16,60 +32,171 @@ class Condition:
             elif self.type_col == "FLOAT":
                 self.val = float(self.val)
 
-    def evaluate(self, rec):
+        # Prédicat compilé une fois (au moment du plan) : evaluate(rec) -> bool
+        self.evaluate = self._compile()
+
+    def __getstate__(self):
+        # Le prédicat compilé ne se pickle pas (lambda) : il est recompilé à l'arrivée (scan parallèle)
+        state = self.__dict__.copy()
+        del state["evaluate"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.evaluate = self._compile()
+
+    def _compile(self):
+        compare = OPERATORS.get(self.op)
+        if compare is None:
+            return lambda rec: False
+        if self.rhs_is_col:
+            return self._evaluate_col_vs_col
+
+        # Colonne vs constante : le cas courant, réduit à un seul appel
+        col_idx = self.col_idx
+        val = self.val
+        return lambda rec: compare(rec.values[col_idx], val)
+
+    def _evaluate_col_vs_col(self, rec):
         # Récupération valeur gauche
         val_left = rec.values[self.col_idx]
+        # Si c'est Col vs Col, on va chercher la valeur dans le record à l'index stocké
+        val_right = rec.values[self.val] 
         
-        # Récupération valeur droite
+        try:
+            if isinstance(val_left, (int, float)) and isinstance(val_right, str):
+                val_right = float(val_right)
+            elif isinstance(val_left, str) and isinstance(val_right, (int, float)):
+                val_left = float(val_left)
+        except:
+            pass # Si conversion impossible, je laisse Python comparer
+
+        return OPERATORS[self.op](val_left, val_right)
+
+    def evaluate_columns(self, batch):
+        """
+        Version vectorisée sur un ColumnBatch : retourne un masque booléen NumPy,
+        ou None si la condition ne se vectorise pas (le record par record prend le relais).
+        """
+        compare = OPERATORS.get(self.op)
+        if compare is None:
+            return None
+        left = batch.columns[self.col_idx]
+
         if self.rhs_is_col:
-            # Si c'est Col vs Col, on va chercher la valeur dans le record à l'index stocké
-            val_right = rec.values[self.val] 
-            
-            try:
-                if isinstance(val_left, (int, float)) and isinstance(val_right, str):
-                    val_right = float(val_right)
-                elif isinstance(val_left, str) and isinstance(val_right, (int, float)):
-                    val_left = float(val_left)
-            except:
-                pass # Si conversion impossible, je laisse Python comparer
+            right = batch.columns[self.val]
+            numeric = left.dtype.kind in "if" and right.dtype.kind in "if"
+            if not numeric and not (left.dtype.kind == "S" and right.dtype.kind == "S"):
+                return None
+            return compare(left, right)
+
+        if left.dtype.kind == "S":
+            val = np.bytes_(str(self.val).encode('utf-8'))
+        elif left.dtype.kind == "f":
+            # Comparaison en double, comme le chemin Python (le FLOAT stocké est un float32)
+            val = np.float64(self.val)
         else:
-            # Sinon c'est une constante (déjà convertie dans le __init__)
-            val_right = self.val
-
-        # 3. Comparaison
-        if self.op == "=": return val_left == val_right
-        if self.op == "<>": return val_left != val_right
-        if self.op == ">": return val_left > val_right
-        if self.op == "<": return val_left < val_right
-        if self.op == ">=": return val_left >= val_right
-        if self.op == "<=": return val_left <= val_right
-        return False
+            val = np.int64(self.val)
+        return compare(left, val)
 
 class SelectOperator(IRecordIterator):
-    def __init__(self, child_iterator: IRecordIterator, conditions: list):
+    def __init__(self, child_iterator: IRecordIterator, conditions: list, vectorized=None):
         self.child = child_iterator
         self.conditions = conditions # Liste d'objets Condition
 
+        # Mode colonnes (NumPy) si le fils sait décoder ses pages en colonnes
+        if vectorized is None:
+            vectorized = HAS_NUMPY and hasattr(child_iterator, "GetNextColumnBatch")
+        self.vectorized = vectorized and bool(conditions)
+
+        # Records déjà filtrés mais pas encore rendus par GetNextRecord
+        self.pending = []
+        self.pending_pos = 0
+
     def GetNextRecord(self):
+        if not self.vectorized:
+            while True:
+                rec = self.child.GetNextRecord()
+                if rec is None:
+                    return None
+                
+                # Vérifie TOUTES les conditions
+                match = True
+                for cond in self.conditions:
+                    if not cond.evaluate(rec):
+                        match = False
+                        break
+                
+                if match:
+                    return rec
+
+        while self.pending_pos >= len(self.pending):
+            batch = self._next_vectorized_batch()
+            if batch is None:
+                return None
+            self.pending = batch
+            self.pending_pos = 0
+        rec = self.pending[self.pending_pos]
+        self.pending_pos += 1
+        return rec
+
+    def GetNextBatch(self):
+        if self.vectorized:
+            if self.pending_pos < len(self.pending):
+                batch = self.pending[self.pending_pos:]
+                self.pending = []
+                self.pending_pos = 0
+                return batch
+            return self._next_vectorized_batch()
+
         while True:
-            rec = self.child.GetNextRecord()
-            if rec is None:
+            batch = self.child.GetNextBatch()
+            if batch is None:
                 return None
-            
-            # Vérifie TOUTES les conditions
-            match = True
+            # Chaîne de AND : chaque condition filtre le paquet, on s'arrête dès qu'il est vide
             for cond in self.conditions:
-                if not cond.evaluate(rec):
-                    match = False
+                evaluate = cond.evaluate
+                batch = [rec for rec in batch if evaluate(rec)]
+                if not batch:
                     break
-            
-            if match:
-                return rec
+            if batch:
+                return batch
+
+    def _next_vectorized_batch(self):
+        """Filtre page par page sur les colonnes, puis ne reconstruit que les records retenus."""
+        while True:
+            batch = self.child.GetNextColumnBatch()
+            if batch is None:
+                return None
+
+            mask = None
+            remaining = []
+            for i, cond in enumerate(self.conditions):
+                cond_mask = cond.evaluate_columns(batch)
+                if cond_mask is None:
+                    remaining = self.conditions[i:]
+                    break
+                mask = cond_mask if mask is None else mask & cond_mask
+                if not mask.any():
+                    break
+
+            if mask is not None and not mask.any():
+                continue
+            records = batch.to_records(mask)
+            for cond in remaining:
+                evaluate = cond.evaluate
+                records = [rec for rec in records if evaluate(rec)]
+            if records:
+                return records
 
     def Close(self):
+        self.pending = []
+        self.pending_pos = 0
         self.child.Close()
 
     def Reset(self):
+        self.pending = []
+        self.pending_pos = 0
         self.child.Reset()
 
 class ProjectOperator(IRecordIterator):
@@ -86,8 +213,208 @@ class ProjectOperator(IRecordIterator):
         new_values = [rec.values[i] for i in self.keep_indices]
         return Record(new_values)
 
+    def GetNextBatch(self):
+        batch = self.child.GetNextBatch()
+        if batch is None:
+            return None
+        keep = self.keep_indices
+        return [Record([rec.values[i] for i in keep]) for rec in batch]
+
     def Close(self):
         self.child.Close()
         
     def Reset(self):
-        self.child.Reset()
\ No newline at end of file
+        self.child.Reset()
+
+class LimitOperator(IRecordIterator):
+    """
+    LIMIT n OFFSET m : saute m records puis en rend au plus n (limit=None : pas de limite).
+    Dès que n records sont sortis, le fils est fermé (scan arrêté, pages et fichiers
+    temporaires rendus) : on ne lit que les pages nécessaires.
+    """
+    def __init__(self, child_iterator: IRecordIterator, limit: int = None, offset: int = 0):
+        self.child = child_iterator
+        self.limit = limit
+        self.offset = offset
+        self.to_skip = offset
+        self.remaining = limit
+        self.closed = False
+
+    def GetNextRecord(self):
+        while self.to_skip > 0:
+            if self._next() is None:
+                return None
+            self.to_skip -= 1
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+        rec = self._next()
+        if self.remaining == 0:
+            self._close_child()
+        return rec
+
+    def GetNextBatch(self):
+        while True:
+            if self.remaining is not None and self.remaining <= 0:
+                return None
+            batch = self._next_batch()
+            if batch is None:
+                return None
+            if self.to_skip > 0:
+                skipped = min(self.to_skip, len(batch))
+                self.to_skip -= skipped
+                batch = batch[skipped:]
+                if not batch:
+                    continue
+            if self.remaining is not None:
+                batch = batch[:self.remaining]
+                self.remaining -= len(batch)
+                if self.remaining == 0:
+                    self._close_child()
+            return batch
+
+    def _next(self):
+        return None if self.closed else self.child.GetNextRecord()
+
+    def _next_batch(self):
+        return None if self.closed else self.child.GetNextBatch()
+
+    def _close_child(self):
+        if not self.closed:
+            self.closed = True
+            self.child.Close()
+
+    def Close(self):
+        self._close_child()
+
+    def Reset(self):
+        self.to_skip = self.offset
+        self.remaining = self.limit
+        self.closed = False
+        self.child.Reset()
+
+
+def sort_key(sort_keys: list):
+    """
+    Clé de tri pour une liste de valeurs et sens global : (clé, reverse).
+    sort_keys = [(index de colonne, décroissant ?), ...]. Si tous les sens sont identiques
+    on trie sur un simple tuple ; sinon on compare colonne par colonne.
+    """
+    indices = [idx for idx, _ in sort_keys]
+    directions = {desc for _, desc in sort_keys}
+    if len(directions) == 1:
+        return (lambda values: tuple(values[i] for i in indices)), directions.pop()
+
+    def compare(a, b):
+        for idx, desc in sort_keys:
+            if a[idx] != b[idx]:
+                less = a[idx] < b[idx]
+                return (1 if less else -1) if desc else (-1 if less else 1)
+        return 0
+    return cmp_to_key(compare), False
+
+class ExternalSortOperator(IRecordIterator):
+    """
+    Tri externe (ORDER BY) à mémoire bornée :
+      1. on lit l'entrée par runs de run_size records, triés en mémoire ;
+      2. chaque run est écrit sur des pages temporaires (SpillFile) ;
+      3. les runs sont fusionnés avec un tas (heapq.merge), fan_in à la fois : au-delà,
+         on fusionne en plusieurs passes.
+    Si tout tient dans un seul run, rien n'est écrit. Avec limit (ORDER BY ... LIMIT k) et
+    k <= run_size, on garde seulement les k meilleurs dans un tas (top-K), sans débordement.
+    Le tri est stable : à clés égales, l'ordre d'entrée est conservé.
+    """
+    def __init__(self, child: IRecordIterator, sort_keys: list, disk_manager, buffer_manager,
+                 run_size: int, fan_in: int, limit: int = None):
+        self.child = child
+        self.sort_keys = sort_keys
+        self.disk_manager = disk_manager
+        self.buffer_manager = buffer_manager
+        self.run_size = max(1, run_size)
+        self.fan_in = max(2, fan_in)
+        self.limit = limit
+        self.key, self.reverse = sort_key(sort_keys)
+        self.runs = []
+        self.results = None
+
+    def GetNextRecord(self):
+        if self.results is None:
+            self.results = self._sorted()
+        values = next(self.results, None)
+        return None if values is None else Record(values)
+
+    def GetNextBatch(self):
+        if self.results is None:
+            self.results = self._sorted()
+        batch = [Record(values) for values in islice(self.results, self.BATCH_SIZE)]
+        return batch or None
+
+    def _input(self):
+        while True:
+            batch = self.child.GetNextBatch()
+            if batch is None:
+                return
+            for rec in batch:
+                yield rec.values
+
+    def _sorted(self):
+        """Générateur des valeurs triées."""
+        rows = self._input()
+        if self.limit is not None and self.limit <= self.run_size:
+            select = heapq.nlargest if self.reverse else heapq.nsmallest
+            yield from select(self.limit, rows, key=self.key)
+            return
+
+        while True:
+            run = list(islice(rows, self.run_size))
+            if not run:
+                break
+            run.sort(key=self.key, reverse=self.reverse)
+            if not self.runs and len(run) < self.run_size:
+                # Tout tient en mémoire
+                yield from run[:self.limit]
+                return
+            self.runs.append(self._spill(run))
+
+        # Fusions intermédiaires tant qu'il y a plus de runs que de pages pour les lire
+        # (les groupes gardent l'ordre des runs : le tri reste stable)
+        while len(self.runs) > self.fan_in:
+            merged = []
+            for start in range(0, len(self.runs), self.fan_in):
+                group = self.runs[start:start + self.fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                merged.append(self._spill(self._merge(group)))
+                for run in group:
+                    run.Free()
+            self.runs = merged
+
+        yield from islice(self._merge(self.runs), self.limit)
+
+    def _merge(self, runs):
+        return heapq.merge(*(run.Read() for run in runs), key=self.key, reverse=self.reverse)
+
+    def _spill(self, rows):
+        run = SpillFile(self.disk_manager, self.buffer_manager)
+        for values in rows:
+            run.Append(values)
+        run.Finish()
+        return run
+
+    def _free_runs(self):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        for run in self.runs:
+            run.Free()
+        self.runs = []
+
+    def Close(self):
+        self._free_runs()
+        self.child.Close()
+
+    def Reset(self):
+        self._free_runs()
+        self.child.Reset()
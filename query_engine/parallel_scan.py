@@ -0,0 +1,273 @@
+import math
+import multiprocessing
+import os
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from query_engine.iterators import IRecordIterator
+from managers.relation import Record
+from managers.disk_manager import _pread_into
+from query_engine.columnar import np, HAS_NUMPY, schema_dtype
+
+# Pages lues par tâche au plus (une tâche = une plage contiguë de la liste des pages)
+MAX_PAGES_PER_TASK = 64
+# Tâches par worker : des plages plus petites équilibrent mieux la charge en fin de scan
+TASKS_PER_WORKER = 4
+
+
+# ---------------------------------------------------------------------------
+# Côté worker (processus séparé) : lecture directe des fichiers, sans BufferManager
+# ---------------------------------------------------------------------------
+
+def _read_runs(layout, pages, copies):
+    """
+    Lit les pages [(file_idx, page_idx), ...] : (données, nombre de pages) par suite de pages voisines
+    d'un même fichier (un seul pread). Les pages de copies (copiées du buffer pool) ne sont pas lues.
+    """
+    paths, pagesize = layout[0], layout[1]
+    fds = {}
+    try:
+        i = 0
+        while i < len(pages):
+            copy = copies.get(pages[i])
+            if copy is not None:
+                yield copy, 1
+                i += 1
+                continue
+            file_idx, first = pages[i]
+            count = 1
+            while (i + count < len(pages) and pages[i + count] == (file_idx, first + count)
+                   and pages[i + count] not in copies):
+                count += 1
+
+            fd = fds.get(file_idx)
+            if fd is None:
+                fd = fds[file_idx] = os.open(paths[file_idx], os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            data = bytearray(count * pagesize)
+            # Au-delà de la fin du fichier (page jamais écrite) : les zéros restent
+            _pread_into(fd, data, first * pagesize)
+
+            yield data, count
+            i += count
+    finally:
+        for fd in fds.values():
+            os.close(fd)
+
+
+def _scan_rows(layout, pages, copies, conditions):
+    """Valeurs des records des pages qui vérifient toutes les conditions."""
+    if HAS_NUMPY:
+        yield from _scan_rows_columns(layout, pages, copies, conditions)
+        return
+    _, pagesize, schema, record_format, slot_count, record_size, char_cols = layout
+    record_struct = struct.Struct(record_format)
+    slots_end = slot_count + slot_count * record_size
+    for data, count in _read_runs(layout, pages, copies):
+        view = memoryview(data)
+        for start in range(0, count * pagesize, pagesize):
+            buff = view[start:start + pagesize]
+            bitmap = bytes(buff[:slot_count])
+            for used, row in zip(bitmap, record_struct.iter_unpack(buff[slot_count:slots_end])):
+                if not used:
+                    continue
+                values = list(row)
+                for i in char_cols:
+                    values[i] = values[i].rstrip(b'\x00').decode('utf-8')
+                if all(cond.evaluate(Record(values)) for cond in conditions):
+                    yield values
+
+
+class _Columns:
+    """Colonnes NumPy d'une suite de pages, pour Condition.evaluate_columns (comme un ColumnBatch)."""
+    def __init__(self, columns):
+        self.columns = columns
+
+
+def _scan_rows_columns(layout, pages, copies, conditions):
+    """
+    Même chose avec NumPy : une suite de pages lues d'un coup est vue comme un tableau
+    (bitmap, slots) par page, filtré en colonnes comme dans SelectOperator.
+    """
+    _, pagesize, schema, _, slot_count, _, char_cols = layout
+    page_dtype = np.dtype({"names": ["bitmap", "rows"],
+                           "formats": [(np.uint8, slot_count), (schema_dtype(schema), slot_count)],
+                           "offsets": [0, slot_count], "itemsize": pagesize})
+    for data, count in _read_runs(layout, pages, copies):
+        run = np.frombuffer(data, dtype=page_dtype, count=count)
+        rows = run["rows"].reshape(-1)[np.flatnonzero(run["bitmap"].reshape(-1))]
+        columns = [rows[name] for name in rows.dtype.names]
+
+        mask = None
+        remaining = []
+        for i, cond in enumerate(conditions):
+            cond_mask = cond.evaluate_columns(_Columns(columns))
+            if cond_mask is None:
+                remaining = conditions[i:]
+                break
+            mask = cond_mask if mask is None else mask & cond_mask
+        if mask is not None:
+            if not mask.any():
+                continue
+            columns = [col[mask] for col in columns]
+
+        cols = [col.tolist() for col in columns]
+        for i in char_cols:
+            # NumPy retire déjà les \x00 de fin des chaînes "S"
+            cols[i] = [raw.decode('utf-8') for raw in cols[i]]
+        for values in zip(*cols):
+            values = list(values)
+            if all(cond.evaluate(Record(values)) for cond in remaining):
+                yield values
+
+
+def _scan_task(layout, pages, copies, conditions, aggregate):
+    """
+    Tâche d'un worker : sans aggregate, les lignes retenues ; avec aggregate = (group_cols, aggregates),
+    les agrégats partiels de la plage [(clé du groupe, états), ...].
+    """
+    rows = _scan_rows(layout, pages, copies, conditions)
+    if aggregate is None:
+        return list(rows)
+
+    group_cols, aggregates = aggregate
+    table = {}
+    for values in rows:
+        key = tuple(values[i] for i in group_cols)
+        states = table.get(key)
+        if states is None:
+            table[key] = [agg.start(values) for agg in aggregates]
+        else:
+            for i, agg in enumerate(aggregates):
+                states[i] = agg.step(states[i], values)
+    return list(table.items())
+
+
+# ---------------------------------------------------------------------------
+# Côté coordinateur
+# ---------------------------------------------------------------------------
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool de processus partagé par toutes les requêtes (créé au premier scan parallèle)."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn plutôt que fork : le processus principal a des threads (writer, serveur)
+            # dont les verrous seraient copiés dans l'état où ils sont
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+def _drop_worker_pool(workers: int, pool):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+
+
+class ParallelScanOperator(IRecordIterator):
+    """
+    Parcours complet d'une table par plusieurs processus : la liste des pages est découpée
+    en plages contiguës, chaque worker lit ses pages directement dans les fichiers DataX.bin
+    (pread, aussi en mode mmap : le mapping est partagé avec le cache du noyau), les décode
+    et les filtre. Seules les lignes retenues (ou des agrégats partiels, voir
+    PartialAggregates) reviennent ici, dans l'ordre des pages.
+    Les pages de la table que le disque n'a peut-être pas à jour (dirty ou épinglées dans le
+    pool) sont copiées au départ et envoyées avec leur tâche : les workers voient le même
+    état de la table qu'un RelationScanner, sans rien écrire ni vider le journal.
+    Les records produits n'ont pas de RecordId : réservé aux SELECT.
+    """
+    def __init__(self, relation, conditions: list, workers: int):
+        self.relation = relation
+        self.conditions = conditions
+        self.workers = workers
+        self.results = None
+        self.pending = deque()   # tâches envoyées, dans l'ordre des pages
+
+        # Paquet en cours de GetNextRecord
+        self.batch = []
+        self.batch_pos = 0
+
+    def GetNextRecord(self):
+        if self.batch_pos >= len(self.batch):
+            self.batch = self._next_rows() or []
+            self.batch_pos = 0
+            if not self.batch:
+                return None
+        rec = self.batch[self.batch_pos]
+        self.batch_pos += 1
+        return rec
+
+    def GetNextBatch(self):
+        if self.batch_pos < len(self.batch):
+            batch = self.batch[self.batch_pos:]
+        else:
+            batch = self._next_rows()
+        self.batch = []
+        self.batch_pos = 0
+        return batch
+
+    def _next_rows(self):
+        """Lignes retenues de la prochaine plage qui en a, ou None si fini."""
+        if self.results is None:
+            self.results = self._run(None)
+        for rows in self.results:
+            if rows:
+                return [Record(values) for values in rows]
+        return None
+
+    def PartialAggregates(self, group_cols: list, aggregates: list):
+        """Générateur des agrégats partiels [(clé, états), ...] calculés par les workers, une liste par plage."""
+        self._stop()
+        self.results = self._run((group_cols, aggregates))
+        return self.results
+
+    def _layout(self):
+        rel = self.relation
+        dm = rel.disk_manager
+        with rel.lock:
+            page_ids = list(rel.allocated_pages)
+        pages = [(page_id.FileIdx, page_id.PageIdx) for page_id in page_ids]
+        paths = {file_idx: dm.get_file_path(file_idx) for file_idx in {file_idx for file_idx, _ in pages}}
+        layout = (paths, dm.config.pagesize, rel.schema, rel.record_struct.format, rel.slot_count, rel.record_size, rel._char_cols)
+        # Les workers lisent le disque : les pages qui n'y sont peut-être pas à jour partent avec leur tâche
+        copies = {(page_id.FileIdx, page_id.PageIdx): data
+                  for page_id, data in rel.buffer_manager.CopyUnsyncedPages(page_ids).items()}
+        return layout, pages, copies
+
+    def _run(self, aggregate):
+        layout, pages, copies = self._layout()
+
+        size = max(1, min(MAX_PAGES_PER_TASK, math.ceil(len(pages) / (self.workers * TASKS_PER_WORKER))))
+        ranges = (pages[start:start + size] for start in range(0, len(pages), size))
+        pool = get_worker_pool(self.workers)
+        try:
+            # Au plus 2 tâches d'avance par worker : un consommateur lent ne remplit pas la mémoire
+            for task_pages in ranges:
+                task_copies = {page: copies[page] for page in task_pages if page in copies}
+                self.pending.append(pool.submit(_scan_task, layout, task_pages, task_copies, self.conditions, aggregate))
+                if len(self.pending) >= 2 * self.workers:
+                    yield self.pending.popleft().result()
+            while self.pending:
+                yield self.pending.popleft().result()
+        except BrokenProcessPool:
+            _drop_worker_pool(self.workers, pool)
+            raise Exception("Scan parallèle : un worker s'est arrêté brutalement")
+
+    def _stop(self):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        while self.pending:
+            self.pending.popleft().cancel()
+        self.batch = []
+        self.batch_pos = 0
+
+    def Close(self):
+        self._stop()
+
+    def Reset(self):
+        self._stop()
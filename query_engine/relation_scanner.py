@@ -1,48 +1,82 @@
 from query_engine.iterators import IRecordIterator
-from managers.page_id import PageId
-from managers.record_id import RecordId
-from query_engine.iterators import IRecordIterator
-from managers.record_id import RecordId
+from query_engine.columnar import decode_page
+
 class RelationScanner(IRecordIterator):
-    def __init__(self, relation):
+    def __init__(self, relation, readahead=None):
         self.relation = relation
-        self.current_page_idx = 0
-        self.current_slot_idx = 0
         
         # Pour simplifier sans HeaderPage complexe, on récupère la liste des pages allouées
         self.data_pages = self.relation.GetDataPages() 
-        self.current_record_idx_in_page_list = 0
+        self.current_page_idx = 0
+
+        # Records de la page courante, déjà décodés (page épinglée une seule fois)
+        self.batch = []
+        self.batch_pos = 0
+
+        # Accès séquentiel : on annonce au BufferManager les `readahead` pages suivantes
+        if readahead is None:
+            readahead = self.relation.buffer_manager.config.bm_readahead
+        self.readahead = readahead
 
     def GetNextRecord(self):
-        while self.current_record_idx_in_page_list < len(self.data_pages):
-            page_id = self.data_pages[self.current_record_idx_in_page_list]
-            buff = self.relation.buffer_manager.GetPage(page_id)
-            slot_count = self.relation.slot_count
-            
-            while self.current_slot_idx < slot_count:
-                if buff[self.current_slot_idx] == 1:
-                    # Lire le record
-                    record = self.relation.read_record_from_page(page_id, self.current_slot_idx)
-                    
-                    
-                    # On attache l'ID physique au record pour DELETE/UPDATE
-                    record.rid = RecordId(page_id, self.current_slot_idx) 
-                    
-                    self.current_slot_idx += 1
-                    self.relation.buffer_manager.FreePage(page_id, False)
-                    return record
-                
-                self.current_slot_idx += 1
-            
-            self.relation.buffer_manager.FreePage(page_id, False)
-            self.current_record_idx_in_page_list += 1
-            self.current_slot_idx = 0
-            
+        if self.batch_pos >= len(self.batch):
+            self.batch = self._read_next_page()
+            self.batch_pos = 0
+            if self.batch is None:
+                self.batch = []
+                return None
+
+        record = self.batch[self.batch_pos]
+        self.batch_pos += 1
+        return record
+
+    def GetNextBatch(self):
+        """Retourne les records de la page suivante (ce qui reste de la page courante d'abord)."""
+        if self.batch_pos < len(self.batch):
+            batch = self.batch[self.batch_pos:]
+        else:
+            batch = self._read_next_page()
+        self.batch = []
+        self.batch_pos = 0
+        return batch
+
+    def GetNextColumnBatch(self):
+        """
+        Page suivante décodée en colonnes NumPy (ColumnBatch), ou None si fini.
+        À utiliser à la place de GetNextRecord/GetNextBatch, pas en les mélangeant.
+        """
+        if self.batch_pos < len(self.batch):
+            raise Exception("RelationScanner : page courante déjà entamée record par record")
+        while self.current_page_idx < len(self.data_pages):
+            page_idx = self.current_page_idx
+            self.current_page_idx += 1
+            if self.readahead > 0:
+                self.relation.buffer_manager.Prefetch(self.data_pages[page_idx + 1:page_idx + 1 + self.readahead])
+
+            batch = decode_page(self.relation, self.data_pages[page_idx])
+            if len(batch) > 0:
+                return batch
+        return None
+
+    def _read_next_page(self):
+        """Décode tous les records de la prochaine page non vide, ou None si fini."""
+        while self.current_page_idx < len(self.data_pages):
+            page_idx = self.current_page_idx
+            self.current_page_idx += 1
+            if self.readahead > 0:
+                self.relation.buffer_manager.Prefetch(self.data_pages[page_idx + 1:page_idx + 1 + self.readahead])
+
+            # Les records portent leur ID physique (RecordId) pour DELETE/UPDATE
+            records = self.relation.read_page_records(self.data_pages[page_idx])
+            if records:
+                return records
         return None
 
     def Close(self):
-        pass
+        self.batch = []
+        self.batch_pos = 0
 
     def Reset(self):
-        self.current_record_idx_in_page_list = 0
-        self.current_slot_idx = 0
\ No newline at end of file
+        self.current_page_idx = 0
+        self.batch = []
+        self.batch_pos = 0
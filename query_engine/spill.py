@@ -0,0 +1,75 @@
+import marshal
+import struct
+
+# Chaque record débordé est écrit "longueur (4 octets) + valeurs marshalées" ;
+# un record peut être à cheval sur deux pages
+RECORD_LEN = struct.Struct("<I")
+
+
+class SpillFile:
+    """
+    Fichier temporaire d'un opérateur (runs du tri externe, partitions d'agrégat) :
+    une suite de records écrite sur des pages allouées au DiskManager, sans passer par le
+    buffer pool, puis relue dans l'ordre une page à la fois. Free rend les pages.
+    Les allocations se font dans des transactions système : une requête en lecture seule
+    qui déborde n'écrit rien dans la transaction de l'utilisateur (pas de COMMIT à synchroniser).
+    """
+    def __init__(self, disk_manager, buffer_manager):
+        self.disk_manager = disk_manager
+        self.buffer_manager = buffer_manager
+        self.pagesize = disk_manager.config.pagesize
+        self.pages = []
+        self.count = 0
+        self.pending = bytearray()   # octets pas encore écrits (moins d'une page)
+
+    def Append(self, values: list):
+        data = marshal.dumps(values)
+        self.pending += RECORD_LEN.pack(len(data))
+        self.pending += data
+        self.count += 1
+        while len(self.pending) >= self.pagesize:
+            self._write_page(self.pending[:self.pagesize])
+            del self.pending[:self.pagesize]
+
+    def Finish(self):
+        """Écrit la dernière page (complétée par des zéros) ; à appeler avant Read."""
+        if self.pending:
+            self._write_page(self.pending + bytes(self.pagesize - len(self.pending)))
+            self.pending = bytearray()
+
+    def Read(self):
+        """Générateur des records (listes de valeurs), dans l'ordre d'écriture."""
+        buff = bytearray(self.pagesize)
+        data = bytearray()
+        remaining = self.count
+        for page_id in self.pages:
+            self.disk_manager.ReadPage(page_id, buff)
+            data += buff
+            pos = 0
+            while remaining:
+                if pos + RECORD_LEN.size > len(data):
+                    break
+                (length,) = RECORD_LEN.unpack_from(data, pos)
+                end = pos + RECORD_LEN.size + length
+                if end > len(data):
+                    break
+                yield marshal.loads(data[pos + RECORD_LEN.size:end])
+                pos = end
+                remaining -= 1
+            del data[:pos]
+
+    def Free(self):
+        with self.buffer_manager.SystemTransaction():
+            for page_id in self.pages:
+                self.disk_manager.DeallocPage(page_id)
+        self.pages = []
+        self.count = 0
+        self.pending = bytearray()
+
+    def _write_page(self, data):
+        with self.buffer_manager.SystemTransaction():
+            page_id = self.disk_manager.AllocPage()
+        # Une page réutilisée pourrait encore avoir une vieille copie en RAM
+        self.buffer_manager.DiscardPage(page_id)
+        self.disk_manager.WritePage(page_id, data)
+        self.pages.append(page_id)
@@ -0,0 +1,230 @@
+import socket
+import threading
+from contextlib import contextmanager
+from sql.protocol import encode_message, recv_message
+
+
+class Connection:
+    """
+    Connexion à un serveur SQL (python main.py --serve).
+        conn = Connection("127.0.0.1", 5433)
+        conn.execute("INSERT INTO T VALUES (?, ?)", 1, "a")   -> message du serveur
+        conn.query("SELECT * FROM T WHERE Id = ?", 1)          -> liste de lignes
+        conn.pipeline([("INSERT ...", (1,)), ("SELECT ...", ())])  -> une réponse par requête
+    Une connexion ne sert qu'à un thread à la fois (voir ConnectionPool).
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 5433, timeout: float = None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile("rb")
+        self.next_id = 0
+        self.closed = False
+
+    def execute(self, sql: str, *params):
+        """Exécute une requête : message pour une commande, liste de lignes pour un SELECT."""
+        return self.pipeline([(sql, params)])[0]
+
+    def query(self, sql: str, *params) -> list:
+        result = self.execute(sql, *params)
+        if not isinstance(result, list):
+            raise Exception(f"La requête n'est pas un SELECT : {result}")
+        return result
+
+    def iter_rows(self, sql: str, *params):
+        """Générateur des lignes d'un SELECT, au fil des paquets envoyés par le serveur."""
+        req_id = self._send([(sql, params)])[0]
+        finished = False
+        try:
+            while True:
+                message = self._recv(req_id)
+                if message["type"] == "rows":
+                    yield from message["rows"]
+                    continue
+                finished = True
+                if message["type"] == "error":
+                    raise Exception(message["message"])
+                if message["type"] != "done":
+                    raise Exception(f"La requête n'est pas un SELECT : {message.get('message')}")
+                return
+        finally:
+            if not finished:
+                # Lecture abandonnée : le reste des lignes est encore en route, la connexion est inutilisable
+                self.close()
+
+    def pipeline(self, requests) -> list:
+        """
+        Envoie toutes les requêtes [(sql, params)] d'un coup, puis lit les réponses :
+        un seul aller-retour réseau pour tout le lot. Une requête en erreur lève une exception
+        après la lecture de toutes les réponses (les suivantes ont quand même été exécutées).
+        Le serveur répond pendant que le lot arrive : un lot de plusieurs requêtes est envoyé
+        depuis un autre thread, sinon client et serveur pourraient attendre chacun que l'autre
+        vide le tampon de sa socket (gros lot, gros résultats).
+        """
+        ids, data = self._encode(requests)
+        if len(ids) == 1:
+            self.sock.sendall(data)
+            return self._read_results(ids)
+
+        def send():
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                # Lot incomplet : la lecture des réponses s'arrête aussi (ConnectionError)
+                self._shutdown()
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        try:
+            return self._read_results(ids)
+        except (ConnectionError, OSError, ValueError):
+            # Réponses perdues : la connexion est inutilisable (et l'envoi s'arrête)
+            self._shutdown()
+            self.close()
+            raise
+        finally:
+            sender.join()
+
+    def _read_results(self, ids: list) -> list:
+        results = []
+        error = None
+        for req_id in ids:
+            rows = []
+            while True:
+                message = self._recv(req_id)
+                kind = message["type"]
+                if kind == "rows":
+                    rows.extend(message["rows"])
+                    continue
+                if kind == "done":
+                    results.append(rows)
+                elif kind == "result":
+                    results.append(message["message"])
+                else:
+                    error = error or Exception(message["message"])
+                    results.append(None)
+                break
+        if error is not None:
+            raise error
+        return results
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.stream.close()
+            self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, requests) -> list:
+        ids, data = self._encode(requests)
+        self.sock.sendall(data)
+        return ids
+
+    def _shutdown(self):
+        """Coupe la connexion dans les deux sens : débloque un envoi ou une lecture en cours."""
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _encode(self, requests):
+        """(identifiants, octets à envoyer) d'un lot de requêtes."""
+        data = bytearray()
+        ids = []
+        for sql, params in requests:
+            self.next_id += 1
+            message = {"id": self.next_id, "sql": sql}
+            if params:
+                message["params"] = list(params)
+            data += encode_message(message)
+            ids.append(self.next_id)
+        return ids, data
+
+    def _recv(self, req_id: int) -> dict:
+        message = recv_message(self.stream)
+        if message.get("id") != req_id:
+            raise ConnectionError(f"Réponse inattendue (requête {message.get('id')}, attendue {req_id})")
+        return message
+
+
+class ConnectionPool:
+    """
+    Pool de connexions partagé par les threads d'une application : une connexion rendue
+    est réutilisée (pas de nouvelle connexion TCP par requête). Au plus max_size connexions ;
+    au-delà, acquire attend qu'une connexion soit rendue.
+        with pool.connection() as conn:
+            conn.query("SELECT ...")
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 5433, max_size: int = 8, timeout: float = None):
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cond = threading.Condition()
+        self.idle = []         # connexions libres (la dernière rendue est réutilisée en premier)
+        self.size = 0          # connexions ouvertes (libres + prêtées)
+        self.closed = False
+
+    def acquire(self) -> Connection:
+        with self.cond:
+            while True:
+                if self.closed:
+                    raise Exception("ConnectionPool fermé")
+                if self.idle:
+                    return self.idle.pop()
+                if self.size < self.max_size:
+                    self.size += 1
+                    break
+                self.cond.wait()
+        try:
+            return Connection(self.host, self.port, self.timeout)
+        except Exception:
+            with self.cond:
+                self.size -= 1
+                self.cond.notify()
+            raise
+
+    def release(self, conn: Connection, broken: bool = False):
+        """Rend une connexion au pool ; broken=True la ferme (ex: erreur réseau en cours de requête)."""
+        with self.cond:
+            if broken or self.closed or conn.closed:
+                conn.close()
+                self.size -= 1
+            else:
+                self.idle.append(conn)
+            self.cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except (ConnectionError, OSError):
+            self.release(conn, broken=True)
+            raise
+        except BaseException:
+            # Erreur d'une requête côté serveur : la connexion reste utilisable
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def execute(self, sql: str, *params):
+        with self.connection() as conn:
+            return conn.execute(sql, *params)
+
+    def query(self, sql: str, *params) -> list:
+        with self.connection() as conn:
+            return conn.query(sql, *params)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            for conn in self.idle:
+                conn.close()
+            self.size -= len(self.idle)
+            self.idle = []
+            self.cond.notify_all()
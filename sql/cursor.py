@@ -0,0 +1,79 @@
+from query_engine.iterators import IRecordIterator
+
+
+def format_row(values) -> str:
+    """Format d'affichage d'une ligne : val1 ; val2 ."""
+    return " ; ".join(str(v) for v in values) + " ."
+
+
+class Cursor:
+    """
+    Résultat d'un SELECT lu à la demande (style DB-API) : le plan ne s'exécute qu'au fil des
+    fetch, et seul le paquet de records en cours est gardé en mémoire.
+    Les lignes sont des listes de valeurs. Le plan est fermé (pages, fichiers temporaires)
+    dès la dernière ligne lue, ou par close().
+    """
+    def __init__(self, iterator: IRecordIterator):
+        self.iterator = iterator
+        self.arraysize = IRecordIterator.BATCH_SIZE
+        self.rowcount = 0      # lignes rendues jusqu'ici
+        self.batch = []
+        self.batch_pos = 0
+        self.closed = False
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int = None) -> list:
+        """Au plus size lignes (arraysize par défaut) ; liste vide quand c'est fini."""
+        if size is None:
+            size = self.arraysize
+        rows = []
+        while len(rows) < size:
+            if self.batch_pos >= len(self.batch) and not self._next_batch():
+                break
+            end = min(len(self.batch), self.batch_pos + size - len(rows))
+            rows.extend(rec.values for rec in self.batch[self.batch_pos:end])
+            self.batch_pos = end
+        self.rowcount += len(rows)
+        return rows
+
+    def fetchall(self) -> list:
+        rows = []
+        while True:
+            batch = self.fetchmany()
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
+    def _next_batch(self) -> bool:
+        if self.closed:
+            return False
+        batch = self.iterator.GetNextBatch()
+        if batch is None:
+            self.close()
+            return False
+        self.batch = batch
+        self.batch_pos = 0
+        return True
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.batch = []
+            self.batch_pos = 0
+            self.iterator.Close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,30 +1,88 @@
 from managers.relation import Record
 from query_engine.relation_scanner import RelationScanner
-from query_engine.operators import SelectOperator, ProjectOperator, Condition
+from query_engine.operators import SelectOperator, ProjectOperator, Condition, ExternalSortOperator, LimitOperator
+from query_engine.index_scan import IndexScan
+from query_engine.aggregate_operators import AggregateFunction, HashAggregateOperator, StreamAggregateOperator, ParallelAggregateOperator
+from query_engine.parallel_scan import ParallelScanOperator
+from query_engine.join_operators import HashJoinOperator, SortMergeJoinOperator, BlockNestedLoopJoinOperator
+from sql.cursor import Cursor, format_row
+from managers.statistics import condition_selectivity, full_scan_cost, index_scan_cost
+from sql.parser import parse
+from sql.prepared import PlanCache, PreparedStatement, normalize_query, bind_params, _NO_VALUE
 import csv
 import re
 import os 
+import time
 
 class SQLExecutor:
-    def __init__(self, db_manager):
+    # Algorithme des jointures : AUTO (hachage si équi-jointure, sinon boucles par blocs),
+    # ou forcé : HASH, SORT_MERGE, BNL
+    JOIN_ALGORITHMS = ("AUTO", "HASH", "SORT_MERGE", "BNL")
+
+    # Marque d'un paramètre ? dans un WHERE analysé (valeur fournie à l'exécution)
+    PARAM = "?"
+
+    def __init__(self, db_manager, join_algorithm="AUTO", plan_cache_size=256):
         self.db_manager = db_manager
+        if join_algorithm.upper() not in self.JOIN_ALGORITHMS:
+            raise ValueError(f"Algorithme de jointure inconnu : {join_algorithm}")
+        self.join_algorithm = join_algorithm.upper()
+
+        # Requêtes analysées et WHERE résolus, vidés quand le catalogue change
+        self.plan_cache = PlanCache(plan_cache_size)
+        self.cache_version = db_manager.catalog_version
+        # Requêtes préparées en SQL (PREPARE nom AS ...)
+        self.prepared = {}
+
+    def parse(self, query: str) -> dict:
+        """parse() avec cache : une requête déjà vue (au blanc près) n'est pas ré-analysée."""
+        self._check_plan_cache()
+        key = normalize_query(query)
+        cmd = self.plan_cache.get(key)
+        if cmd is None:
+            cmd = parse(key)
+            self.plan_cache.put(key, cmd)
+        return cmd
+
+    def execute(self, query: str, params=None) -> str:
+        return self.execute_command(self.parse(query), params)
+
+    def prepare(self, query: str) -> PreparedStatement:
+        """Analyse une requête à paramètres ? une fois pour toutes."""
+        return PreparedStatement(self, query)
 
-    def execute_command(self, cmd: dict):
+    def _check_plan_cache(self):
+        if self.cache_version != self.db_manager.catalog_version:
+            self.plan_cache.clear()
+            self.cache_version = self.db_manager.catalog_version
+
+    def execute_command(self, cmd: dict, params=None):
+        """Exécute une commande analysée ; params = valeurs des ? (requête préparée)."""
         action = cmd["action"]
         try:
-            if action == "CREATE_TABLE": return self._create(cmd)
-            elif action == "DROP_TABLE": return self._drop(cmd)
-            elif action == "INSERT": return self._insert(cmd)
-            elif action == "APPEND": return self._import(cmd)             
-            elif action == "SELECT": return self._select(cmd)
-            elif action == "DELETE": return self._delete(cmd)
-            elif action == "UPDATE": return self._update(cmd)
-            elif action == "DESCRIBE_TABLE": return self._describe_table(cmd)
-            elif action == "DESCRIBE_TABLES": return self._describe_tables(cmd)
-            elif action == "DROP_TABLES": return self._drop_tables(cmd)
-            
+            self._check_plan_cache()
+            params = None if params is None else iter(params)
+            # Une commande = une transaction (journal : un COMMIT, et un fsync partagé)
+            with self.db_manager.Transaction():
+                return self._dispatch(action, cmd, params)
         except Exception as e:
             return f"Erreur d'exécution ({action}): {e}"
+
+    def _dispatch(self, action, cmd, params):
+        if action == "CREATE_TABLE": return self._create(cmd)
+        elif action == "CREATE_INDEX": return self._create_index(cmd)
+        elif action == "ANALYZE": return self._analyze(cmd)
+        elif action == "PREPARE": return self._prepare(cmd)
+        elif action == "EXECUTE": return self._execute_prepared(cmd)
+        elif action == "DROP_TABLE": return self._drop(cmd)
+        elif action == "INSERT": return self._insert(cmd, params)
+        elif action == "APPEND": return self._import(cmd)             
+        elif action == "SELECT": return self._select(cmd, params)
+        elif action == "DELETE": return self._delete(cmd, params)
+        elif action == "UPDATE": return self._update(cmd, params)
+        elif action == "DESCRIBE_TABLE": return self._describe_table(cmd)
+        elif action == "DESCRIBE_TABLES": return self._describe_tables(cmd)
+        elif action == "DROP_TABLES": return self._drop_tables(cmd)
         return "Commande non gérée."
 
     
@@ -35,6 +93,8 @@ class SQLExecutor:
 
     def _convert_val(self, val, type_col):
         """Convertit une string vers INT/FLOAT selon le schéma."""
+        if val is None:
+            raise ValueError(f"Valeur NULL impossible pour une colonne {type_col} (pas de NULL).")
         type_col = type_col.upper()
         if type_col == "INT": return int(float(val)) # float() gère "3.0"
         if type_col == "FLOAT": return float(val)
@@ -48,12 +108,30 @@ class SQLExecutor:
                 return col_name
         return col_str
 
-    def _build_iterator(self, rel, where_clause, alias=None):
-        iterator = RelationScanner(rel)
-        if not where_clause: return iterator
-        
+    def _next_param(self, params):
+        val = _NO_VALUE if params is None else next(params, _NO_VALUE)
+        if val is _NO_VALUE:
+            raise ValueError("Paramètre ? sans valeur.")
+        return val
+
+    def _bind_values(self, values, params):
+        """Valeurs d'un INSERT / SET : chaque ? prend la valeur suivante des paramètres."""
+        if params is None:
+            return values
+        return [self._next_param(params) if v == self.PARAM else v for v in values]
+
+    def _where_specs(self, rel, where_clause, alias=None):
+        """
+        WHERE analysé une fois puis gardé dans le cache :
+        [(col_idx, op, valeur brute | PARAM | index de la colonne de droite, type, rhs_is_col)]
+        """
+        key = ("WHERE", rel.name, where_clause, alias)
+        specs = self.plan_cache.get(key)
+        if specs is not None:
+            return specs
+
         sub_clauses = re.split(r'\s+AND\s+', where_clause, flags=re.IGNORECASE)
-        conditions = []
+        specs = []
         
         for clause in sub_clauses:
             clause = clause.strip()
@@ -84,46 +162,256 @@ class SQLExecutor:
             # CAS A : Colonne op Colonne (ex: C4 > C2)
             if left_idx != -1 and right_idx != -1:
                 # On passe l'index de droite comme "valeur", et rhs_is_col=True
-                conditions.append(Condition(left_idx, op, right_idx, left_type, rhs_is_col=True))
+                specs.append((left_idx, op, right_idx, left_type, True))
                 
             # CAS B : Colonne op Valeur (ex: C4 > 100)
             elif left_idx != -1:
-                val_str = right_raw.strip('"').strip("'")
-                conditions.append(Condition(left_idx, op, val_str, left_type, rhs_is_col=False))
+                val_str = right_raw if right_raw == self.PARAM else right_raw.strip('"').strip("'")
+                specs.append((left_idx, op, val_str, left_type, False))
                 
             # CAS C : Valeur op Colonne (Inversion) (ex: 100 < C4)
             elif right_idx != -1:
                 # On inverse tout
-                val_str = left_raw.strip('"').strip("'")
+                val_str = left_raw if left_raw == self.PARAM else left_raw.strip('"').strip("'")
                 inv_ops = {'>':'<', '<':'>', '>=':'<=', '<=':'>=', '=':'=', '<>':'<>'}
                 new_op = inv_ops.get(op, op)
                 right_type = rel.schema[right_idx][1].split('(')[0]
-                conditions.append(Condition(right_idx, new_op, val_str, right_type, rhs_is_col=False))
+                specs.append((right_idx, new_op, val_str, right_type, False))
                 
             else:
-                print(f"Attention: Condition ignorée '{clause}' (colonnes introuvables)")
+                # Ignorer la clause décalerait les paramètres ? suivants
+                raise ValueError(f"Condition '{clause}' : colonne introuvable.")
+
+        self.plan_cache.put(key, specs)
+        return specs
+
+    def _build_iterator(self, rel, where_clause, alias=None, excluded_index_cols=(), params=None, parallel=False):
+        # parallel : un parcours complet peut être réparti entre plusieurs processus (SELECT seulement)
+        workers = self._parallel_workers(rel) if parallel else 0
+        iterator = RelationScanner(rel)
+        if not where_clause:
+            return ParallelScanOperator(rel, [], workers) if workers else iterator
+
+        conditions = []
+        for col_idx, op, val, type_col, rhs_is_col in self._where_specs(rel, where_clause, alias):
+            if not rhs_is_col and val == self.PARAM and params is not None:
+                val = self._convert_val(self._next_param(params), type_col)
+            conditions.append(Condition(col_idx, op, val, type_col, rhs_is_col))
 
         if conditions:
+            # Les conditions les plus sélectives d'abord : le AND s'arrête plus tôt
+            if rel.stats:
+                conditions.sort(key=lambda c: condition_selectivity(rel.stats, c.col_idx, c.op, c.val, c.rhs_is_col))
+            index_scan = self._choose_index_scan(rel, conditions, excluded_index_cols)
+            if index_scan is not None:
+                iterator = index_scan
+            elif workers:
+                # Parcours complet d'une grosse table : les workers filtrent eux-mêmes
+                return ParallelScanOperator(rel, conditions, workers)
+            # Même avec un index, on revérifie toutes les conditions (bornes exactes, autres colonnes)
             iterator = SelectOperator(iterator, conditions)
+        elif workers:
+            return ParallelScanOperator(rel, [], workers)
         return iterator
 
+    def _parallel_workers(self, rel) -> int:
+        """Nombre de processus pour un parcours complet de rel (0 : parcours dans ce thread)."""
+        config = self.db_manager.config
+        if config.qe_parallel_workers < 2 or len(rel.GetDataPages()) < config.qe_parallel_min_pages:
+            return 0
+        return config.qe_parallel_workers
+
+    def _choose_index_scan(self, rel, conditions, excluded_index_cols=()):
+        """
+        Retourne l'IndexScan le moins coûteux pour les conditions Colonne op Constante,
+        ou None si le parcours complet coûte moins (ou si aucun index ne convient).
+        """
+        candidates = {}   # index -> conditions qu'il sait traiter
+        for cond in conditions:
+            if cond.rhs_is_col:
+                continue
+            for index in rel.indexes.values():
+                if index.col_idx == cond.col_idx and index.col_idx not in excluded_index_cols and cond.op in index.SUPPORTED_OPS:
+                    candidates.setdefault(index, []).append(cond)
+        if not candidates:
+            return None
+
+        bounds = {index: self._index_bounds(index, conds) for index, conds in candidates.items()}
+        if not rel.stats:
+            # Sans statistiques : une égalité est plus sélective qu'un intervalle ; pour une
+            # égalité, le hash (un bucket) coûte moins qu'une descente de B+-tree
+            index = min(candidates, key=lambda idx: (all(c.op != "=" for c in candidates[idx]), idx.KIND != "HASH"))
+            return IndexScan(rel, index, *bounds[index])
+
+        costs = {index: index_scan_cost(rel.stats, index, *bounds[index]) for index in candidates}
+        index = min(costs, key=costs.get)
+        if costs[index] >= full_scan_cost(rel.stats):
+            return None
+        return IndexScan(rel, index, *bounds[index])
+
+    def _index_bounds(self, index, conditions):
+        """Bornes [low, high] (incluses) à demander à l'index pour ces conditions."""
+        if index.KIND == "HASH":
+            val = next(cond.val for cond in conditions if cond.op == "=")
+            return val, val
+        low = high = None
+        for cond in conditions:
+            # Intersection des bornes de toutes les conditions sur cette colonne
+            if cond.op in ("=", ">", ">="):
+                low = cond.val if low is None else max(low, cond.val)
+            if cond.op in ("=", "<", "<="):
+                high = cond.val if high is None else min(high, cond.val)
+        return low, high
+
+
+    def _find_join_col(self, col_str, columns):
+        """Position d'une colonne (Col, Table.Col ou Alias.Col) dans le record joint, -1 si introuvable."""
+        prefix, _, name = col_str.rpartition(".")
+        found = [i for i, (_, rel_name, alias, cname, _) in enumerate(columns)
+                 if cname == name and (not prefix or prefix in (rel_name, alias))]
+        if len(found) > 1:
+            raise ValueError(f"Colonne ambiguë : {col_str}")
+        return found[0] if found else -1
+
+    def _build_join(self, cmd, params=None):
+        """
+        Plan d'un SELECT avec JOIN (jointure interne, arbre gauche) : retourne (itérateur, colonnes).
+        Les clauses du WHERE et des ON sur une seule table descendent sous la jointure (et peuvent
+        utiliser un index) ; Col = Col entre deux tables devient une clé de jointure ; le reste
+        est vérifié sur le record joint dès que toutes ses tables sont jointes.
+        """
+        sources = [(self._get_rel(cmd["table"]), cmd.get("alias"))]
+        sources += [(self._get_rel(join["table"]), join.get("alias")) for join in cmd["joins"]]
+        # (n° de table, nom de table, alias, colonne, type) dans l'ordre du record joint
+        columns = [(src, rel.name, alias, cname, ctype)
+                   for src, (rel, alias) in enumerate(sources) for cname, ctype in rel.schema]
+
+        # Paramètres ? : substitués dans le texte, dans l'ordre de la requête (ON puis WHERE)
+        on_clauses = [join["on"] for join in cmd["joins"]]
+        where_clause = cmd["where"]
+        if params is not None:
+            on_clauses = [bind_params(on, params) for on in on_clauses]
+            where_clause = bind_params(where_clause, params)
+
+        clauses = re.split(r'\s+AND\s+', where_clause, flags=re.IGNORECASE) if where_clause else []
+        for on in on_clauses:
+            clauses += re.split(r'\s+AND\s+', on, flags=re.IGNORECASE)
+
+        pushed = [[] for _ in sources]        # clauses d'une seule table, par table
+        join_keys = [[] for _ in sources]     # (colonne gauche, colonne droite) par étape de jointure
+        residual = [[] for _ in sources]      # Conditions sur le record joint, par étape
+        for clause in clauses:
+            clause = clause.strip()
+            match = re.split(r'(>=|<=|<>|=|>|<)', clause)
+            if len(match) < 3: continue
+            op = match[1].strip()
+            left_idx = self._find_join_col(match[0].strip(), columns)
+            right_idx = self._find_join_col(match[2].strip(), columns)
+            if left_idx == -1 and right_idx == -1:
+                raise ValueError(f"Condition '{clause}' : colonne introuvable.")
+
+            tables = {columns[i][0] for i in (left_idx, right_idx) if i != -1}
+            if len(tables) == 1:
+                pushed[tables.pop()].append(clause)
+                continue
+            step = max(tables)
+            if op == "=":
+                left_idx, right_idx = sorted((left_idx, right_idx))
+                join_keys[step].append((left_idx, right_idx))
+            else:
+                left_type = columns[left_idx][4].split('(')[0]
+                residual[step].append(Condition(left_idx, op, right_idx, left_type, rhs_is_col=True))
+
+        rel, alias = sources[0]
+        iterator = self._build_iterator(rel, " AND ".join(pushed[0]), alias)
+        width = len(rel.schema)
+        left_pages = len(rel.GetDataPages())
+        left_record_size = rel.record_size
+        # Boucles par blocs : on garde au plus bm_buffercount - 2 pages de la gauche
+        # (une frame reste pour la page de droite en cours, une pour le reste)
+        block_size = max(1, self.db_manager.config.bm_buffercount - 2) * rel.slot_count
+
+        for step in range(1, len(sources)):
+            rel, alias = sources[step]
+            right = self._build_iterator(rel, " AND ".join(pushed[step]), alias)
+            keys = join_keys[step]
+            for left_idx, right_idx in keys:
+                if (columns[left_idx][4].upper().startswith("CHAR")) != (columns[right_idx][4].upper().startswith("CHAR")):
+                    raise ValueError(f"Jointure impossible entre {columns[left_idx][3]} et {columns[right_idx][3]} : types incompatibles")
+
+            algorithm = self.join_algorithm
+            if algorithm == "AUTO":
+                algorithm = "HASH" if keys else "BNL"
+            if not keys:
+                algorithm = "BNL"
+
+            conditions = residual[step]
+            left_keys = [l for l, _ in keys]
+            right_keys = [r - width for _, r in keys]
+            if algorithm == "HASH":
+                # Table de hachage sur la plus petite entrée, bornée à bm_buffercount pages de records
+                dm = self.db_manager
+                build_left = left_pages < len(rel.GetDataPages())
+                iterator = HashJoinOperator(iterator, right, left_keys, right_keys, dm.disk_manager, dm.buffer_manager,
+                                            max_rows=self._rows_in_memory(left_record_size if build_left else rel.record_size),
+                                            fanout=dm.config.bm_buffercount - 1, build_left=build_left)
+            elif algorithm == "SORT_MERGE":
+                # Tri externe de chaque côté : runs de bm_buffercount pages de records
+                dm = self.db_manager
+                iterator = SortMergeJoinOperator(iterator, right, left_keys, right_keys, dm.disk_manager, dm.buffer_manager,
+                                                 run_size=self._rows_in_memory(max(left_record_size, rel.record_size)),
+                                                 fan_in=dm.config.bm_buffercount - 1)
+            else:
+                equalities = [Condition(l, "=", r, columns[l][4].split('(')[0], rhs_is_col=True) for l, r in keys]
+                iterator = BlockNestedLoopJoinOperator(iterator, right, equalities + conditions, block_size)
+                conditions = []
+            if conditions:
+                iterator = SelectOperator(iterator, conditions)
+
+            width += len(rel.schema)
+            left_pages += len(rel.GetDataPages())
+            left_record_size += rel.record_size
+        return iterator, columns
 
     def _create(self, cmd):
         self.db_manager.CreateTable(cmd["table"], cmd["columns"])
         return f"Table {cmd['table']} créée."
 
+    def _create_index(self, cmd):
+        self.db_manager.CreateIndex(cmd["index"], cmd["table"], cmd["column"], cmd.get("kind", "BTREE"))
+        return f"Index {cmd['index']} ({cmd.get('kind', 'BTREE')}) créé sur {cmd['table']}({cmd['column']})."
+
+    def _analyze(self, cmd):
+        names = [cmd["table"]] if cmd["table"] else list(self.db_manager.tables)
+        lines = []
+        for name in names:
+            stats = self.db_manager.AnalyzeTable(name)
+            lines.append(f"Table {name} analysée : {stats['row_count']} records, {stats['page_count']} pages.")
+        return "\n".join(lines) if lines else "Aucune table à analyser."
+
+    def _prepare(self, cmd):
+        stmt = self.prepare(cmd["query"])
+        self.prepared[cmd["name"]] = stmt
+        return f"Requête {cmd['name']} préparée ({stmt.param_count} paramètre(s))."
+
+    def _execute_prepared(self, cmd):
+        stmt = self.prepared.get(cmd["name"])
+        if stmt is None: raise ValueError(f"Requête préparée {cmd['name']} introuvable.")
+        return stmt.execute(*cmd["params"])
+
     def _drop(self, cmd):
         self.db_manager.RemoveTable(cmd["table"])
         return f"Table {cmd['table']} supprimée."
 
-    def _insert(self, cmd):
+    def _insert(self, cmd, params=None):
         rel = self._get_rel(cmd["table"])
         
         #Vérifier que le nombre de valeurs correspond au nombre de colonnes
         if len(cmd["values"]) != len(rel.schema):
             raise ValueError(f"Erreur: La table '{rel.name}' attend {len(rel.schema)} colonnes, mais {len(cmd['values'])} valeurs fournies.")
             
-        vals = [self._convert_val(v, rel.schema[i][1]) for i, v in enumerate(cmd["values"])]
+        values = self._bind_values(cmd["values"], params)
+        vals = [self._convert_val(v, rel.schema[i][1]) for i, v in enumerate(values)]
         rel.InsertRecord(Record(vals))
         return "Record inséré."
     def _drop_tables(self, cmd):
@@ -140,50 +428,97 @@ class SQLExecutor:
         if not os.path.exists(filename):
             return f"Erreur : Le fichier {filename} est introuvable."
 
-        count = 0
+        start = time.perf_counter()
         try:
-            # On tente de détecter si c'est des virgules ou points-virgules
-            delimiter = ','
-            with open(filename, 'r', encoding='utf-8') as f:
-                first_line = f.readline()
-                if ';' in first_line and ',' not in first_line:
-                    delimiter = ';'
-
-            with open(filename, newline='', encoding='utf-8') as f:
-                reader = csv.reader(f, delimiter=delimiter)
-                
-                for row in reader:
-                    # Ignorer les lignes vides
-                    if not row:
-                        continue
-                        
-                    #Ignorer les lignes qui n'ont pas le bon nombre de colonnes
-                    if len(row) != len(rel.schema):
-                        # print(f"Ligne ignorée : {row}") 
-                        continue
-
-                    try:
-                        # Conversion des valeurs
-                        vals = [self._convert_val(row[i], rel.schema[i][1]) for i in range(len(rel.schema))]
-                        rel.InsertRecord(Record(vals))
-                        count += 1
-                    except Exception as e:
-                        # Si une conversion échoueon ignore la ligne
-                        continue
-                        
+            # Les lignes converties sont consommées page par page par le chargeur en masse
+            count = rel.BulkInsert(self._read_csv_rows(rel, filename))
         except Exception as e:
-            return f"Erreur critique lors de l'import : {str(e)}"
+            # L'exception remonte : la transaction défait ce qui a déjà été chargé
+            raise Exception(f"Erreur critique lors de l'import : {str(e)}")
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed > 0 else 0
+        # Format attendu (+ débit)
+        return f"Total records loaded={count} ({rate:.0f} records/s)"
+
+    def _read_csv_rows(self, rel, filename):
+        """Générateur des lignes du CSV converties selon le schéma (lignes invalides ignorées)."""
+        # On tente de détecter si c'est des virgules ou points-virgules
+        delimiter = ','
+        with open(filename, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+            if ';' in first_line and ',' not in first_line:
+                delimiter = ';'
 
-        # Format attendu 
-        return f"Total records loaded={count}"
+        types = [ctype for _, ctype in rel.schema]
+        with open(filename, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            
+            for row in reader:
+                # Ignorer les lignes vides
+                if not row:
+                    continue
+                    
+                #Ignorer les lignes qui n'ont pas le bon nombre de colonnes
+                if len(row) != len(types):
+                    continue
+
+                try:
+                    # Conversion des valeurs
+                    yield [self._convert_val(val, ctype) for val, ctype in zip(row, types)]
+                except ValueError:
+                    # Si une conversion échoue on ignore la ligne
+                    continue
 
    
-    def _select(self, cmd):
-        rel = self._get_rel(cmd["table"])
-        alias = cmd.get("alias") 
+    # Colonne agrégée du SELECT : COUNT(*), SUM(col), AVG(col), MIN(col), MAX(col)
+    AGGREGATE_RE = re.compile(r'^(COUNT|SUM|AVG|MIN|MAX)\((\*|[\w.]+)\)$', re.IGNORECASE)
+
+    def cursor(self, cmd: dict, params=None) -> Cursor:
+        """Ouvre un curseur sur un SELECT : les lignes sont calculées au fil des fetchone/fetchmany."""
+        if cmd["action"] != "SELECT":
+            raise ValueError("Un curseur ne s'ouvre que sur un SELECT.")
+        self._check_plan_cache()
+        return Cursor(self._build_select(cmd, None if params is None else iter(params)))
+
+    def _select(self, cmd, params=None):
+        res = []
+        with Cursor(self._build_select(cmd, params)) as cursor:
+            res.extend(format_row(values) for values in cursor)
+        count = len(res)
         
-        # On passe l'alias pour que le WHERE fonctionne
-        iterator = self._build_iterator(rel, cmd["where"], alias)
+        return "\n".join(res) + f"\nTotal selected records={count}"
+
+    def _build_select(self, cmd, params=None):
+        """Plan complet d'un SELECT (jointures, WHERE, agrégats, tri, projection, LIMIT)."""
+        if cmd.get("joins"):
+            iterator, columns = self._build_join(cmd, params)
+            record_size = sum(self._get_rel(t).record_size for t in [cmd["table"]] + [j["table"] for j in cmd["joins"]])
+        else:
+            rel = self._get_rel(cmd["table"])
+            alias = cmd.get("alias")
+            # On passe l'alias pour que le WHERE fonctionne
+            iterator = self._build_iterator(rel, cmd["where"], alias, params=params, parallel=True)
+            columns = [(0, rel.name, alias, cname, ctype) for cname, ctype in rel.schema]
+            record_size = rel.record_size
+
+        if cmd.get("group_by") or any(self.AGGREGATE_RE.match(col) for col in cmd["columns"]):
+            return self._build_limit(self._build_aggregate(iterator, cmd, columns, record_size), cmd)
+
+        # Tri avant la projection : on peut trier sur une colonne non affichée
+        if cmd.get("order_by"):
+            sort_keys = self._sort_keys(cmd["order_by"], columns)
+            iterator = self._build_sort(iterator, sort_keys, record_size, self._top_k(cmd))
+
+        if cmd.get("joins"):
+            if cmd["columns"] != ["*"]:
+                indices = []
+                for col in cmd["columns"]:
+                    idx = self._find_join_col(col, columns)
+                    if idx == -1: raise ValueError(f"Colonne {col} introuvable.")
+                    indices.append(idx)
+                iterator = ProjectOperator(iterator, indices)
+            return self._build_limit(iterator, cmd)
 
         # Projection (Selection des colonnes)
         if cmd["columns"] != ["*"]:
@@ -203,26 +538,123 @@ class SQLExecutor:
             if indices:
                 iterator = ProjectOperator(iterator, indices)
 
-        res = []
-        count = 0
-        while True:
-            rec = iterator.GetNextRecord()
-            if not rec: break
-            # Format: val1 ; val2 .
-            res.append(" ; ".join(str(v) for v in rec.values) + " .")
-            count += 1
-        
-        return "\n".join(res) + f"\nTotal selected records={count}"
-    def _delete(self, cmd):
+        return self._build_limit(iterator, cmd)
+
+    def _sort_keys(self, order_by, columns):
+        sort_keys = []
+        for col, desc in order_by:
+            idx = self._find_join_col(col, columns)
+            if idx == -1: raise ValueError(f"Colonne {col} introuvable.")
+            sort_keys.append((idx, desc))
+        return sort_keys
+
+    def _rows_in_memory(self, record_size):
+        """Nombre de records de record_size octets qui tiennent dans bm_buffercount pages."""
+        config = self.db_manager.config
+        return config.bm_buffercount * max(1, config.pagesize // (1 + record_size))
+
+    def _top_k(self, cmd):
+        """Nombre de records triés réellement utiles (LIMIT + OFFSET), None sans LIMIT."""
+        if cmd.get("limit") is None:
+            return None
+        return cmd["limit"] + cmd.get("offset", 0)
+
+    def _build_limit(self, iterator, cmd):
+        if cmd.get("limit") is None and not cmd.get("offset"):
+            return iterator
+        return LimitOperator(iterator, cmd.get("limit"), cmd.get("offset", 0))
+
+    def _build_sort(self, iterator, sort_keys, record_size, limit=None):
+        """ORDER BY : runs de bm_buffercount pages de records, fusionnés bm_buffercount - 1 à la fois."""
+        return ExternalSortOperator(iterator, sort_keys, self.db_manager.disk_manager, self.db_manager.buffer_manager,
+                                    run_size=self._rows_in_memory(record_size),
+                                    fan_in=self.db_manager.config.bm_buffercount - 1, limit=limit)
+
+    def _build_aggregate(self, iterator, cmd, columns, record_size):
+        """
+        GROUP BY et agrégats. L'opérateur produit (colonnes du GROUP BY..., agrégats...) ;
+        on remet ensuite les colonnes dans l'ordre du SELECT.
+        Si l'ORDER BY porte exactement sur les colonnes du GROUP BY, on trie l'entrée et on
+        agrège en flux (la sortie est déjà dans l'ordre) ; sinon agrégation par hachage,
+        puis tri du résultat.
+        """
+        group_cols = []
+        for col in cmd.get("group_by", []):
+            idx = self._find_join_col(col, columns)
+            if idx == -1: raise ValueError(f"Colonne {col} introuvable.")
+            group_cols.append(idx)
+
+        aggregates = []
+        def aggregate_position(item):
+            match = self.AGGREGATE_RE.match(item)
+            func, arg = match.group(1).upper(), match.group(2)
+            col_idx = None
+            if arg != "*":
+                col_idx = self._find_join_col(arg, columns)
+                if col_idx == -1: raise ValueError(f"Colonne {arg} introuvable.")
+                if func in ("SUM", "AVG") and columns[col_idx][4].upper().startswith("CHAR"):
+                    raise ValueError(f"{func} impossible sur la colonne texte {arg}")
+            for pos, agg in enumerate(aggregates):
+                if (agg.func, agg.col_idx) == (func, col_idx):
+                    return len(group_cols) + pos
+            aggregates.append(AggregateFunction(func, col_idx))
+            return len(group_cols) + len(aggregates) - 1
+
+        def output_position(item):
+            if self.AGGREGATE_RE.match(item):
+                return aggregate_position(item)
+            idx = self._find_join_col(item, columns)
+            if idx == -1: raise ValueError(f"Colonne {item} introuvable.")
+            if idx not in group_cols: raise ValueError(f"La colonne {item} doit apparaître dans le GROUP BY")
+            return group_cols.index(idx)
+
+        if cmd["columns"] == ["*"]: raise ValueError("SELECT * impossible avec GROUP BY ou un agrégat")
+        projection = [output_position(item) for item in cmd["columns"]]
+        order_by = cmd.get("order_by") or []
+        sort_keys = [(output_position(col), desc) for col, desc in order_by]
+
+        dm = self.db_manager
+        presorted = group_cols and [pos for pos, _ in sort_keys] == list(range(len(group_cols)))
+        if presorted:
+            iterator = self._build_sort(iterator, [(group_cols[pos], desc) for pos, desc in sort_keys], record_size)
+            iterator = StreamAggregateOperator(iterator, group_cols, aggregates)
+        elif isinstance(iterator, ParallelScanOperator) and self._groups_fit(iterator.relation, group_cols, record_size):
+            # Agrégats partiels calculés par les workers, seulement combinés ici
+            iterator = ParallelAggregateOperator(iterator, group_cols, aggregates)
+        elif not group_cols:
+            # Un seul groupe : pas besoin de table de hachage
+            iterator = StreamAggregateOperator(iterator, group_cols, aggregates)
+        else:
+            iterator = HashAggregateOperator(iterator, group_cols, aggregates, dm.disk_manager, dm.buffer_manager,
+                                             max_groups=self._rows_in_memory(record_size),
+                                             fanout=dm.config.bm_buffercount - 1)
+        if sort_keys and not presorted:
+            iterator = self._build_sort(iterator, sort_keys, record_size, self._top_k(cmd))
+        return ProjectOperator(iterator, projection)
+
+    def _groups_fit(self, rel, group_cols, record_size) -> bool:
+        """Les groupes tiennent-ils en mémoire d'après ANALYZE (l'agrégation parallèle ne déborde pas sur disque) ?"""
+        if not group_cols:
+            return True
+        if not rel.stats:
+            return False
+        groups = 1
+        for idx in group_cols:
+            groups *= max(1, rel.stats["columns"][idx]["distinct"])
+        return groups <= self._rows_in_memory(record_size)
+
+    def _delete(self, cmd, params=None):
         rel = self._get_rel(cmd["table"])
         alias = cmd.get("alias") # Récupéré du parser
-        iterator = self._build_iterator(rel, cmd["where"], alias)
+        iterator = self._build_iterator(rel, cmd["where"], alias, params=params)
         count = 0
         while True:
-            rec = iterator.GetNextRecord()
-            if not rec: break
-            rel.DeleteRecord(rec)
-            count += 1
+            batch = iterator.GetNextBatch()
+            if batch is None: break
+            for rec in batch:
+                rel.DeleteRecord(rec)
+            count += len(batch)
+        iterator.Close()
         return f"Total deleted records={count}"
     
     def _describe_table(self, cmd):
@@ -247,27 +679,32 @@ class SQLExecutor:
             
         return "\n".join(lines) + f"\n{count} tables"
 
-    def _update(self, cmd):
+    def _update(self, cmd, params=None):
         rel = self._get_rel(cmd["table"])
         alias = cmd.get("alias") # Récupéré du parser
-        iterator = self._build_iterator(rel, cmd["where"], alias)
         
         updates = {}
-        for col_raw, val_str in cmd["set"]:
+        set_values = self._bind_values([val for _, val in cmd["set"]], params)
+        for (col_raw, _), val_str in zip(cmd["set"], set_values):
             # Nettoyage alias dans le SET (ex: a.avis -> avis)
             col_name = self._resolve_col(col_raw, rel.name, alias)
             
             for i, (cname, ctype) in enumerate(rel.schema):
                 if cname == col_name:
                     updates[i] = self._convert_val(val_str, ctype)
+
+        # Pas d'index sur une colonne modifiée : le parcours reverrait les records déplacés
+        iterator = self._build_iterator(rel, cmd["where"], alias, excluded_index_cols=set(updates), params=params)
         
         count = 0
         while True:
-            rec = iterator.GetNextRecord()
-            if not rec: break
-            new_vals = list(rec.values)
-            for idx, val in updates.items():
-                new_vals[idx] = val
-            rel.UpdateRecord(rec, new_vals)
-            count += 1
+            batch = iterator.GetNextBatch()
+            if batch is None: break
+            for rec in batch:
+                new_vals = list(rec.values)
+                for idx, val in updates.items():
+                    new_vals[idx] = val
+                rel.UpdateRecord(rec, new_vals)
+            count += len(batch)
+        iterator.Close()
         return f"Total updated records={count}"
\ No newline at end of file
@@ -26,6 +26,39 @@ def parse(query: str) -> dict:
             columns.append((parts[0].strip(), parts[1].strip()))
         return {"action": "CREATE_TABLE", "table": table_name, "columns": columns}
 
+    # === CREATE INDEX ===
+    # Format: CREATE INDEX Nom ON Table(Col) [USING BTREE|HASH]
+    if action == "CREATE" and len(tokens) > 2 and tokens[1].upper() == "INDEX":
+        match = re.match(r'CREATE\s+INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)\s*(?:USING\s+(\w+)\s*)?$', raw_query, flags=re.IGNORECASE)
+        if not match: raise ValueError("Syntaxe CREATE INDEX incorrecte. Attendu: CREATE INDEX Nom ON Table(Col) [USING BTREE|HASH]")
+        return {"action": "CREATE_INDEX", "index": match.group(1), "table": match.group(2), "column": match.group(3),
+                "kind": (match.group(4) or "BTREE").upper()}
+
+    # === PREPARE / EXECUTE ===
+    # Format: PREPARE Nom AS <requête avec des ?>   puis   EXECUTE Nom [(val1, val2, ...)]
+    if action == "PREPARE":
+        match = re.match(r'PREPARE\s+(\w+)\s+AS\s+(.+)$', raw_query, flags=re.IGNORECASE | re.DOTALL)
+        if not match: raise ValueError("Syntaxe PREPARE incorrecte. Attendu: PREPARE Nom AS Requête")
+        return {"action": "PREPARE", "name": match.group(1), "query": match.group(2)}
+
+    if action == "EXECUTE":
+        match = re.match(r'EXECUTE\s+(\w+)\s*(?:\((.*)\))?\s*$', raw_query, flags=re.IGNORECASE | re.DOTALL)
+        if not match: raise ValueError("Syntaxe EXECUTE incorrecte. Attendu: EXECUTE Nom (val1, val2, ...)")
+        params = []
+        if match.group(2) and match.group(2).strip():
+            for v in match.group(2).split(","):
+                v = v.strip()
+                # On enlève les guillemets si présents
+                if len(v) >= 2 and ((v.startswith('"') and v.endswith('"')) or (v.startswith("'") and v.endswith("'"))):
+                    v = v[1:-1]
+                params.append(v)
+        return {"action": "EXECUTE", "name": match.group(1), "params": params}
+
+    # === ANALYZE ===
+    # Format: ANALYZE [Table]  (sans table : toutes les tables)
+    if action == "ANALYZE":
+        return {"action": "ANALYZE", "table": tokens[1] if len(tokens) > 1 else None}
+
     # === DROP TABLE ===
     if action == "DROP" and len(tokens) > 2 and tokens[1].upper() == "TABLE":
         return {"action": "DROP_TABLE", "table": tokens[2]}
@@ -103,16 +136,57 @@ def parse(query: str) -> dict:
             raise ValueError("Syntaxe APPEND incorrecte. Attendu: APPEND INTO Table ALLRECORDS (Fichier.csv)")
 
     # === SELECT ===
-    # Format: SELECT col1,col2 FROM Table [WHERE ...]
+    # Format: SELECT col1,col2 FROM Table [WHERE ...] [GROUP BY col, ...] [ORDER BY col [ASC|DESC], ...] [LIMIT n [OFFSET m]]
+    # (une colonne peut être un agrégat : COUNT(*), SUM(col), AVG(col), MIN(col), MAX(col))
     if action == "SELECT":
+        # SUM( col ) -> SUM(col) dans la liste des colonnes : un agrégat reste un seul mot
+        from_match = re.search(r'\sFROM\s', raw_query, flags=re.IGNORECASE)
+        split_at = from_match.start() if from_match else len(raw_query)
+        query = re.sub(r'\(\s*([^()]*?)\s*\)', r'(\1)', raw_query[:split_at]) + raw_query[split_at:]
+
+        # Les clauses de fin sont retirées une à une, de la dernière à la première, avant de découper le WHERE
+        limit = None
+        offset = 0
+        match = re.search(r'\s+LIMIT\s+(\d+)(?:\s+OFFSET\s+(\d+))?\s*$', query, flags=re.IGNORECASE)
+        if match:
+            query = query[:match.start()]
+            limit = int(match.group(1))
+            offset = int(match.group(2) or 0)
+
+        order_by = []
+        match = re.search(r'\s+ORDER\s+BY\s+(.+)$', query, flags=re.IGNORECASE | re.DOTALL)
+        if match:
+            query = query[:match.start()]
+            for item in match.group(1).split(","):
+                item_tokens = item.split()
+                if not item_tokens or len(item_tokens) > 2 or (len(item_tokens) == 2 and item_tokens[1].upper() not in ("ASC", "DESC")):
+                    raise ValueError("Syntaxe ORDER BY incorrecte. Attendu: ORDER BY col [ASC|DESC], ...")
+                order_by.append((item_tokens[0], len(item_tokens) == 2 and item_tokens[1].upper() == "DESC"))
+
+        group_by = []
+        match = re.search(r'\s+GROUP\s+BY\s+(.+)$', query, flags=re.IGNORECASE | re.DOTALL)
+        if match:
+            query = query[:match.start()]
+            group_by = [col.strip() for col in match.group(1).split(",")]
+            if not all(group_by): raise ValueError("Syntaxe GROUP BY incorrecte. Attendu: GROUP BY col, ...")
+
         where_clause = None
-        main_part = raw_query
+        main_part = query
         # Séparation du WHERE
-        if "WHERE" in raw_query.upper():
-            parts = re.split(r'WHERE', raw_query, flags=re.IGNORECASE)
+        if "WHERE" in query.upper():
+            parts = re.split(r'WHERE', query, flags=re.IGNORECASE)
             main_part = parts[0]
             where_clause = parts[1].strip()
             
+        # Jointures : SELECT ... FROM T1 [a] [INNER] JOIN T2 [b] ON a.X = b.Y [JOIN ...]
+        join_parts = re.split(r'\s+(?:INNER\s+)?JOIN\s+', main_part, flags=re.IGNORECASE)
+        main_part = join_parts[0]
+        joins = []
+        for part in join_parts[1:]:
+            match = re.match(r'(\w+)(?:\s+(\w+))?\s+ON\s+(.+)$', part.strip(), flags=re.IGNORECASE | re.DOTALL)
+            if not match: raise ValueError("Syntaxe JOIN incorrecte. Attendu: ... JOIN Table [Alias] ON a.Col = b.Col")
+            joins.append({"table": match.group(1), "alias": match.group(2), "on": match.group(3).strip()})
+
         select_tokens = main_part.replace(",", " ").split()
         try:
             from_idx = [i for i, t in enumerate(select_tokens) if t.upper() == "FROM"][0]
@@ -129,7 +203,12 @@ def parse(query: str) -> dict:
                 "table": table, 
                 "alias": alias,  
                 "columns": cols, 
-                "where": where_clause
+                "where": where_clause,
+                "joins": joins,
+                "group_by": group_by,
+                "order_by": order_by,
+                "limit": limit,
+                "offset": offset
             }
         except IndexError: raise ValueError("Syntaxe SELECT incorrecte")
 
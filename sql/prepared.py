@@ -0,0 +1,93 @@
+import re
+from collections import OrderedDict
+
+# Chaînes entre guillemets (gardées telles quelles) ou blancs / paramètres hors guillemets
+_QUOTED = r'"[^"]*"|\'[^\']*\''
+_WHITESPACE_RE = re.compile(f'({_QUOTED})|\\s+')
+_PARAM_RE = re.compile(f'({_QUOTED})|\\?')
+# Fin des paramètres (None est une valeur)
+_NO_VALUE = object()
+
+
+def normalize_query(query: str) -> str:
+    """Texte de requête canonique pour le cache : blancs réduits à un espace, sauf dans les chaînes."""
+    return _WHITESPACE_RE.sub(lambda m: m.group(1) or " ", query).strip()
+
+
+def count_params(query: str) -> int:
+    """Nombre de paramètres ? hors chaînes."""
+    return sum(1 for m in _PARAM_RE.finditer(query) if not m.group(1))
+
+
+def bind_params(text: str, params) -> str:
+    """Remplace chaque ? (hors chaînes) par la valeur suivante de params, écrite comme un littéral SQL."""
+    def literal(match):
+        if match.group(1):
+            return match.group(1)
+        val = next(params, _NO_VALUE)
+        if val is _NO_VALUE:
+            raise ValueError("Paramètre ? sans valeur.")
+        if val is None:
+            raise ValueError("Valeur NULL impossible (pas de NULL).")
+        if isinstance(val, (int, float)):
+            return str(val)
+        val = str(val)
+        return f"'{val}'" if '"' in val else f'"{val}"'
+    return _PARAM_RE.sub(literal, text) if text else text
+
+
+class PlanCache:
+    """
+    Cache LRU : requêtes déjà analysées (clé = texte normalisé) et morceaux de plan
+    (clés tuples). Vidé quand le catalogue change (CREATE, DROP, ANALYZE).
+    """
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PreparedStatement:
+    """
+    Requête analysée une seule fois (PREPARE) puis exécutée avec des valeurs pour ses
+    paramètres ? (EXECUTE), dans l'ordre où ils apparaissent dans le texte.
+    """
+    def __init__(self, executor, query: str):
+        self.executor = executor
+        self.query = query
+        self.cmd = executor.parse(query)
+        self.param_count = count_params(query)
+
+    def _check(self, params):
+        if len(params) != self.param_count:
+            raise ValueError(f"{self.param_count} paramètre(s) attendu(s), {len(params)} fourni(s).")
+
+    def execute(self, *params) -> str:
+        self._check(params)
+        return self.executor.execute_command(self.cmd, params)
+
+    def cursor(self, *params):
+        self._check(params)
+        return self.executor.cursor(self.cmd, params)
@@ -0,0 +1,53 @@
+import json
+import struct
+
+# Trame : longueur du message (4 octets, big-endian) puis le message en JSON (UTF-8)
+FRAME_HEADER = struct.Struct(">I")
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Requête  : {"id": n, "sql": "...", "params": [...]}   (params optionnel : valeurs des ?)
+# Réponses : {"id": n, "type": "result", "message": "..."}          commande autre qu'un SELECT
+#            {"id": n, "type": "rows", "rows": [[...], ...]}        un paquet de lignes d'un SELECT
+#            {"id": n, "type": "done", "rowcount": k}               fin d'un SELECT
+#            {"id": n, "type": "error", "message": "..."}           la requête a échoué
+# Les réponses arrivent dans l'ordre des requêtes d'une même connexion.
+
+
+def encode_message(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if len(body) > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message trop grand ({len(body)} octets)")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_message(body: bytes) -> dict:
+    return json.loads(body.decode("utf-8"))
+
+
+def check_length(length: int) -> int:
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Trame invalide : message de {length} octets")
+    return length
+
+
+async def read_message(reader) -> dict:
+    """Lit un message sur un asyncio.StreamReader ; None si la connexion est fermée entre deux messages."""
+    header = await reader.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        header += await reader.readexactly(FRAME_HEADER.size - len(header))
+    length = check_length(FRAME_HEADER.unpack(header)[0])
+    return decode_message(await reader.readexactly(length))
+
+
+def recv_message(stream) -> dict:
+    """Lit un message sur un fichier binaire (socket.makefile("rb"))."""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        raise ConnectionError("Connexion fermée par le serveur")
+    length = check_length(FRAME_HEADER.unpack(header)[0])
+    body = stream.read(length)
+    if len(body) < length:
+        raise ConnectionError("Connexion fermée par le serveur")
+    return decode_message(body)
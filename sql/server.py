@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from sql.executor import SQLExecutor
+from sql.protocol import encode_message, read_message
+
+# Commandes qui changent le catalogue : elles s'exécutent seules (aucune autre requête en cours)
+CATALOG_ACTIONS = ("CREATE_TABLE", "CREATE_INDEX", "DROP_TABLE", "DROP_TABLES", "ANALYZE", "APPEND")
+
+
+class _CatalogLock:
+    """
+    Verrou lecteurs / rédacteur tenu dans la boucle asyncio (jamais par un thread du pool :
+    une commande qui attend ne bloque pas un worker dont une autre requête aurait besoin).
+    """
+    def __init__(self):
+        self.cond = asyncio.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    async def Acquire(self, exclusive: bool):
+        async with self.cond:
+            if exclusive:
+                self.waiting_writers += 1
+                await self.cond.wait_for(lambda: not self.writer and not self.readers)
+                self.waiting_writers -= 1
+                self.writer = True
+            else:
+                await self.cond.wait_for(lambda: not self.writer and not self.waiting_writers)
+                self.readers += 1
+
+    async def Release(self, exclusive: bool):
+        async with self.cond:
+            if exclusive:
+                self.writer = False
+            else:
+                self.readers -= 1
+            self.cond.notify_all()
+
+
+class SQLServer:
+    """
+    Serveur TCP (asyncio) : un seul DBManager / BufferManager partagé par toutes les connexions.
+    Chaque connexion a sa session (un SQLExecutor : cache de plans et requêtes préparées à elle).
+    Les requêtes sont exécutées par un pool de workers ; celles d'une même connexion passent
+    dans l'ordre (le client peut en envoyer plusieurs sans attendre : pipelining).
+    Les lignes d'un SELECT partent par paquets au fil de l'exécution du plan.
+    Protocole : voir sql/protocol.py.
+    """
+    def __init__(self, db_manager, host: str = "127.0.0.1", port: int = 5433, workers: int = 8, batch_size: int = 500):
+        self.db_manager = db_manager
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sql-worker")
+        self.server = None
+        self.catalog_lock = None
+        self.writers = set()     # connexions ouvertes
+        self.nb_connections = 0
+        self.nb_requests = 0
+
+    async def Start(self):
+        """Ouvre le port d'écoute (port 0 : choisi par le système, lu ensuite dans self.port)."""
+        self.catalog_lock = _CatalogLock()
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def Serve(self):
+        """Démarre et sert jusqu'à l'annulation (Ctrl+C)."""
+        await self.Start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.Stop()
+
+    async def Stop(self):
+        """Ferme le port, les connexions, et attend la fin des requêtes en cours."""
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for writer in list(self.writers):
+            writer.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown)
+
+    async def _handle_client(self, reader, writer):
+        session = SQLExecutor(self.db_manager)
+        self.writers.add(writer)
+        self.nb_connections += 1
+        try:
+            while True:
+                request = await read_message(reader)
+                if request is None:
+                    break
+                self.nb_requests += 1
+                await self._handle_request(session, request, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Client parti ou trame invalide : on ferme la connexion
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def _handle_request(self, session, request: dict, writer):
+        req_id = request.get("id")
+        try:
+            cmd = session.parse(request["sql"])
+        except Exception as e:
+            await self._send(writer, {"id": req_id, "type": "error", "message": str(e)})
+            return
+        params = request.get("params")
+
+        if cmd["action"] == "SELECT":
+            await self._stream_select(session, req_id, cmd, params, writer)
+            return
+        exclusive = self._changes_catalog(session, cmd)
+        message = await self._run_locked(exclusive, session.execute_command, cmd, params)
+        await self._send(writer, {"id": req_id, "type": "result", "message": message})
+
+    async def _stream_select(self, session, req_id, cmd: dict, params, writer):
+        """
+        Le verrou du catalogue n'est tenu que pendant le calcul de chaque paquet, jamais pendant
+        l'envoi : un client qui ne lit plus ses lignes ne bloque que sa propre connexion.
+        (Une table supprimée entre deux paquets reste lisible : DROP ne libère pas ses pages.)
+        """
+        try:
+            cursor = await self._run_locked(False, session.cursor, cmd, params)
+        except Exception as e:
+            await self._send(writer, {"id": req_id, "type": "error", "message": str(e)})
+            return
+        try:
+            while True:
+                rows = await self._run_locked(False, cursor.fetchmany, self.batch_size)
+                if not rows:
+                    break
+                # drain() attend que le client lise : un client lent freine le plan au lieu de remplir la RAM
+                await self._send(writer, {"id": req_id, "type": "rows", "rows": rows})
+            await self._send(writer, {"id": req_id, "type": "done", "rowcount": cursor.rowcount})
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await self._send(writer, {"id": req_id, "type": "error", "message": str(e)})
+        finally:
+            await self._run_locked(False, cursor.close)
+
+    async def _run_locked(self, exclusive: bool, func, *args):
+        """Exécute func dans le pool de workers, verrou du catalogue tenu le temps de l'appel."""
+        await self.catalog_lock.Acquire(exclusive)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            await self.catalog_lock.Release(exclusive)
+
+    @staticmethod
+    def _changes_catalog(session, cmd: dict) -> bool:
+        if cmd["action"] == "EXECUTE":
+            stmt = session.prepared.get(cmd["name"])
+            return stmt is not None and stmt.cmd["action"] in CATALOG_ACTIONS
+        return cmd["action"] in CATALOG_ACTIONS
+
+    @staticmethod
+    async def _send(writer, message: dict):
+        writer.write(encode_message(message))
+        await writer.drain()
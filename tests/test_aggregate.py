@@ -0,0 +1,99 @@
+import unittest
+import os
+import random
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from query_engine.relation_scanner import RelationScanner
+from query_engine.operators import ExternalSortOperator
+from query_engine.aggregate_operators import AggregateFunction, HashAggregateOperator, StreamAggregateOperator
+from sql.parser import parse
+from sql.executor import SQLExecutor
+
+
+class TestAggregate(unittest.TestCase):
+    TEST_DIR = "./test_db_aggregate"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=4)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+
+        rng = random.Random(5)
+        self.rel = self.db.CreateTable("Ventes", [("Client", "INT"), ("Ville", "CHAR(8)"), ("Montant", "INT")])
+        self.rows = [[rng.randrange(300), f"v{rng.randrange(5)}", rng.randrange(1000)] for _ in range(2000)]
+        self.rel.BulkInsert(self.rows)
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def _expected(self, key_idx):
+        groups = {}
+        for row in self.rows:
+            groups.setdefault(row[key_idx], []).append(row[2])
+        return {k: [len(v), sum(v), sum(v) / len(v), min(v), max(v)] for k, v in groups.items()}
+
+    def _aggregates(self):
+        return [AggregateFunction("COUNT"), AggregateFunction("SUM", 2), AggregateFunction("AVG", 2),
+                AggregateFunction("MIN", 2), AggregateFunction("MAX", 2)]
+
+    def _all(self, op):
+        rows = []
+        while True:
+            batch = op.GetNextBatch()
+            if batch is None: break
+            rows.extend(rec.values for rec in batch)
+        op.Close()
+        return rows
+
+    def test_hash_aggregate_spills(self):
+        # 300 clients mais 20 groupes en mémoire : débordement puis re-partitionnement
+        op = HashAggregateOperator(RelationScanner(self.rel), [0], self._aggregates(), self.disk, self.buff,
+                                   max_groups=20, fanout=3)
+        rows = self._all(op)
+        self.assertEqual({r[0]: r[1:] for r in rows}, self._expected(0))
+        self.assertEqual(len(rows), len(self._expected(0)))
+        self.assertEqual(op.spills, [])
+
+    def test_stream_aggregate(self):
+        scan = ExternalSortOperator(RelationScanner(self.rel), [(1, False)], self.disk, self.buff, 100, 3)
+        rows = self._all(StreamAggregateOperator(scan, [1], self._aggregates()))
+        self.assertEqual([r[0] for r in rows], sorted(self._expected(1)))
+        self.assertEqual({r[0]: r[1:] for r in rows}, self._expected(1))
+
+    def test_sql_group_by(self):
+        res = self.exec.execute_command(parse("SELECT COUNT(*), SUM( Montant ), MAX(Montant) FROM Ventes"))
+        amounts = [r[2] for r in self.rows]
+        self.assertEqual(res.splitlines()[0], f"{len(amounts)} ; {sum(amounts)} ; {max(amounts)} .")
+
+        # ORDER BY = GROUP BY : tri de l'entrée puis agrégation en flux
+        res = self.exec.execute_command(parse("SELECT Ville, COUNT(*) FROM Ventes v WHERE Montant >= 500 GROUP BY v.Ville ORDER BY Ville DESC"))
+        counts = {}
+        for row in self.rows:
+            if row[2] >= 500:
+                counts[row[1]] = counts.get(row[1], 0) + 1
+        expected = [f"{ville} ; {counts[ville]} ." for ville in sorted(counts, reverse=True)]
+        self.assertEqual(res.splitlines(), expected + [f"Total selected records={len(counts)}"])
+
+        # Tri sur un agrégat et LIMIT : agrégation par hachage puis top-K
+        res = self.exec.execute_command(parse("SELECT Client, SUM(Montant) FROM Ventes GROUP BY Client ORDER BY SUM(Montant) DESC, Client LIMIT 3"))
+        totals = sorted(((-v[1], k) for k, v in self._expected(0).items()))[:3]
+        self.assertEqual(res.splitlines()[:3], [f"{k} ; {-t} ." for t, k in totals])
+
+        self.assertIn("GROUP BY", self.exec.execute_command(parse("SELECT Ville, Client, COUNT(*) FROM Ventes GROUP BY Ville")))
+        self.assertIn("texte", self.exec.execute_command(parse("SELECT SUM(Ville) FROM Ventes")))
+
+    def test_empty_input(self):
+        res = self.exec.execute_command(parse("SELECT COUNT(*), AVG(Montant) FROM Ventes WHERE Montant < 0"))
+        self.assertEqual(res.splitlines(), ["0 ; None .", "Total selected records=1"])
+        res = self.exec.execute_command(parse("SELECT Ville, COUNT(*) FROM Ventes WHERE Montant < 0 GROUP BY Ville"))
+        self.assertEqual(res.splitlines(), ["", "Total selected records=0"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ import shutil
 from dbconfig import DBConfig
 from managers.disk_manager import DiskManager
 from managers.buffer_manager import BufferManager
+from managers.page_id import PageId
 
 class TestBufferManager(unittest.TestCase):
     TEST_DIR = "./test_db_buffer"
@@ -41,6 +42,68 @@ class TestBufferManager(unittest.TestCase):
         self.assertIn(p1, bm.buffer_pool)
         self.assertIn(p2, bm.buffer_pool)
 
+    def test_mru_eviction(self):
+        self.config.bm_policy = "MRU"
+        bm = BufferManager(self.config, self.disk)
+        p0, p1, p2 = self.disk.AllocPage(), self.disk.AllocPage(), self.disk.AllocPage()
+        for pid in (p0, p1):
+            bm.GetPage(pid)
+            bm.FreePage(pid, False)
+
+        # P1 est la plus récente : c'est elle qui part
+        bm.GetPage(p2)
+        self.assertIn(p0, bm.buffer_pool)
+        self.assertNotIn(p1, bm.buffer_pool)
+
+    def test_policies_skip_pinned_pages(self):
+        for policy in ("LRU", "MRU", "CLOCK", "LRU-K", "2Q"):
+            self.config.bm_policy = policy
+            bm = BufferManager(self.config, self.disk)
+            p0, p1, p2 = self.disk.AllocPage(), self.disk.AllocPage(), self.disk.AllocPage()
+            bm.GetPage(p0)                       # reste épinglée
+            bm.GetPage(p1)
+            bm.FreePage(p1, False)
+            bm.GetPage(p2)
+            self.assertIn(p0, bm.buffer_pool, policy)
+            self.assertNotIn(p1, bm.buffer_pool, policy)
+
+            # Tout est épinglé : plus rien à évincer
+            with self.assertRaises(Exception):
+                bm.GetPage(p1)
+
+    def _access(self, bm, pids):
+        for pid in pids:
+            bm.GetPage(pid)
+            bm.FreePage(pid, False)
+
+    def test_scan_resistant_policies(self):
+        pages = [self.disk.AllocPage() for _ in range(12)]
+        hot = pages[0]
+
+        # LRU-K : la page lue deux fois survit à un scan de pages lues une seule fois
+        bm = BufferManager(DBConfig(self.TEST_DIR, bm_buffercount=4, bm_policy="LRU-K"), self.disk)
+        self._access(bm, [hot, pages[1], hot])
+        self._access(bm, pages[2:])
+        self.assertIn(hot, bm.buffer_pool)
+
+        # 2Q : la page redemandée après son passage dans A1out entre dans Am et y reste
+        bm = BufferManager(DBConfig(self.TEST_DIR, bm_buffercount=4, bm_policy="2Q"), self.disk)
+        self._access(bm, [hot] + pages[1:5])
+        self.assertNotIn(hot, bm.buffer_pool)
+        self._access(bm, [hot])
+        self._access(bm, pages[5:])
+        self.assertIn(hot, bm.buffer_pool)
+
+        # LRU classique : le scan chasse la page chaude
+        bm = BufferManager(DBConfig(self.TEST_DIR, bm_buffercount=4, bm_policy="LRU"), self.disk)
+        self._access(bm, [hot, pages[1], hot])
+        self._access(bm, pages[2:])
+        self.assertNotIn(hot, bm.buffer_pool)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            BufferManager(DBConfig(self.TEST_DIR, bm_policy="RANDOM"), self.disk)
+
     def test_dirty_flag(self):
         bm = BufferManager(self.config, self.disk)
         p0 = self.disk.AllocPage()
@@ -58,5 +121,106 @@ class TestBufferManager(unittest.TestCase):
         self.disk.ReadPage(p0, check)
         self.assertEqual(check[0], 88)
 
+    def test_frame_arena(self):
+        bm = BufferManager(self.config, self.disk)
+        self.assertEqual(len(bm.arena), self.config.bm_buffercount * self.config.pagesize)
+        pages = [self.disk.AllocPage() for _ in range(5)]
+
+        # Les frames de l'arène sont réutilisées : jamais plus de bm_buffercount pages en RAM
+        frames = set()
+        for pid in pages:
+            buff = bm.GetPage(pid)
+            self.assertIs(buff.obj, bm.arena)
+            frames.add(bm.buffer_pool[pid].frame_idx)
+            bm.FreePage(pid, False)
+        self.assertEqual(frames, {0, 1})
+        self.assertEqual(bm.free_frames, [])
+
+        bm.FlushBuffers()
+        self.assertEqual(len(bm.free_frames), self.config.bm_buffercount)
+
+    def test_failed_read_keeps_frame(self):
+        bm = BufferManager(self.config, self.disk)
+        missing = PageId(3, 0)   # Data3.bin n'existe pas
+        for _ in range(3):
+            with self.assertRaises(Exception):
+                bm.GetPage(missing)
+        # La frame réservée pour la lecture est rendue : le pool ne rétrécit pas
+        self.assertEqual(len(bm.free_frames), self.config.bm_buffercount)
+        self.assertNotIn(missing, bm.buffer_pool)
+
+        p0, p1 = self.disk.AllocPage(), self.disk.AllocPage()
+        bm.GetPage(p0)
+        bm.GetPage(p1)
+        bm.FreePage(p0, False)
+        bm.FreePage(p1, False)
+
+    def test_prefetch(self):
+        config = DBConfig(self.TEST_DIR, bm_buffercount=4, bm_readahead=2)
+        bm = BufferManager(config, self.disk)
+        pages = [self.disk.AllocPage() for _ in range(3)]
+        for i, pid in enumerate(pages):
+            data = bytearray(config.pagesize)
+            data[0] = 10 + i
+            self.disk.WritePage(pid, data)
+
+        # Au plus bm_buffercount - 2 pages lues en avance, sans être épinglées
+        bm.Prefetch(pages)
+        self.assertIn(pages[0], bm.buffer_pool)
+        self.assertIn(pages[1], bm.buffer_pool)
+        self.assertNotIn(pages[2], bm.buffer_pool)
+        self.assertEqual(bm.buffer_pool[pages[0]].pin_count, 0)
+
+        # Le GetPage suivant trouve la page déjà chargée
+        self.assertEqual(bm.GetPage(pages[1])[0], 11)
+        bm.FreePage(pages[1], False)
+        self.assertEqual(bm.nb_prefetched, 1)
+        bm.FlushBuffers()
+        self.assertEqual(bm.nb_prefetched, 0)
+
+    def test_prefetch_small_pool(self):
+        # Avec la configuration par défaut (2 frames), une page est quand même lue en avance
+        config = DBConfig(self.TEST_DIR, bm_buffercount=2, bm_readahead=4)
+        bm = BufferManager(config, self.disk)
+        pages = [self.disk.AllocPage() for _ in range(3)]
+        bm.Prefetch(pages)
+        self.assertEqual(bm.nb_prefetched, 1)
+        self.assertIn(pages[0], bm.buffer_pool)
+
+        # La page lue en avance ne bloque pas le pool : elle est évincée si besoin
+        bm.GetPage(pages[1])
+        bm.GetPage(pages[2])
+        bm.FreePage(pages[1], False)
+        bm.FreePage(pages[2], False)
+        self.assertNotIn(pages[0], bm.buffer_pool)
+        self.assertEqual(bm.nb_prefetched, 0)
+
+    def test_mmap_mode(self):
+        config = DBConfig(self.TEST_DIR, bm_buffercount=2, dm_io_mode="mmap")
+        disk = DiskManager(config)
+        bm = BufferManager(config, disk)
+        p0 = disk.AllocPage()
+        p1 = disk.AllocPage()
+
+        # Zéro copie : la page rendue est une vue sur le fichier mappé
+        buff = bm.GetPage(p0)
+        self.assertIsInstance(buff, memoryview)
+        buff[0] = 77
+        bm.FreePage(p0, True)
+        bm.FlushBuffers()
+        disk.Finish()
+
+        # Relecture en mode fichier classique
+        disk2 = DiskManager(self.config)
+        check = bytearray(self.config.pagesize)
+        disk2.ReadPage(p0, check)
+        self.assertEqual(check[0], 77)
+
+        # Le nombre de pages est conservé même si le fichier a grandi par segment entier
+        disk3 = DiskManager(config)
+        self.assertEqual(disk3.AllocPage().PageIdx, p1.PageIdx + 1)
+        disk2.Finish()
+        disk3.Finish()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
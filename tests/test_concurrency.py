@@ -0,0 +1,173 @@
+import unittest
+import os
+import shutil
+import threading
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager, RWLatch, SHARED, EXCLUSIVE
+from managers.db_manager import DBManager
+from managers.wal_manager import WALManager
+from managers.relation import Record
+from sql.executor import SQLExecutor
+
+
+class TestConcurrency(unittest.TestCase):
+    TEST_DIR = "./test_db_concurrency"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=8, wal_enabled=True)
+        self.disk = DiskManager(self.config)
+        self.wal = WALManager(self.config, self.disk)
+        self.buff = BufferManager(self.config, self.disk, self.wal)
+        self.db = DBManager(self.config, self.disk, self.buff)
+
+    def tearDown(self):
+        self.disk.Finish()
+        self.wal.Close()
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def run_threads(self, target, nb_threads):
+        errors = []
+
+        def wrapper(n):
+            try:
+                target(n)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=wrapper, args=(n,)) for n in range(nb_threads)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        if errors:
+            raise errors[0]
+
+    def test_latch(self):
+        latch = RWLatch()
+        latch.Acquire(SHARED)
+        latch.Acquire(SHARED)
+        acquired = threading.Event()
+
+        def writer():
+            latch.Acquire(EXCLUSIVE)
+            acquired.set()
+            latch.Release(EXCLUSIVE)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        # Le rédacteur attend les deux lecteurs
+        self.assertFalse(acquired.wait(0.05))
+        latch.Release(SHARED)
+        self.assertFalse(acquired.wait(0.05))
+        latch.Release(SHARED)
+        self.assertTrue(acquired.wait(5))
+        t.join()
+
+    def test_concurrent_inserts(self):
+        executor = SQLExecutor(self.db)
+        executor.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        executor.execute("CREATE INDEX idx_id ON T(Id)")
+        executor.execute("CREATE INDEX idx_nom ON T(Nom) USING HASH")
+
+        def insert(n):
+            # Une session = un exécuteur, sur le même DBManager
+            statement = SQLExecutor(self.db).prepare("INSERT INTO T VALUES (?, ?)")
+            for i in range(150):
+                statement.execute(n * 1000 + i, f"s{n}")
+
+        self.run_threads(insert, 6)
+        rel = self.db.GetTable("T")
+        records = [rec.values for page_id in rel.allocated_pages for rec in rel.read_page_records(page_id)]
+        self.assertEqual(sorted(values[0] for values in records), sorted(n * 1000 + i for n in range(6) for i in range(150)))
+        self.assertEqual(len(set(rel.allocated_pages)), len(rel.allocated_pages))
+        # Les index ont vu toutes les insertions
+        self.assertEqual(len(list(rel.indexes["idx_id"].Search(2000, 2999))), 150)
+        self.assertEqual(len(list(rel.indexes["idx_nom"].Search("s4", "s4"))), 150)
+        self.assertTrue(all(frame.pin_count == 0 for frame in self.buff.buffer_pool.values()))
+
+    def test_readers_and_writers(self):
+        executor = SQLExecutor(self.db)
+        executor.execute("CREATE TABLE T (Id:INT, Note:FLOAT)")
+        rel = self.db.GetTable("T")
+        rel.BulkInsert([i, 0.0] for i in range(300))
+        finished = []
+
+        def session(n):
+            if n < 2:
+                try:
+                    for i in range(200):
+                        rel.InsertRecord(Record([1000 + n * 1000 + i, 1.0]))
+                finally:
+                    finished.append(n)
+                return
+            seen = 0
+            while len(finished) < 2:
+                rows = SQLExecutor(self.db).cursor(executor.parse("SELECT Id FROM T")).fetchall()
+                # Une page n'est jamais lue à moitié écrite : le nombre de lignes ne fait que croître
+                self.assertGreaterEqual(len(rows), seen)
+                seen = len(rows)
+
+        self.run_threads(session, 5)
+        self.assertEqual(len(executor.cursor(executor.parse("SELECT Id FROM T")).fetchall()), 700)
+
+    def reopen_after_crash(self):
+        """Arrêt brutal (pages du buffer pool perdues, rien de sauvegardé) puis redémarrage avec reprise."""
+        for fd in self.disk.fds.values():
+            os.close(fd)
+        self.disk.fds.clear()
+        os.close(self.wal.fd)
+        self.wal.fd = None
+        self.disk = DiskManager(self.config)
+        self.wal = WALManager(self.config, self.disk)
+        self.buff = BufferManager(self.config, self.disk, self.wal)
+        self.db = DBManager(self.config, self.disk, self.buff)
+
+    def test_crash_with_concurrent_writers(self):
+        executor = SQLExecutor(self.db)
+        executor.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        executor.execute("CREATE INDEX idx_id ON T(Id)")
+        executor.execute("CREATE INDEX idx_nom ON T(Nom) USING HASH")
+        insert = executor.prepare("INSERT INTO T VALUES (?, ?)")
+        for i in range(60):
+            insert.execute(i, "depart")
+        rel = self.db.GetTable("T")
+        initial = {rec.values[0]: rec for page_id in rel.allocated_pages for rec in rel.read_page_records(page_id)}
+
+        def session(n):
+            if n % 2 == 0:
+                # Sessions qui committent chaque commande
+                session = SQLExecutor(self.db)
+                insert = session.prepare("INSERT INTO T VALUES (?, ?)")
+                for i in range(120):
+                    insert.execute((n + 1) * 1000 + i, f"s{n}")
+                session.execute(f"DELETE FROM T WHERE Id = {(n + 1) * 1000}")
+                session.execute(f"UPDATE T SET Nom = maj WHERE Id = {(n + 1) * 1000 + 1}")
+                return
+            # Sessions en cours au moment de la panne : leurs records partagent les pages
+            # et les feuilles d'index des autres
+            self.wal.Begin()
+            for i in range(120):
+                rel.InsertRecord(Record([(n + 1) * 1000 + i, "perdu"]))
+                if i % 10 == 0:
+                    own = (n // 2) * 20 + i // 10
+                    rel.DeleteRecord(initial[own]) if i % 20 == 0 else rel.UpdateRecord(initial[own], [own, "perdu"])
+
+        self.run_threads(session, 6)
+        self.wal.Flush()
+        self.buff.WriteDirtyPages()
+        self.reopen_after_crash()
+
+        expected = [[i, "depart"] for i in range(60)]
+        for n in (0, 2, 4):
+            expected += [[(n + 1) * 1000 + i, "maj" if i == 1 else f"s{n}"] for i in range(1, 120)]
+        executor = SQLExecutor(self.db)
+        self.assertEqual(sorted(executor.cursor(executor.parse("SELECT * FROM T")).fetchall()), sorted(expected))
+        rel = self.db.GetTable("T")
+        self.assertEqual(len(list(rel.indexes["idx_id"].Search())), len(expected))
+        self.assertEqual(len(list(rel.indexes["idx_nom"].Search("depart", "depart"))), 60)
+        self.assertEqual(list(rel.indexes["idx_nom"].Search("perdu", "perdu")), [])
+        self.assertEqual(len(list(rel.indexes["idx_nom"].Search("s2", "s2"))), 118)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,5 +50,27 @@ class TestDiskManager(unittest.TestCase):
         self.assertEqual(new_pid.FileIdx, 0) 
         self.assertEqual(new_pid.PageIdx, 0)
 
+    def test_persistent_handles(self):
+        dm = DiskManager(self.config)
+        p0 = dm.AllocPage()
+        p1 = dm.AllocPage()
+        # Un seul descripteur pour Data0.bin et un compteur de pages en mémoire
+        self.assertEqual(list(dm.fds.keys()), [0])
+        self.assertEqual(dm.page_counts[0], 2)
+        self.assertEqual(os.path.getsize(dm.get_file_path(0)), 2 * self.config.pagesize)
+
+        data = bytearray(self.config.pagesize)
+        data[-3:] = b"end"
+        dm.WritePage(p1, data)
+        dm.Finish()
+        self.assertEqual(dm.fds, {})
+
+        # Après Finish, le fichier est rouvert à la demande avec le bon nombre de pages
+        read_buff = bytearray(self.config.pagesize)
+        dm.ReadPage(p1, read_buff)
+        self.assertEqual(read_buff[-3:], b"end")
+        self.assertEqual(dm.AllocPage().PageIdx, 2)
+        dm.Finish()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
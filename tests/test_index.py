@@ -0,0 +1,137 @@
+import unittest
+import os
+import random
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from managers.relation import Record
+from query_engine.index_scan import IndexScan
+from sql.parser import parse
+from sql.executor import SQLExecutor
+
+
+class TestIndex(unittest.TestCase):
+    TEST_DIR = "./test_db_index"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        # Petites pages : l'arbre a vite plusieurs niveaux
+        self.config = DBConfig(self.TEST_DIR, pagesize=256, bm_buffercount=8)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def _keys(self, rel, rids):
+        return sorted(rel.read_record_from_page(rid.page_id, rid.slot_idx).values[0] for rid in rids)
+
+    def test_btree_insert_search_delete(self):
+        rel = self.db.CreateTable("T", [("K", "INT"), ("Nom", "CHAR(4)")])
+        index = self.db.CreateIndex("idx_k", "T", "K")
+        rng = random.Random(42)
+        keys = [rng.randrange(300) for _ in range(1500)]
+        rids = [rel.InsertRecord(Record([k, "x"])) for k in keys]
+
+        self.assertEqual(self._keys(rel, index.Search()), sorted(keys))
+        self.assertEqual(self._keys(rel, index.Search(100, 120)), sorted(k for k in keys if 100 <= k <= 120))
+        self.assertEqual(len(list(index.Search(42, 42))), keys.count(42))
+
+        # Suppression de la moitié des records (doublons compris)
+        for rid, k in list(zip(rids, keys))[::2]:
+            rec = Record([k, "x"])
+            rec.rid = rid
+            rel.DeleteRecord(rec)
+        remaining = keys[1::2]
+        self.assertEqual(self._keys(rel, index.Search()), sorted(remaining))
+        self.assertEqual(self._keys(rel, index.Search(None, 50)), sorted(k for k in remaining if k <= 50))
+
+    def test_char_index_and_persistence(self):
+        rel = self.db.CreateTable("C", [("Nom", "CHAR(6)")])
+        for i in range(200):
+            rel.InsertRecord(Record([f"n{i:03d}"]))
+        self.db.CreateIndex("idx_nom", "C", "Nom")
+        self.db.SaveState()
+        self.buff.FlushBuffers()
+
+        db2 = DBManager(self.config, self.disk, self.buff)
+        index = db2.GetTable("C").indexes["idx_nom"]
+        rids = list(index.Search("n050", "n052"))
+        values = sorted(db2.GetTable("C").read_record_from_page(r.page_id, r.slot_idx).values[0] for r in rids)
+        self.assertEqual(values, ["n050", "n051", "n052"])
+
+    def test_hash_insert_search_delete(self):
+        rel = self.db.CreateTable("H", [("K", "INT"), ("Nom", "CHAR(4)")])
+        index = self.db.CreateIndex("idx_h", "H", "K", "HASH")
+        rng = random.Random(7)
+        # Beaucoup de doublons : éclatements du répertoire et pages de débordement
+        keys = [rng.randrange(200) for _ in range(1500)] + [13] * 100
+        rids = [rel.InsertRecord(Record([k, "x"])) for k in keys]
+        self.assertGreater(index.global_depth, 0)
+
+        for k in (0, 13, 77, 199, 500):
+            self.assertEqual(self._keys(rel, index.Search(k, k)), [k] * keys.count(k))
+        with self.assertRaises(Exception):
+            list(index.Search(1, 5))
+
+        for rid, k in list(zip(rids, keys))[::2]:
+            rec = Record([k, "x"])
+            rec.rid = rid
+            rel.DeleteRecord(rec)
+        remaining = keys[1::2]
+        for k in (0, 13, 77):
+            self.assertEqual(self._keys(rel, index.Search(k, k)), [k] * remaining.count(k))
+
+    def test_hash_char_persistence(self):
+        rel = self.db.CreateTable("C", [("Nom", "CHAR(6)")])
+        for i in range(300):
+            rel.InsertRecord(Record([f"n{i:03d}"]))
+        self.db.CreateIndex("idx_nom", "C", "Nom", "HASH")
+        self.db.SaveState()
+        self.buff.FlushBuffers()
+
+        db2 = DBManager(self.config, self.disk, self.buff)
+        index = db2.GetTable("C").indexes["idx_nom"]
+        self.assertEqual(index.KIND, "HASH")
+        rids = list(index.Search("n123", "n123"))
+        self.assertEqual([db2.GetTable("C").read_record_from_page(r.page_id, r.slot_idx).values[0] for r in rids], ["n123"])
+
+    def test_sql_uses_index(self):
+        self.exec.execute_command(parse("CREATE TABLE U (Id:INT, Nom:CHAR(8))"))
+        for i in range(300):
+            self.exec.execute_command(parse(f'INSERT INTO U VALUES ({i}, "u{i}")'))
+        res = self.exec.execute_command(parse("CREATE INDEX idx_id ON U(Id)"))
+        self.assertIn("idx_id", res)
+
+        rel = self.db.GetTable("U")
+        plan = self.exec._build_iterator(rel, "Id > 10 AND Id <= 12")
+        self.assertIsInstance(plan.child, IndexScan)
+        self.assertEqual((plan.child.low, plan.child.high), (10, 12))
+
+        res = self.exec.execute_command(parse("SELECT * FROM U WHERE Id > 10 AND Id <= 12"))
+        self.assertIn("11 ; u11 .", res)
+        self.assertIn("12 ; u12 .", res)
+        self.assertIn("Total selected records=2", res)
+
+        # UPDATE de la clé indexée puis DELETE : l'index suit
+        self.assertIn("Total updated records=1", self.exec.execute_command(parse("UPDATE U SET Id=1000 WHERE Id=5")))
+        self.assertIn("Total selected records=1", self.exec.execute_command(parse("SELECT * FROM U WHERE Id=1000")))
+        self.assertIn("Total selected records=0", self.exec.execute_command(parse("SELECT * FROM U WHERE Id=5")))
+        self.assertIn("Total deleted records=1", self.exec.execute_command(parse("DELETE FROM U WHERE Id=1000")))
+        self.assertEqual(list(rel.indexes["idx_id"].Search(1000, 1000)), [])
+
+        # Avec un index HASH sur la même colonne, l'égalité passe par lui, l'intervalle reste au B+-tree
+        self.assertIn("HASH", self.exec.execute_command(parse("CREATE INDEX idx_id_h ON U(Id) USING HASH")))
+        self.assertIs(self.exec._build_iterator(rel, "Id = 7").child.index, rel.indexes["idx_id_h"])
+        self.assertIs(self.exec._build_iterator(rel, "Id < 7").child.index, rel.indexes["idx_id"])
+        self.assertIn("7 ; u7 .", self.exec.execute_command(parse("SELECT * FROM U WHERE Id = 7")))
+        self.assertIn("Total deleted records=1", self.exec.execute_command(parse("DELETE FROM U WHERE Id=7")))
+        self.assertEqual(list(rel.indexes["idx_id_h"].Search(7, 7)), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import random
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from query_engine.relation_scanner import RelationScanner
+from query_engine.operators import Condition
+from query_engine.join_operators import HashJoinOperator, SortMergeJoinOperator, BlockNestedLoopJoinOperator
+from sql.parser import parse
+from sql.executor import SQLExecutor
+
+
+class TestJoin(unittest.TestCase):
+    TEST_DIR = "./test_db_join"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=4)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+
+        rng = random.Random(3)
+        self.emp = self.db.CreateTable("Emp", [("Id", "INT"), ("Dept", "INT"), ("Nom", "CHAR(6)")])
+        self.emp_rows = [[i, rng.randrange(12), f"e{i}"] for i in range(400)]
+        self.emp.BulkInsert(self.emp_rows)
+        self.dept = self.db.CreateTable("Dept", [("Id", "INT"), ("Nom", "CHAR(6)")])
+        # Le département 3 apparaît deux fois, le 11 jamais : doublons et absences côté droit
+        self.dept_rows = [[d, f"d{d}"] for d in range(11)] + [[3, "bis"]]
+        self.dept.BulkInsert(self.dept_rows)
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def _all(self, op):
+        rows = []
+        while True:
+            batch = op.GetNextBatch()
+            if batch is None: break
+            rows.extend(tuple(rec.values) for rec in batch)
+        op.Close()
+        return sorted(rows)
+
+    def _expected(self):
+        return sorted(tuple(e + d) for e in self.emp_rows for d in self.dept_rows if e[1] == d[0])
+
+    def test_algorithms_agree(self):
+        expected = self._expected()
+        for build_left in (True, False):
+            op = HashJoinOperator(RelationScanner(self.emp), RelationScanner(self.dept), [1], [0],
+                                  self.disk, self.buff, max_rows=1000, fanout=3, build_left=build_left)
+            self.assertEqual(self._all(op), expected)
+
+        # Entrée de construction plus grande que max_rows : partitions sur disque, re-réparties
+        # (avec 12 clés, certaines partitions dépassent encore 30 records au niveau suivant)
+        for build_left in (True, False):
+            op = HashJoinOperator(RelationScanner(self.emp), RelationScanner(self.dept), [1], [0],
+                                  self.disk, self.buff, max_rows=30, fanout=3, build_left=build_left)
+            first = op.GetNextBatch()
+            self.assertEqual(bool(op.spills), build_left)
+            rows = [tuple(rec.values) for rec in first] + self._all(op)
+            self.assertEqual(sorted(rows), expected)
+            self.assertEqual(op.spills, [])
+
+        op = SortMergeJoinOperator(RelationScanner(self.emp), RelationScanner(self.dept), [1], [0],
+                                   self.disk, self.buff, run_size=1000, fan_in=3)
+        self.assertEqual(self._all(op), expected)
+
+        # Entrée gauche plus grande qu'un run : tri externe (runs sur disque, fusions en plusieurs passes)
+        op = SortMergeJoinOperator(RelationScanner(self.emp), RelationScanner(self.dept), [1], [0],
+                                   self.disk, self.buff, run_size=50, fan_in=3)
+        first = op.GetNextBatch()
+        self.assertTrue(op.left.runs)
+        rows = [tuple(rec.values) for rec in first] + self._all(op)
+        self.assertEqual(sorted(rows), expected)
+        self.assertEqual(op.left.runs, [])
+
+        # Petits blocs : la droite est relue plusieurs fois
+        cond = Condition(1, "=", 3, "INT", rhs_is_col=True)
+        op = BlockNestedLoopJoinOperator(RelationScanner(self.emp), RelationScanner(self.dept), [cond], 37)
+        self.assertEqual(self._all(op), expected)
+
+    def test_sql_join(self):
+        expected = self._expected()
+        for algorithm in SQLExecutor.JOIN_ALGORITHMS:
+            executor = SQLExecutor(self.db, algorithm)
+            res = executor.execute_command(parse("SELECT * FROM Emp e JOIN Dept d ON e.Dept = d.Id"))
+            self.assertIn(f"Total selected records={len(expected)}", res, algorithm)
+
+        executor = SQLExecutor(self.db)
+        res = executor.execute_command(parse(
+            "SELECT e.Nom, d.Nom FROM Emp e INNER JOIN Dept d ON e.Dept = d.Id WHERE d.Id = 3 AND e.Id < 100"))
+        rows = [line for line in res.splitlines() if line.endswith(" .")]
+        wanted = sorted(f"{e[2]} ; {d[1]} ." for e in self.emp_rows for d in self.dept_rows
+                        if e[1] == d[0] == 3 and e[0] < 100)
+        self.assertEqual(sorted(rows), wanted)
+
+        # Condition non équi : boucles par blocs
+        res = executor.execute_command(parse("SELECT e.Id FROM Emp e JOIN Dept d ON e.Dept < d.Id WHERE e.Id = 5"))
+        count = sum(1 for d in self.dept_rows if self.emp_rows[5][1] < d[0])
+        self.assertIn(f"Total selected records={count}", res)
+
+        self.assertIn("ambiguë", executor.execute_command(parse("SELECT Nom FROM Emp JOIN Dept ON Emp.Dept = Dept.Id")))
+
+if __name__ == '__main__':
+    unittest.main()
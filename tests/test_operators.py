@@ -0,0 +1,129 @@
+import unittest
+import os
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.relation import Relation, Record
+from query_engine.relation_scanner import RelationScanner
+from query_engine.operators import SelectOperator, Condition, ExternalSortOperator, LimitOperator
+from query_engine.columnar import HAS_NUMPY
+
+
+class TestOperators(unittest.TestCase):
+    TEST_DIR = "./test_db_operators"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, bm_buffercount=4)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        schema = [("A", "INT"), ("B", "FLOAT"), ("C", "CHAR(4)")]
+        self.rel = Relation("T", schema, self.disk, self.buff)
+        self.rel.BulkInsert([i, i / 4, "x" if i % 3 == 0 else "yy"] for i in range(500))
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def _run(self, conditions, vectorized, by_batch):
+        op = SelectOperator(RelationScanner(self.rel), conditions, vectorized=vectorized)
+        values = []
+        if by_batch:
+            while True:
+                batch = op.GetNextBatch()
+                if batch is None: break
+                values.extend(rec.values for rec in batch)
+        else:
+            while True:
+                rec = op.GetNextRecord()
+                if rec is None: break
+                values.append(rec.values)
+        return values
+
+    def test_compiled_conditions(self):
+        cond = Condition(0, ">=", "10", "INT")
+        self.assertTrue(cond.evaluate(Record([10, 0.0, "x"])))
+        self.assertFalse(cond.evaluate(Record([9, 0.0, "x"])))
+        # Colonne vs colonne avec conversion
+        self.assertTrue(Condition(2, "=", 0, "CHAR", rhs_is_col=True).evaluate(Record([3, 0.0, "3"])))
+        self.assertFalse(Condition(0, "??", "1", "INT").evaluate(Record([1, 0.0, "x"])))
+
+    def test_select_modes_agree(self):
+        cases = [
+            [Condition(0, ">", "100", "INT"), Condition(2, "=", "x", "CHAR")],
+            [Condition(1, "<=", "12.25", "FLOAT"), Condition(0, "<>", "3", "INT")],
+            [Condition(0, ">", 1, "INT", rhs_is_col=True)],
+            [Condition(0, ">", "1000", "INT"), Condition(2, "=", "x", "CHAR")],
+        ]
+        modes = [(False, False), (False, True)]
+        if HAS_NUMPY:
+            modes += [(True, False), (True, True)]
+        for conditions in cases:
+            expected = [[i, i / 4, "x" if i % 3 == 0 else "yy"] for i in range(500)
+                        if all(cond.evaluate(Record([i, i / 4, "x" if i % 3 == 0 else "yy"])) for cond in conditions)]
+            for vectorized, by_batch in modes:
+                self.assertEqual(self._run(conditions, vectorized, by_batch), expected, (vectorized, by_batch))
+
+    def _sort(self, sort_keys, run_size, fan_in, limit=None):
+        op = ExternalSortOperator(RelationScanner(self.rel), sort_keys, self.disk, self.buff, run_size, fan_in, limit)
+        values = []
+        while True:
+            batch = op.GetNextBatch()
+            if batch is None: break
+            values.extend(rec.values for rec in batch)
+        return op, values
+
+    def test_external_sort(self):
+        rows = [[i, i / 4, "x" if i % 3 == 0 else "yy"] for i in range(500)]
+        # C croissant puis A décroissant ; sur B seul le tri doit être stable (ordre d'insertion)
+        expected = sorted(sorted(rows, key=lambda r: r[0], reverse=True), key=lambda r: r[2])
+        free_before = len(self.disk.free_pages)
+
+        # 500 records en runs de 30, fusionnés 3 par 3 : plusieurs passes
+        op, values = self._sort([(2, False), (0, True)], run_size=30, fan_in=3)
+        self.assertEqual(values, expected)
+        self.assertTrue(op.runs)
+        op.Close()
+        self.assertEqual(op.runs, [])
+        self.assertGreater(len(self.disk.free_pages), free_before)
+
+        # Tout en mémoire : pas de run écrit
+        op, values = self._sort([(2, True)], run_size=1000, fan_in=3)
+        self.assertEqual(values, sorted(rows, key=lambda r: r[2], reverse=True))
+        self.assertEqual(op.runs, [])
+
+        # Top-K (tas borné) et LIMIT plus grand qu'un run (fusion tronquée)
+        self.assertEqual(self._sort([(1, True)], 30, 3, limit=5)[1], rows[::-1][:5])
+        self.assertEqual(self._sort([(2, False), (0, True)], 30, 3, limit=200)[1], expected[:200])
+
+    def test_limit_stops_early(self):
+        self.buff.FlushBuffers()
+        reads = []
+        read_page = self.disk.ReadPage
+        self.disk.ReadPage = lambda page_id, buff: (reads.append(page_id), read_page(page_id, buff))
+
+        scanner = RelationScanner(self.rel, readahead=0)
+        op = LimitOperator(scanner, limit=5, offset=3)
+        values = []
+        while True:
+            batch = op.GetNextBatch()
+            if batch is None: break
+            values.extend(rec.values[0] for rec in batch)
+        self.assertEqual(values, [3, 4, 5, 6, 7])
+        # Une seule page lue sur toute la table, et le scan est fermé
+        self.assertEqual(len(reads), 1)
+        self.assertLess(len(reads), len(self.rel.GetDataPages()))
+        self.assertTrue(op.closed)
+        self.assertTrue(all(frame.pin_count == 0 for frame in self.buff.buffer_pool.values()))
+
+        # Record par record, et OFFSET au-delà de la fin
+        op.Reset()
+        self.assertEqual([op.GetNextRecord().values[0] for _ in range(5)], [3, 4, 5, 6, 7])
+        self.assertIsNone(op.GetNextRecord())
+        op = LimitOperator(RelationScanner(self.rel), limit=None, offset=498)
+        self.assertEqual([rec.values[0] for rec in op.GetNextBatch()], [498, 499])
+        self.assertIsNone(op.GetNextBatch())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import os
+import pickle
+import random
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from query_engine.operators import Condition
+from query_engine.parallel_scan import ParallelScanOperator, _scan_rows
+from query_engine.aggregate_operators import ParallelAggregateOperator
+from managers.relation import Record
+from sql.executor import SQLExecutor
+
+
+class TestParallelScan(unittest.TestCase):
+    TEST_DIR = "./test_db_parallel"
+    IO_MODE = "file"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=8, dm_io_mode=self.IO_MODE,
+                               qe_parallel_workers=2, qe_parallel_min_pages=4)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+
+        rng = random.Random(3)
+        self.rel = self.db.CreateTable("Ventes", [("Client", "INT"), ("Ville", "CHAR(8)"), ("Montant", "INT")])
+        self.rows = [[rng.randrange(300), f"v{rng.randrange(5)}", rng.randrange(1000)] for _ in range(3000)]
+        self.rel.BulkInsert(self.rows)
+        # Des pages modifiées qui ne sont encore que dans le pool
+        self.exec.execute("DELETE FROM Ventes WHERE Ventes.Montant < 100")
+        self.exec.execute('INSERT INTO Ventes VALUES (1000, "neuf", 5)')
+        self.rows = [row for row in self.rows if row[2] >= 100] + [[1000, "neuf", 5]]
+
+    def tearDown(self):
+        self.disk.Finish()
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def _select(self, query):
+        with self.exec.cursor(self.exec.parse(query)) as cursor:
+            return cursor.fetchall()
+
+    def _compare(self, query):
+        """Même résultat (et même ordre) en parallèle et dans un seul thread."""
+        parallel = self._select(query)
+        self.config.qe_parallel_workers = 0
+        self.exec.plan_cache.clear()
+        serial = self._select(query)
+        self.config.qe_parallel_workers = 2
+        self.assertEqual(parallel, serial)
+        return parallel
+
+    def test_condition_pickle(self):
+        cond = pickle.loads(pickle.dumps(Condition(2, ">=", "500", "INT")))
+        self.assertTrue(cond.evaluate(Record([0, "a", 500])))
+        self.assertFalse(cond.evaluate(Record([0, "a", 499])))
+
+    def test_plan(self):
+        cmd = self.exec.parse("SELECT COUNT(*) FROM Ventes WHERE Ventes.Ville = v1")
+        op = self.exec._build_select(cmd).child
+        self.assertIsInstance(op, ParallelAggregateOperator)
+        self.assertIsInstance(op.child, ParallelScanOperator)
+
+        # Petite table : parcours dans le thread de la requête
+        self.config.qe_parallel_min_pages = 10 ** 6
+        it = self.exec._build_iterator(self.rel, "", parallel=True)
+        self.assertNotIsInstance(it, ParallelScanOperator)
+
+    def test_scan_and_filter(self):
+        rows = self._compare("SELECT * FROM Ventes")
+        self.assertEqual(sorted(rows), sorted(self.rows))
+        rows = self._compare('SELECT Client FROM Ventes WHERE Ventes.Ville = "v2" AND Ventes.Montant > 900')
+        self.assertEqual(sorted(rows), sorted([r[0]] for r in self.rows if r[1] == "v2" and r[2] > 900))
+        self.assertEqual(self._compare("SELECT * FROM Ventes WHERE Ventes.Client = 1000"), [[1000, "neuf", 5]])
+        self.assertEqual(len(self._compare("SELECT * FROM Ventes LIMIT 7")), 7)
+
+    def test_reads_pool_pages_without_writing(self):
+        autre = self.db.CreateTable("Autre", [("X", "INT")])
+        autre.BulkInsert([[1]])
+        self.exec.execute("INSERT INTO Autre VALUES (2)")
+        self.exec.execute('INSERT INTO Ventes VALUES (2000, "pin", 7)')
+        rid = next(rec.rid for page_id in self.rel.GetDataPages() for rec in self.rel.read_page_records(page_id)
+                   if rec.values[0] == 2000)
+        written = self.buff.nb_pages_written
+
+        # Page modifiée et encore épinglée par une autre session : sa version du pool est lue
+        self.buff.GetPage(rid.page_id)
+        try:
+            rows = self._select("SELECT * FROM Ventes WHERE Ventes.Client = 2000")
+        finally:
+            self.buff.FreePage(rid.page_id, False)
+        self.assertEqual(rows, [[2000, "pin", 7]])
+
+        # Rien d'écrit : ni les pages de la table, ni celles des autres
+        self.assertEqual(self.buff.nb_pages_written, written)
+        self.assertTrue(self.buff.buffer_pool[autre.GetDataPages()[0]].dirty)
+
+    def test_reads_page_being_evicted(self):
+        self.exec.execute('INSERT INTO Ventes VALUES (2000, "evince", 7)')
+        target = next(rec.rid.page_id for page_id in self.rel.GetDataPages() for rec in self.rel.read_page_records(page_id)
+                      if rec.values[0] == 2000)
+        self.assertTrue(self.buff.buffer_pool[target].dirty)
+
+        # Un scan parallèle démarre pendant l'écriture de la page évincée (plus dans le pool, pas encore sur disque)
+        write_back = self.buff._write_back
+        seen = []
+        def scan_during_write(page_id, frame):
+            if page_id == target:
+                layout, pages, copies = ParallelScanOperator(self.rel, [], 2)._layout()
+                seen.extend(_scan_rows(layout, pages, copies, [Condition(0, "=", "2000", "INT")]))
+            write_back(page_id, frame)
+        self.buff._write_back = scan_during_write
+        for page_id in self.rel.GetDataPages():
+            if page_id != target and not seen:
+                self.buff.GetPage(page_id)
+                self.buff.FreePage(page_id, False)
+        self.buff._write_back = write_back
+        self.assertEqual(seen, [[2000, "evince", 7]])
+
+    def test_aggregates(self):
+        count, total, low, high = self._compare("SELECT COUNT(*), SUM(Montant), MIN(Montant), MAX(Montant) FROM Ventes")[0]
+        self.assertEqual([count, total, low, high],
+                         [len(self.rows), sum(r[2] for r in self.rows), 5, max(r[2] for r in self.rows)])
+        self.assertEqual(self._compare("SELECT COUNT(*) FROM Ventes WHERE Ventes.Montant > 5000"), [[0]])
+
+        # Avec GROUP BY : partiels par les workers si ANALYZE dit que les groupes tiennent en mémoire
+        self.exec.execute("ANALYZE Ventes")
+        query = "SELECT Ville, COUNT(*), AVG(Montant) FROM Ventes GROUP BY Ville"
+        self.assertIsInstance(self.exec._build_select(self.exec.parse(query)).child, ParallelAggregateOperator)
+        rows = sorted(self._compare(query))
+        expected = {}
+        for r in self.rows:
+            expected.setdefault(r[1], []).append(r[2])
+        self.assertEqual(rows, [[v, len(m), sum(m) / len(m)] for v, m in sorted(expected.items())])
+
+
+class TestParallelScanMmap(TestParallelScan):
+    TEST_DIR = "./test_db_parallel_mmap"
+    IO_MODE = "mmap"
+
+
+if __name__ == '__main__':
+    unittest.main()
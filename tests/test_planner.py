@@ -0,0 +1,97 @@
+import unittest
+import os
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from managers.statistics import condition_selectivity, range_selectivity, HISTOGRAM_BUCKETS, DistinctCounter
+from query_engine.index_scan import IndexScan
+from query_engine.operators import SelectOperator
+from sql.parser import parse
+from sql.executor import SQLExecutor
+
+
+class TestPlanner(unittest.TestCase):
+    TEST_DIR = "./test_db_planner"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=8)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+
+        # Id unique, Cat : 4 valeurs, Ville : presque toujours "Paris"
+        self.rel = self.db.CreateTable("P", [("Id", "INT"), ("Cat", "INT"), ("Ville", "CHAR(8)")])
+        self.rel.BulkInsert([i, i % 4, "Lyon" if i % 100 == 0 else "Paris"] for i in range(3000))
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def test_analyze_statistics(self):
+        res = self.exec.execute_command(parse("ANALYZE P"))
+        self.assertIn("3000 records", res)
+        stats = self.rel.stats
+        self.assertEqual(stats["row_count"], 3000)
+        self.assertEqual(stats["page_count"], len(self.rel.GetDataPages()))
+        id_col, cat_col, ville_col = stats["columns"]
+        self.assertEqual((id_col["distinct"], id_col["min"], id_col["max"]), (3000, 0, 2999))
+        self.assertEqual(cat_col["distinct"], 4)
+        self.assertEqual((ville_col["min"], ville_col["max"]), ("Lyon", "Paris"))
+        self.assertEqual(len(id_col["histogram"]), HISTOGRAM_BUCKETS + 1)
+
+        self.assertAlmostEqual(range_selectivity(id_col, 0, 299), 0.1, delta=0.01)
+        self.assertAlmostEqual(condition_selectivity(stats, 0, ">=", 1500), 0.5, delta=0.01)
+        self.assertEqual(condition_selectivity(stats, 0, "=", 5000), 0.0)
+        self.assertEqual(condition_selectivity(stats, 1, "=", 2), 0.25)
+
+        # Les statistiques sont dans le catalogue
+        self.db.SaveState()
+        db2 = DBManager(self.config, self.disk, self.buff)
+        self.assertEqual(db2.GetTable("P").stats, stats)
+
+    def test_distinct_sketch(self):
+        # Mémoire bornée (k hachés au plus), estimation à quelques % près au-delà de k valeurs
+        for values in (range(200000), (f"v{i % 50000}" for i in range(150000))):
+            counter = DistinctCounter(k=4096)
+            for val in values:
+                counter.Add(val)
+            self.assertLessEqual(len(counter.hashes), 4096)
+            expected = 200000 if isinstance(values, range) else 50000
+            self.assertAlmostEqual(counter.Estimate() / expected, 1.0, delta=0.1)
+
+        # Exact tant qu'il y a au plus k valeurs distinctes
+        counter = DistinctCounter(k=1024)
+        for i in range(5000):
+            counter.Add(i % 700)
+        self.assertEqual(counter.Estimate(), 700)
+
+    def test_conjunct_order_and_access_path(self):
+        self.db.CreateIndex("idx_id", "P", "Id")
+        self.db.CreateIndex("idx_cat", "P", "Cat")
+
+        # Sans statistiques : ordre du WHERE, et index dès qu'il y en a un
+        plan = self.exec._build_iterator(self.rel, "Cat = 1 AND Id < 20")
+        self.assertEqual([c.col_idx for c in plan.conditions], [1, 0])
+        self.assertIs(plan.child.index, self.rel.indexes["idx_cat"])
+
+        self.exec.execute_command(parse("ANALYZE"))
+        plan = self.exec._build_iterator(self.rel, "Cat = 1 AND Id < 20")
+        # Id < 20 est bien plus sélectif : il passe en premier, et par son index
+        self.assertEqual([c.col_idx for c in plan.conditions], [0, 1])
+        self.assertIsInstance(plan.child, IndexScan)
+        self.assertIs(plan.child.index, self.rel.indexes["idx_id"])
+
+        # Un quart de la table via l'index coûte plus qu'un parcours complet
+        plan = self.exec._build_iterator(self.rel, "Cat = 1")
+        self.assertIsInstance(plan, SelectOperator)
+        self.assertNotIsInstance(plan.child, IndexScan)
+
+        res = self.exec.execute_command(parse("SELECT Id FROM P WHERE Ville = Paris AND Id <= 100 AND Cat = 0"))
+        self.assertIn(f"Total selected records={sum(1 for i in range(101) if i % 4 == 0 and i % 100 != 0)}", res)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import shutil
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from sql.prepared import normalize_query, count_params, bind_params, PlanCache
+from sql.executor import SQLExecutor
+
+
+class TestPrepared(unittest.TestCase):
+    TEST_DIR = "./test_db_prepared"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+        self.exec.execute("CREATE TABLE U (Id:INT, Nom:CHAR(10), Note:FLOAT)")
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def test_helpers(self):
+        self.assertEqual(normalize_query('  SELECT *   FROM U\n WHERE Nom = "a  b" '), 'SELECT * FROM U WHERE Nom = "a  b"')
+        self.assertEqual(count_params('SELECT * FROM U WHERE Id = ? AND Nom = "?" AND Note > ?'), 2)
+        self.assertEqual(bind_params('Id = ? AND Nom = ?', iter([3, 'x'])), 'Id = 3 AND Nom = "x"')
+
+        cache = PlanCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(list(cache.entries), ["a", "c"])
+
+    def test_prepared_statements(self):
+        insert = self.exec.prepare("INSERT INTO U VALUES (?, ?, ?)")
+        self.assertEqual(insert.param_count, 3)
+        for i in range(50):
+            self.assertEqual(insert.execute(i, f"u{i}", i / 2), "Record inséré.")
+        with self.assertRaises(ValueError):
+            insert.execute(1, "x")
+
+        select = self.exec.prepare("SELECT Nom FROM U WHERE Id >= ? AND Note < ?")
+        self.assertEqual(select.cursor(10, 6).fetchall(), [["u10"], ["u11"]])
+        self.assertIn("Total selected records=0", select.execute(40, 6))
+
+        update = self.exec.prepare("UPDATE U SET Nom = ? WHERE Id = ?")
+        self.assertIn("Total updated records=1", update.execute("neuf", 3))
+        self.assertIn("neuf .", self.exec.execute("SELECT Nom FROM U WHERE Id = 3"))
+        delete = self.exec.prepare("DELETE FROM U WHERE Nom = ?")
+        self.assertIn("Total deleted records=1", delete.execute("neuf"))
+
+        # Le WHERE préparé n'est analysé qu'une fois
+        hits = self.exec.plan_cache.hits
+        select.execute(1, 2)
+        select.execute(2, 3)
+        self.assertEqual(self.exec.plan_cache.hits, hits + 2)
+
+        # Jointure : paramètres dans l'ordre du texte (ON puis WHERE)
+        join = self.exec.prepare("SELECT a.Id, b.Id FROM U a JOIN U b ON a.Id = b.Id AND b.Note > ? WHERE a.Id < ?")
+        self.assertIn("Total selected records=3", join.execute(23, 51))
+
+    def test_parameter_errors(self):
+        insert = self.exec.prepare("INSERT INTO U VALUES (?, ?, ?)")
+        insert.execute(1, "a", 0.5)
+        # None n'est pas un paramètre manquant, mais une valeur que la table ne peut pas stocker
+        self.assertIn("NULL", insert.execute(2, None, 0.5))
+        self.assertEqual(self.exec.cursor(self.exec.parse("SELECT Id FROM U")).fetchall(), [[1]])
+        with self.assertRaisesRegex(ValueError, "NULL"):
+            bind_params("Id = ?", iter([None]))
+        with self.assertRaisesRegex(ValueError, "sans valeur"):
+            bind_params("Id = ? AND Nom = ?", iter([1]))
+
+        # Une condition sur une colonne inconnue est une erreur : l'ignorer décalerait les ? suivants
+        select = self.exec.prepare("SELECT Nom FROM U WHERE Inconnue = ? AND Id = ?")
+        with self.assertRaisesRegex(ValueError, "Inconnue"):
+            select.cursor(1, 1)
+        join = self.exec.prepare("SELECT a.Id FROM U a JOIN U b ON a.Id = b.Id WHERE c.Id = ? AND a.Id = ?")
+        with self.assertRaisesRegex(ValueError, "introuvable"):
+            join.cursor(5, 1)
+
+    def test_sql_prepare_and_invalidation(self):
+        self.assertIn("2 paramètre(s)", self.exec.execute("PREPARE ins AS INSERT INTO U VALUES (?, ?, 1.5)"))
+        self.exec.execute('EXECUTE ins (7, "sept")')
+        self.exec.execute("EXECUTE ins (8, 'huit')")
+        self.exec.execute("PREPARE sel AS SELECT Nom FROM U WHERE Id = ?")
+        self.assertIn("huit .", self.exec.execute("EXECUTE sel (8)"))
+        self.assertIn("introuvable", self.exec.execute("EXECUTE autre (1)"))
+
+        # Même texte de requête, mais la table change de schéma : le WHERE mis en cache
+        # (Id = colonne 0) ne doit plus servir
+        self.exec.execute("DROP TABLE U")
+        self.exec.execute("CREATE TABLE U (Nom:CHAR(10), Id:INT)")
+        self.exec.execute('INSERT INTO U VALUES ("x", 8)')
+        self.assertIn("x .", self.exec.execute("EXECUTE sel (8)"))
+
+if __name__ == '__main__':
+    unittest.main()
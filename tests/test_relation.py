@@ -5,6 +5,8 @@ from dbconfig import DBConfig
 from managers.disk_manager import DiskManager
 from managers.buffer_manager import BufferManager
 from managers.relation import Relation, Record
+from query_engine.relation_scanner import RelationScanner
+from query_engine.columnar import HAS_NUMPY
 
 class TestRelation(unittest.TestCase):
     TEST_DIR = "./test_db_rel"
@@ -38,6 +40,18 @@ class TestRelation(unittest.TestCase):
         self.assertAlmostEqual(read_rec.values[1], 99.99, places=2)
         self.assertEqual(read_rec.values[2], "SuperProd")
 
+    def test_compiled_codec(self):
+        schema = [("Id", "INT"), ("Prix", "FLOAT"), ("Nom", "CHAR(4)")]
+        rel = Relation("Codec", schema, self.disk, self.buff)
+        self.assertEqual(rel.record_struct.format, "<if4s")
+        self.assertEqual(rel.record_struct.size, rel.record_size)
+
+        # Les CHAR trop longs sont tronqués, les courts complétés puis nettoyés à la relecture
+        rid_long = rel.InsertRecord(Record(["7", 1.5, "Abcdefgh"]))
+        rid_court = rel.InsertRecord(Record([8, 2, "x"]))
+        self.assertEqual(rel.read_record_from_page(rid_long.page_id, rid_long.slot_idx).values, [7, 1.5, "Abcd"])
+        self.assertEqual(rel.read_record_from_page(rid_court.page_id, rid_court.slot_idx).values, [8, 2.0, "x"])
+
     def test_update_record(self):
         rel = Relation("Test", [("Val", "INT")], self.disk, self.buff)
         rel.add_data_page()
@@ -54,5 +68,78 @@ class TestRelation(unittest.TestCase):
         check = rel.read_record_from_page(rid.page_id, rid.slot_idx)
         self.assertEqual(check.values[0], 20)
 
+    def test_free_space_reuse(self):
+        rel = Relation("Petite", [("Val", "INT")], self.disk, self.buff)
+        nb = rel.slot_count * 2 + 1
+
+        rids = [rel.InsertRecord(Record([i])) for i in range(nb)]
+        # Les pages sont remplies avant d'en allouer une nouvelle
+        self.assertEqual(len(rel.allocated_pages), 3)
+
+        # Un slot libéré par DeleteRecord est réutilisé par l'insert suivant
+        victim = rel.read_record_from_page(rids[0].page_id, rids[0].slot_idx)
+        victim.rid = rids[0]
+        rel.DeleteRecord(victim)
+        new_rid = rel.InsertRecord(Record([999]))
+        self.assertEqual(len(rel.allocated_pages), 3)
+        self.assertIn(new_rid.page_id, rel.allocated_pages)
+
+    def test_scan_with_readahead(self):
+        config = DBConfig(self.TEST_DIR, bm_buffercount=6, bm_readahead=3)
+        buff = BufferManager(config, self.disk)
+        rel = Relation("Grande", [("Val", "INT")], self.disk, buff)
+        nb = rel.BulkInsert([i] for i in range(rel.slot_count * 8))
+
+        scanner = RelationScanner(rel)
+        values = []
+        while True:
+            rec = scanner.GetNextRecord()
+            if rec is None: break
+            values.append(rec.values[0])
+        self.assertEqual(values, list(range(nb)))
+        self.assertIsNotNone(buff.prefetch_pool)
+
+    def test_scan_by_batch(self):
+        rel = Relation("Lots", [("Val", "INT"), ("Nom", "CHAR(4)")], self.disk, self.buff)
+        for i in range(rel.slot_count + 3):
+            rel.InsertRecord(Record([i, f"n{i}"]))
+
+        scanner = RelationScanner(rel)
+        first = scanner.GetNextRecord()
+        self.assertEqual(first.values, [0, "n0"])
+        # Le reste de la première page, puis la deuxième page entière
+        batch = scanner.GetNextBatch()
+        self.assertEqual(len(batch), rel.slot_count - 1)
+        self.assertEqual(batch[0].rid.slot_idx, 1)
+        self.assertEqual([r.values[0] for r in scanner.GetNextBatch()], list(range(rel.slot_count, rel.slot_count + 3)))
+        self.assertIsNone(scanner.GetNextBatch())
+
+        # Aucune page ne reste épinglée entre deux appels
+        for frame in self.buff.buffer_pool.values():
+            self.assertEqual(frame.pin_count, 0)
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy non installé")
+    def test_columnar_decode(self):
+        schema = [("Id", "INT"), ("Prix", "FLOAT"), ("Nom", "CHAR(6)")]
+        rel = Relation("Col", schema, self.disk, self.buff)
+        rids = [rel.InsertRecord(Record([i, i * 1.5, f"nom{i}"])) for i in range(rel.slot_count + 5)]
+        victim = Record([0, 0.0, "nom0"])
+        victim.rid = rids[1]
+        rel.DeleteRecord(victim)
+
+        scanner = RelationScanner(rel)
+        batch = scanner.GetNextColumnBatch()
+        self.assertEqual(len(batch), rel.slot_count - 1)
+        self.assertEqual(batch.columns[0][:3].tolist(), [0, 2, 3])
+        self.assertEqual(batch.columns[2][0], b"nom0")
+
+        # Filtrage vectoriel puis reconstruction des Records avec leur RID
+        records = batch.to_records(batch.columns[0] > rel.slot_count - 3)
+        self.assertEqual([r.values for r in records], [[i, i * 1.5, f"nom{i}"] for i in range(rel.slot_count - 2, rel.slot_count)])
+        self.assertEqual(records[0].rid, rids[rel.slot_count - 2])
+
+        self.assertEqual(len(scanner.GetNextColumnBatch()), 5)
+        self.assertIsNone(scanner.GetNextColumnBatch())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
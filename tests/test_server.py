@@ -0,0 +1,145 @@
+import unittest
+import os
+import shutil
+import socket
+import asyncio
+import threading
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from sql.server import SQLServer
+from sql.client import Connection, ConnectionPool
+
+
+class TestServer(unittest.TestCase):
+    TEST_DIR = "./test_db_server"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, bm_buffercount=16)
+        self.disk = DiskManager(self.config)
+        self.buff = BufferManager(self.config, self.disk)
+        self.db = DBManager(self.config, self.disk, self.buff)
+
+        # Boucle asyncio du serveur dans un thread (port choisi par le système)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.server = SQLServer(self.db, port=0, workers=4, batch_size=7)
+        asyncio.run_coroutine_threadsafe(self.server.Start(), self.loop).result(5)
+        self.conn = Connection(port=self.server.port, timeout=10)
+        self.conn.execute("CREATE TABLE T (Id:INT, Nom:CHAR(10))")
+
+    def tearDown(self):
+        self.conn.close()
+        asyncio.run_coroutine_threadsafe(self.server.Stop(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.disk.Finish()
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def test_execute_and_query(self):
+        self.conn.execute('INSERT INTO T VALUES (1, "a")')
+        self.conn.execute("INSERT INTO T VALUES (?, ?)", 2, "b")
+        self.assertEqual(self.conn.query("SELECT * FROM T WHERE T.Id = ?", 2), [[2, "b"]])
+        self.assertEqual(len(self.conn.query("SELECT * FROM T")), 2)
+        with self.assertRaises(Exception):
+            self.conn.query('INSERT INTO T VALUES (3, "c")')
+
+    def test_errors_keep_connection(self):
+        with self.assertRaises(Exception):
+            self.conn.execute("SELECT * FROM Inconnue")
+        with self.assertRaises(Exception):
+            self.conn.execute("N'IMPORTE QUOI")
+        self.assertEqual(self.conn.query("SELECT * FROM T"), [])
+
+    def test_pipeline_and_streaming(self):
+        requests = [("INSERT INTO T VALUES (?, ?)", (i, f"n{i}")) for i in range(100)]
+        requests.append(("SELECT * FROM T", ()))
+        results = self.conn.pipeline(requests)
+        self.assertEqual(len(results), 101)
+        self.assertEqual(sorted(row[0] for row in results[-1]), list(range(100)))
+
+        # Plusieurs paquets (batch_size=7) lus au fil de l'eau
+        self.assertEqual(sum(1 for _ in self.conn.iter_rows("SELECT * FROM T")), 100)
+
+        # Une erreur au milieu du lot : les autres requêtes sont exécutées quand même
+        with self.assertRaises(Exception):
+            self.conn.pipeline([("SELECT * FROM Inconnue", ()), ('INSERT INTO T VALUES (100, "x")', ())])
+        self.assertEqual(len(self.conn.query("SELECT * FROM T")), 101)
+
+    def test_large_pipeline(self):
+        self.conn.pipeline([("INSERT INTO T VALUES (?, ?)", (i, f"n{i}")) for i in range(200)])
+        # Petits tampons de sockets : le lot et ses réponses ne tiennent pas dedans, le serveur
+        # répond pendant que le client envoie encore ses requêtes
+        # (les sockets acceptées héritent des tampons de la socket d'écoute)
+        for sock in self.server.server.sockets:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        with Connection(port=self.server.port, timeout=10) as conn:
+            conn.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+            conn.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            padding = "x" * 5000
+            results = conn.pipeline([("SELECT * FROM T WHERE T.Nom <> ?", (padding,)) for _ in range(100)])
+        self.assertEqual(len(results), 100)
+        self.assertTrue(all(len(rows) == 200 for rows in results))
+
+    def test_pool_and_ddl(self):
+        pool = ConnectionPool(port=self.server.port, max_size=3, timeout=10)
+        errors = []
+
+        def session(n):
+            try:
+                for i in range(20):
+                    pool.execute("INSERT INTO T VALUES (?, ?)", n * 100 + i, f"s{n}")
+                    pool.query("SELECT * FROM T WHERE T.Id = ?", n * 100 + i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=session, args=(n,)) for n in range(6)]
+        threads.append(threading.Thread(target=lambda: pool.execute("CREATE TABLE U (Id:INT)")))
+        for t in threads: t.start()
+        for t in threads: t.join()
+        pool.close()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(pool.size, 0)
+        self.assertEqual(len(self.conn.query("SELECT * FROM T")), 120)
+        self.assertEqual(self.conn.query("SELECT * FROM U"), [])
+
+    def test_stalled_reader_does_not_block_others(self):
+        # Un client qui ne lit pas ses lignes : l'envoi de son premier paquet reste bloqué (comme drain)
+        release = threading.Event()
+        stalled = threading.Event()
+        send = self.server._send
+
+        async def slow_send(writer, message):
+            if message["type"] == "rows" and not release.is_set():
+                stalled.set()
+                while not release.is_set():
+                    await asyncio.sleep(0.01)
+            await send(writer, message)
+        self.server._send = slow_send
+
+        self.conn.pipeline([("INSERT INTO T VALUES (?, ?)", (i, "x")) for i in range(50)])
+        with Connection(port=self.server.port, timeout=10) as reader, Connection(port=self.server.port, timeout=5) as other:
+            req_id = reader._send([("SELECT * FROM T", ())])[0]
+            self.assertTrue(stalled.wait(5))
+            # DDL (verrou exclusif) puis lecture sur une autre connexion : ni l'un ni l'autre n'attend le client bloqué
+            other.execute("CREATE TABLE U (Id:INT)")
+            self.assertEqual(other.query("SELECT * FROM U"), [])
+
+            release.set()
+            nb_rows = 0
+            while True:
+                message = reader._recv(req_id)
+                if message["type"] != "rows":
+                    break
+                nb_rows += len(message["rows"])
+            self.assertEqual((message["type"], nb_rows), ("done", 50))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -54,5 +54,102 @@ class TestSQLEngine(unittest.TestCase):
         res2 = self.exec.execute_command(parse("SELECT * FROM T"))
         self.assertIn("Total selected records=0", res2)
 
+    def test_free_space_persistence(self):
+        self.exec.execute_command(parse("CREATE TABLE T (A:INT)"))
+        for i in range(5):
+            self.exec.execute_command(parse(f"INSERT INTO T VALUES ({i})"))
+        self.assertEqual(len(self.db.GetTable("T").allocated_pages), 1)
+
+        self.db.SaveState()
+        self.buff.FlushBuffers()
+
+        # Redémarrage : la free-space map est rechargée avec le catalogue
+        db2 = DBManager(self.config, self.disk, self.buff)
+        rel = db2.GetTable("T")
+        self.assertEqual(rel.free_space, {rel.allocated_pages[0]: rel.slot_count - 5})
+        SQLExecutor(db2).execute_command(parse("INSERT INTO T VALUES (5)"))
+        self.assertEqual(len(rel.allocated_pages), 1)
+
+    def test_append_bulk_load(self):
+        self.exec.execute_command(parse("CREATE TABLE P (Id:INT, Prix:FLOAT, Nom:CHAR(8))"))
+        csv_path = os.path.join(self.TEST_DIR, "p.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            for i in range(300):
+                f.write(f"{i},{i / 2},nom{i}\n")
+            f.write("pas,un,nombre\n")  # ligne ignorée
+
+        res = self.exec.execute_command(parse(f"APPEND INTO P ALLRECORDS ({csv_path})"))
+        self.assertIn("Total records loaded=300", res)
+        self.assertIn("records/s", res)
+
+        res = self.exec.execute_command(parse("SELECT * FROM P WHERE Id=299"))
+        self.assertIn("299 ; 149.5 ; nom299 .", res)
+        self.assertIn("Total selected records=1", res)
+
+    def test_scenario_mmap(self):
+        config = DBConfig(self.TEST_DIR, dm_io_mode="mmap")
+        disk = DiskManager(config)
+        buff = BufferManager(config, disk)
+        executor = SQLExecutor(DBManager(config, disk, buff))
+        executor.execute_command(parse("CREATE TABLE U (Id:INT, Nom:CHAR(10))"))
+        for i in range(20):
+            executor.execute_command(parse(f'INSERT INTO U VALUES ({i}, "n{i}")'))
+        executor.execute_command(parse("UPDATE U SET Nom=bob WHERE Id=3"))
+
+        res = executor.execute_command(parse("SELECT * FROM U WHERE Id=3"))
+        self.assertIn("3 ; bob .", res)
+        buff.FlushBuffers()
+        disk.Finish()
+
+    def test_order_by(self):
+        self.exec.execute_command(parse("CREATE TABLE S (Id:INT, Nom:CHAR(6), Score:FLOAT)"))
+        for i in range(50):
+            self.exec.execute_command(parse(f'INSERT INTO S VALUES ({i}, "n{i % 7}", {(i * 37) % 11})'))
+
+        cmd = parse("SELECT Id FROM S WHERE Id < 40 ORDER BY Nom DESC, Id LIMIT 4")
+        self.assertEqual(cmd["order_by"], [("Nom", True), ("Id", False)])
+        self.assertEqual(cmd["limit"], 4)
+        self.assertEqual(cmd["where"], "Id < 40")
+        res = self.exec.execute_command(cmd)
+        self.assertEqual(res.splitlines(), ["6 .", "13 .", "20 .", "27 .", "Total selected records=4"])
+
+        res = self.exec.execute_command(parse("SELECT s.Score, s.Id FROM S s ORDER BY s.Score, s.Id"))
+        lines = res.splitlines()[:-1]
+        expected = sorted((float((i * 37) % 11), i) for i in range(50))
+        self.assertEqual(lines, [f"{score} ; {i} ." for score, i in expected])
+
+    def test_limit_offset(self):
+        self.exec.execute_command(parse("CREATE TABLE L (Id:INT)"))
+        for i in range(30):
+            self.exec.execute_command(parse(f"INSERT INTO L VALUES ({i})"))
+        res = self.exec.execute_command(parse("SELECT * FROM L WHERE Id >= 10 LIMIT 3 OFFSET 2"))
+        self.assertEqual(res.splitlines(), ["12 .", "13 .", "14 .", "Total selected records=3"])
+        res = self.exec.execute_command(parse("SELECT Id FROM L ORDER BY Id DESC LIMIT 2 OFFSET 1"))
+        self.assertEqual(res.splitlines(), ["28 .", "27 .", "Total selected records=2"])
+        self.assertIn("Total selected records=0", self.exec.execute_command(parse("SELECT * FROM L LIMIT 0")))
+
+    def test_cursor_streams(self):
+        self.exec.execute_command(parse("CREATE TABLE K (Id:INT, Nom:CHAR(20))"))
+        rel = self.db.GetTable("K")
+        rel.BulkInsert([i, f"k{i}"] for i in range(2000))
+
+        cursor = self.exec.cursor(parse("SELECT Id FROM K WHERE Id >= 5"))
+        self.assertEqual(cursor.fetchone(), [5])
+        self.assertEqual(cursor.fetchmany(3), [[6], [7], [8]])
+        # Seule la première page a été lue pour l'instant
+        scanner = cursor.iterator.child.child
+        self.assertEqual(scanner.current_page_idx, 1)
+        rest = cursor.fetchall()
+        self.assertEqual(rest[0], [9])
+        self.assertEqual(len(rest), 2000 - 9)
+        self.assertEqual(cursor.rowcount, 1995)
+        self.assertTrue(cursor.closed)
+        self.assertEqual(cursor.fetchmany(), [])
+
+        with self.exec.cursor(parse("SELECT COUNT(*) FROM K")) as cursor:
+            self.assertEqual(list(cursor), [[2000]])
+        with self.assertRaises(ValueError):
+            self.exec.cursor(parse("DELETE FROM K"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
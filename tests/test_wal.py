@@ -0,0 +1,368 @@
+import unittest
+import os
+import shutil
+import threading
+from dbconfig import DBConfig
+from managers.disk_manager import DiskManager
+from managers.buffer_manager import BufferManager
+from managers.db_manager import DBManager
+from managers.wal_manager import WALManager, FILE_HEADER
+from managers.page_id import PageId
+from managers.record_id import RecordId
+from managers.relation import Record
+from query_engine.operators import ExternalSortOperator
+from query_engine.relation_scanner import RelationScanner
+from sql.executor import SQLExecutor
+
+
+class TestWAL(unittest.TestCase):
+    TEST_DIR = "./test_db_wal"
+
+    def setUp(self):
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+        os.makedirs(self.TEST_DIR)
+        self.config = DBConfig(self.TEST_DIR, pagesize=512, bm_buffercount=4, wal_enabled=True)
+        self.open()
+
+    def tearDown(self):
+        self.crash()
+        if os.path.exists(self.TEST_DIR): shutil.rmtree(self.TEST_DIR)
+
+    def open(self):
+        self.disk = DiskManager(self.config)
+        self.wal = WALManager(self.config, self.disk)
+        self.buff = BufferManager(self.config, self.disk, self.wal)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+
+    def crash(self):
+        """Arrêt brutal : rien n'est sauvegardé, les pages dirty du buffer pool sont perdues."""
+        for fd in self.disk.fds.values():
+            os.close(fd)
+        self.disk.fds.clear()
+        if self.wal.fd is not None:
+            os.close(self.wal.fd)
+            self.wal.fd = None
+
+    def select(self, query):
+        return sorted(self.exec.cursor(self.exec.parse(query)).fetchall())
+
+    def test_redo_after_crash(self):
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id)")
+        self.exec.execute("CREATE INDEX idx_nom ON T(Nom) USING HASH")
+        insert = self.exec.prepare("INSERT INTO T VALUES (?, ?)")
+        for i in range(300):
+            insert.execute(i, f"n{i % 7}")
+        self.exec.execute("UPDATE T SET Nom = neuf WHERE Id < 10")
+        self.exec.execute("DELETE FROM T WHERE Id >= 250")
+        self.exec.execute("ANALYZE T")
+        expected = self.select("SELECT * FROM T")
+        # Les pages sont restées dans le pool ou ont été écrites sans ordre : seul le journal fait foi
+        self.assertGreater(self.wal.nb_commits, 300)
+
+        self.crash()
+        self.open()
+        self.assertEqual(self.select("SELECT * FROM T"), expected)
+        self.assertEqual(len(self.select("SELECT * FROM T WHERE Nom = n3")), sum(1 for i in range(10, 250) if i % 7 == 3))
+        self.assertEqual(self.select("SELECT Nom FROM T WHERE Id = 5"), [["neuf"]])
+        self.assertEqual(self.db.GetTable("T").stats["row_count"], 250)
+        # La reprise a tout sauvegardé et vidé le journal
+        self.assertEqual([os.path.getsize(path) for _, path in self.wal.segments], [FILE_HEADER.size])
+
+        # La base continue normalement après la reprise
+        self.exec.execute("INSERT INTO T VALUES (1000, zz)")
+        self.crash()
+        self.open()
+        self.assertEqual(self.select("SELECT Nom FROM T WHERE Id = 1000"), [["zz"]])
+
+    def test_undo_uncommitted(self):
+        self.exec.execute("CREATE TABLE T (Id:INT)")
+        for i in range(20):
+            self.exec.execute(f"INSERT INTO T VALUES ({i})")
+        rel = self.db.GetTable("T")
+        nb_pages = len(rel.GetDataPages())
+
+        # Transaction en cours au moment de la panne, dont les pages ont déjà été écrites
+        self.wal.Begin()
+        for i in range(200):
+            rel.InsertRecord(Record([1000 + i]))
+        self.buff.FlushBuffers()
+        self.wal.Flush()
+        self.crash()
+
+        self.open()
+        self.assertEqual(self.select("SELECT * FROM T"), [[i] for i in range(20)])
+        rel = self.db.GetTable("T")
+        # Les pages ajoutées par la transaction perdue restent à la table (transactions système), vidées
+        self.assertGreater(len(rel.GetDataPages()), nb_pages)
+        self.assertEqual(sum(rel.free_space.values()), len(rel.GetDataPages()) * rel.slot_count - 20)
+
+    def _crash_with_concurrent_writer(self, existing_rows):
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id)")
+        for i in range(existing_rows):
+            self.exec.execute(f"INSERT INTO T VALUES ({100 + i}, avant)")
+        rel = self.db.GetTable("T")
+
+        # Session A (ce thread) insère sans committer ; session B insère sur la même page
+        # et dans la même feuille d'index, puis committe
+        self.wal.Begin()
+        rel.InsertRecord(Record([1, "a"]))
+        other = threading.Thread(target=lambda: SQLExecutor(self.db).execute("INSERT INTO T VALUES (2, b)"))
+        other.start()
+        other.join()
+        self.assertEqual(len(rel.GetDataPages()), 1)
+        self.crash()
+
+        self.open()
+        expected = sorted([[2, "b"]] + [[100 + i, "avant"] for i in range(existing_rows)])
+        self.assertEqual(self.select("SELECT * FROM T"), expected)
+        self.assertEqual(self.select("SELECT * FROM T WHERE Id = 2"), [[2, "b"]])
+        index = self.db.GetTable("T").indexes["idx_id"]
+        self.assertEqual(len(list(index.Search(2, 2))), 1)
+        self.assertEqual(list(index.Search(1, 1)), [])
+
+    def test_crash_keeps_other_session_commit_on_new_page(self):
+        self._crash_with_concurrent_writer(0)
+
+    def test_crash_keeps_other_session_commit_on_existing_page(self):
+        self._crash_with_concurrent_writer(3)
+
+    def _check_rolled_back(self, expected):
+        self.assertEqual(self.select("SELECT * FROM T"), expected)
+        rel = self.db.GetTable("T")
+        self.assertEqual(sorted(rid.slot_idx for rid in rel.indexes["idx_id"].Search(3, 3)), [3])
+        self.assertEqual(list(rel.indexes["idx_id"].Search(100, None)), [])
+        self.assertEqual(self.select("SELECT Id FROM T WHERE Nom = n5"), [[5]])
+        self.assertEqual(self.select("SELECT Id FROM T WHERE Nom = x"), [])
+
+    def test_failed_statement_is_rolled_back(self):
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id)")
+        self.exec.execute("CREATE INDEX idx_nom ON T(Nom) USING HASH")
+        insert = self.exec.prepare("INSERT INTO T VALUES (?, ?)")
+        for i in range(10):
+            insert.execute(i, f"n{i}")
+        expected = self.select("SELECT * FROM T")
+        rel = self.db.GetTable("T")
+        records = {rec.values[0]: rec for page_id in rel.GetDataPages() for rec in rel.read_page_records(page_id)}
+
+        # Une commande qui lève une exception après avoir inséré (nouvelles pages, éclatements
+        # d'index), supprimé et modifié des records
+        with self.assertRaises(ZeroDivisionError):
+            with self.db.Transaction():
+                for i in range(100):
+                    rel.InsertRecord(Record([100 + i, "x"]))
+                rel.DeleteRecord(records[3])
+                rel.UpdateRecord(records[5], [5, "x"])
+                rel.UpdateRecord(records[5], [500, "y"])
+                1 / 0
+        self._check_rolled_back(expected)
+
+        # Chargement en masse interrompu par une ligne illisible
+        csv_path = os.path.join(self.TEST_DIR, "data.csv")
+        with open(csv_path, "wb") as f:
+            f.write("".join(f"{100 + i},b{i}\n" for i in range(1000)).encode() + b"\xff\n")
+        self.assertIn("Erreur", self.exec.execute(f"APPEND INTO T ALLRECORDS ({csv_path})"))
+        self._check_rolled_back(expected)
+        self.assertEqual(self.select("SELECT Id FROM T WHERE Nom = b7"), [])
+
+        # Le record remis en place par le rollback occupe son slot : une insertion ne l'écrase pas
+        self.exec.execute("INSERT INTO T VALUES (10, n10)")
+        self.assertEqual(self.select("SELECT Id FROM T WHERE Id = 3"), [[3]])
+        self.exec.execute("DELETE FROM T WHERE Id = 10")
+
+        # Une panne donne le même résultat
+        self.crash()
+        self.open()
+        self._check_rolled_back(expected)
+
+    def test_failed_split_is_undone(self):
+        self.exec.execute("CREATE TABLE T (Id:INT)")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id)")
+        index = self.db.GetTable("T").indexes["idx_id"]
+        for i in range(index.leaf_capacity):
+            index.Insert(i, RecordId(PageId(0, 0), i))
+        root = bytes(self.buff.GetPage(index.root_page_id))
+        self.buff.FreePage(index.root_page_id, False)
+
+        # La racine (une feuille pleine) éclate : la deuxième allocation échoue à mi-chemin
+        alloc = self.disk.AllocPage
+        calls = []
+        def failing_alloc():
+            calls.append(1)
+            if len(calls) == 2:
+                raise Exception("disque plein")
+            return alloc()
+        self.disk.AllocPage = failing_alloc
+        with self.assertRaises(Exception):
+            index.Insert(-1, RecordId(PageId(0, 0), 99))
+        self.disk.AllocPage = alloc
+
+        # Les noeuds déjà réécrits ont repris leur contenu d'avant
+        self.assertEqual(bytes(self.buff.GetPage(index.root_page_id)), root)
+        self.buff.FreePage(index.root_page_id, False)
+        self.assertEqual([rid.slot_idx for rid in index.Search()], list(range(index.leaf_capacity)))
+
+        self.wal.Flush()
+        self.crash()
+        self.open()
+        index = self.db.GetTable("T").indexes["idx_id"]
+        self.assertEqual([rid.slot_idx for rid in index.Search()], list(range(index.leaf_capacity)))
+
+    def test_failed_hash_split_keeps_overflow_pages(self):
+        self.exec.execute("CREATE TABLE T (Id:INT)")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id) USING HASH")
+        index = self.db.GetTable("T").indexes["idx_id"]
+        # Un bucket avec une chaîne de débordement (doublons), puis une autre clé : éclatement
+        for i in range(3 * index.capacity):
+            index.Insert(7, RecordId(PageId(0, 0), i))
+        head_id = index.directory[0]
+        chain_pages = []
+        overflow = index._read_page(head_id)[2]
+        while overflow is not None:
+            chain_pages.append(overflow)
+            overflow = index._read_page(overflow)[2]
+        self.assertEqual(len(chain_pages), 2)
+
+        alloc = self.disk.AllocPage
+        def failing_alloc():
+            raise Exception("disque plein")
+        self.disk.AllocPage = failing_alloc
+        with self.assertRaises(Exception):
+            index.Insert(8, RecordId(PageId(0, 0), 0))
+        self.disk.AllocPage = alloc
+
+        # La chaîne remise en place n'a pas été rendue au DiskManager
+        self.assertFalse(any(page_id in self.disk.free_pages for page_id in chain_pages))
+        self.assertEqual(len(list(index.Search(7, 7))), 3 * index.capacity)
+        index.Insert(8, RecordId(PageId(0, 0), 0))
+        self.assertEqual(len(list(index.Search(7, 7))), 3 * index.capacity)
+        self.assertEqual(len(list(index.Search(8, 8))), 1)
+
+    def test_crash_before_bulk_pages_are_attached(self):
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        self.exec.execute("CREATE INDEX idx_id ON T(Id)")
+        self.exec.execute("INSERT INTO T VALUES (-1, avant)")
+        rel = self.db.GetTable("T")
+
+        # Panne au moment de rattacher les pages chargées (déjà allouées et écrites)
+        def crash_at_attach(page_id):
+            raise SystemExit
+        self.wal.LogNewPage = crash_at_attach
+        self.wal.Begin()
+        with self.assertRaises(SystemExit):
+            rel.BulkInsert([i, f"x{i}"] for i in range(2000))
+        self.wal.Flush()
+        self.crash()
+
+        self.open()
+        self.assertEqual(self.select("SELECT * FROM T"), [[-1, "avant"]])
+        self.assertEqual(list(self.db.GetTable("T").indexes["idx_id"].Search(0, None)), [])
+        # Les pages du chargement sont redevenues libres : un nouveau chargement les réutilise
+        self.assertGreater(len(self.disk.free_pages), 0)
+        page_counts = dict(self.disk.page_counts)
+        self.db.GetTable("T").BulkInsert([i, f"x{i}"] for i in range(2000))
+        self.assertEqual(self.disk.page_counts, page_counts)
+
+    def test_spilling_select_does_not_commit(self):
+        self.exec.execute("CREATE TABLE T (Id:INT)")
+        rel = self.db.GetTable("T")
+        with self.db.Transaction():
+            rel.BulkInsert([i] for i in range(1000, 0, -1))
+        commits = self.wal.nb_commits
+
+        # Tri externe dans une transaction en lecture seule : ses runs vont sur des pages temporaires
+        with self.db.Transaction():
+            op = ExternalSortOperator(RelationScanner(rel), [(0, False)], self.disk, self.buff, 100, 3)
+            rows = []
+            while (rec := op.GetNextRecord()) is not None:
+                rows.append(rec.values[0])
+            op.Close()
+            self.assertFalse(self.wal.local.wrote)
+        self.assertEqual(rows, list(range(1, 1001)))
+        self.assertEqual(self.wal.nb_commits, commits)
+        free_pages = list(self.disk.free_pages)
+        self.assertGreater(len(free_pages), 0)
+
+        # Les pages temporaires rendues restent libres après une panne
+        self.wal.Flush()
+        self.crash()
+        self.open()
+        self.assertEqual(set(self.disk.free_pages), set(free_pages))
+
+    def test_bulk_load_and_clean_shutdown(self):
+        csv_path = os.path.join(self.TEST_DIR, "data.csv")
+        with open(csv_path, "w") as f:
+            f.write("\n".join(f"{i},x{i}" for i in range(500)))
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        self.exec.execute("INSERT INTO T VALUES (-1, avant)")
+        self.exec.execute("DELETE FROM T WHERE Id = -1")
+        self.assertIn("Total records loaded=500", self.exec.execute(f"APPEND INTO T ALLRECORDS ({csv_path})"))
+        self.crash()
+
+        self.open()
+        self.assertEqual(len(self.select("SELECT * FROM T")), 500)
+
+        # Arrêt propre (séquence de main.py) : le journal est vidé, rien à rejouer
+        self.exec.execute("INSERT INTO T VALUES (500, x500)")
+        self.db.SaveState()
+        self.buff.FlushBuffers()
+        self.disk.Finish()
+        self.wal.Checkpoint()
+        lsn = self.wal.next_lsn
+        self.crash()
+        self.open()
+        self.assertEqual(self.wal.next_lsn, lsn)
+        self.assertEqual(len(self.select("SELECT * FROM T")), 501)
+
+    def test_segments_and_fuzzy_checkpoint(self):
+        self.config.wal_segment_size = 4096
+        self.crash()
+        self.open()
+        self.exec.execute("CREATE TABLE T (Id:INT, Nom:CHAR(8))")
+        insert = self.exec.prepare("INSERT INTO T VALUES (?, ?)")
+        for i in range(100):
+            insert.execute(i, "a")
+        self.assertGreater(len(self.wal.segments), 3)
+
+        # Checkpoint pendant l'activité : les segments avant le LSN de reprise disparaissent
+        redo_lsn = self.wal.FuzzyCheckpoint(self.db)
+        self.assertLessEqual(self.wal.segments[0][0], redo_lsn)
+        self.assertLessEqual(len(self.wal.segments), 2)
+        self.assertGreater(self.wal.segments[0][0], 0)
+        for i in range(100, 150):
+            insert.execute(i, "b")
+        self.exec.execute("UPDATE T SET Nom = c WHERE Id < 5")
+        expected = self.select("SELECT * FROM T")
+
+        self.crash()
+        self.disk = DiskManager(self.config)
+        self.wal = WALManager(self.config, self.disk)
+        self.assertEqual(self.wal.redo_lsn, redo_lsn)
+        self.buff = BufferManager(self.config, self.disk, self.wal)
+        self.db = DBManager(self.config, self.disk, self.buff)
+        self.exec = SQLExecutor(self.db)
+        self.assertEqual(self.select("SELECT * FROM T"), expected)
+
+    def test_group_commit(self):
+        self.config.wal_commit_delay = 20
+        self.crash()
+        self.open()
+
+        def worker(n):
+            for i in range(5):
+                with self.wal.Transaction():
+                    self.wal.LogUpdate(PageId(0, n), i, b"\x00", b"\x01")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(self.wal.nb_commits, 40)
+        # Les commits simultanés partagent leurs fsync
+        self.assertLess(self.wal.nb_syncs, 40)
+        self.assertEqual(self.wal.flushed_lsn, self.wal.next_lsn)
+
+if __name__ == '__main__':
+    unittest.main()